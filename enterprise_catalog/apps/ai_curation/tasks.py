@@ -8,6 +8,9 @@ from enterprise_catalog.apps.ai_curation.utils import (
     generate_curation,
     track_ai_curation,
 )
+from enterprise_catalog.apps.ai_curation.utils.catalog_snapshot_utils import (
+    build_all_catalog_snapshots,
+)
 from enterprise_catalog.apps.api.v1.constants import SegmentEvents
 
 
@@ -31,3 +34,14 @@ def trigger_ai_curations(self, query: str, catalog_name: str):
         }
     )
     return result
+
+
+@shared_task(
+    base=LoggedTask,
+    bind=True,
+)
+def build_catalog_snapshots(self, index_version: str):  # pylint: disable=unused-argument
+    """
+    Builds the AI curation catalog snapshots of every catalog title for the given Algolia index version.
+    """
+    return build_all_catalog_snapshots(index_version)
@@ -7,7 +7,8 @@ from unittest import mock
 from unittest.mock import patch
 
 from django.conf import settings
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 
 from enterprise_catalog.apps.ai_curation.errors import AICurationError
 from enterprise_catalog.apps.ai_curation.utils.algolia_utils import (
@@ -157,6 +158,44 @@ class TestChatCompletionUtils(TestCase):
         )
         assert result == 'I am a prose'
 
+    @override_settings(SHOULD_CACHE_AI_CURATION_RESPONSES=True)
+    @patch('enterprise_catalog.apps.ai_curation.openai_client.requests.post')
+    def test_cached_responses(self, mock_requests):
+        """
+        Test that responses are cached by prompt and normalized query
+        """
+        cache.clear()
+        mock_requests.return_value.json.return_value = [{
+            "role": "assistant",
+            "content": json.dumps(['keyword1', 'keyword2'])
+        }]
+
+        assert get_query_keywords('Test  Query') == ['keyword1', 'keyword2']
+        assert get_query_keywords(' test query') == ['keyword1', 'keyword2']
+        assert mock_requests.call_count == 1
+
+        get_query_keywords('other query')
+        assert mock_requests.call_count == 2
+
+        # the subjects are part of the filter subjects prompt, so of its cache key
+        get_filtered_subjects('test query', ['subject1', 'subject2'])
+        get_filtered_subjects('Test query', ['subject2', 'subject1'])
+        assert mock_requests.call_count == 3
+        get_filtered_subjects('test query', ['subject1'])
+        assert mock_requests.call_count == 4
+
+    @patch('enterprise_catalog.apps.ai_curation.openai_client.requests.post')
+    def test_responses_not_cached(self, mock_requests):
+        cache.clear()
+        mock_requests.return_value.json.return_value = [{
+            "role": "assistant",
+            "content": json.dumps(['keyword1', 'keyword2'])
+        }]
+
+        get_query_keywords('test query')
+        get_query_keywords('test query')
+        assert mock_requests.call_count == 2
+
     @patch('enterprise_catalog.apps.ai_curation.openai_client.LOGGER')
     @patch('enterprise_catalog.apps.ai_curation.openai_client.requests.post')
     def test_chat_completions_retries(self, mock_requests, mock_logger):
@@ -0,0 +1,157 @@
+"""
+Tests for ai_curation app catalog snapshot utils.
+"""
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+
+from enterprise_catalog.apps.ai_curation.utils import catalog_snapshot_utils
+from enterprise_catalog.apps.api.v1.tests.test_export_artifacts import (
+    IN_MEMORY_STORAGES,
+)
+from enterprise_catalog.apps.catalog.algolia_utils import (
+    update_algolia_index_version,
+)
+from enterprise_catalog.apps.catalog.tests.factories import CatalogQueryFactory
+
+
+COURSE_TEXT = {'skills': ['Python'], 'short_description': 'Learn to code', 'outcome': 'Coding'}
+CATALOG_METADATA = (
+    [{
+        'aggregation_key': 'course:MITx+20', 'title': 'Programming Basics', 'subjects': ['Computer Science'],
+        **COURSE_TEXT,
+    }],
+    [{
+        'aggregation_key': 'course:MITx+19', 'title': 'Data Science', 'subjects': ['Data Analysis & Statistics'],
+        **COURSE_TEXT,
+    }],
+    [{'aggregation_key': 'program:MITx+21', 'title': 'A program', 'subjects': ['Computer Science']}],
+    ['Computer Science', 'Data Analysis & Statistics'],
+)
+
+
+@override_settings(STORAGES=IN_MEMORY_STORAGES, SHOULD_USE_AI_CURATION_CATALOG_SNAPSHOTS=True)
+@patch('enterprise_catalog.apps.ai_curation.utils.catalog_snapshot_utils.fetch_catalog_metadata_from_algolia')
+class TestCatalogSnapshotUtils(TestCase):
+    """
+    Tests for the AI Curation catalog snapshot utils functions.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        catalog_snapshot_utils._built_paths.clear()  # pylint: disable=protected-access
+
+    def test_get_catalog_metadata_from_snapshot(self, mock_fetch_catalog_metadata):
+        """
+        Validate the catalog metadata is only fetched from Algolia once per catalog title and index version.
+        """
+        mock_fetch_catalog_metadata.return_value = CATALOG_METADATA
+
+        first_metadata = catalog_snapshot_utils.get_catalog_metadata('Test Catalog')
+        first_metadata[0][0]['tf_idf_score'] = 1
+        assert catalog_snapshot_utils.get_catalog_metadata('Test Catalog') == CATALOG_METADATA
+        assert mock_fetch_catalog_metadata.call_count == 1
+
+        with patch.object(default_storage, 'exists') as mock_exists:
+            catalog_snapshot_utils.get_catalog_metadata('Test Catalog')
+        mock_exists.assert_not_called()
+
+        catalog_snapshot_utils.get_catalog_metadata('Other Catalog')
+        assert mock_fetch_catalog_metadata.call_count == 2
+
+        update_algolia_index_version()
+        assert catalog_snapshot_utils.get_catalog_metadata('Test Catalog') == CATALOG_METADATA
+        assert mock_fetch_catalog_metadata.call_count == 3
+
+    @override_settings(SHOULD_USE_AI_CURATION_CATALOG_SNAPSHOTS=False)
+    def test_get_catalog_metadata_without_snapshots(self, mock_fetch_catalog_metadata):
+        mock_fetch_catalog_metadata.return_value = CATALOG_METADATA
+
+        for _ in range(2):
+            assert catalog_snapshot_utils.get_catalog_metadata('Test Catalog') == CATALOG_METADATA
+        assert mock_fetch_catalog_metadata.call_count == 2
+
+    def test_build_all_catalog_snapshots(self, mock_fetch_catalog_metadata):
+        """
+        Validate a snapshot is built for every catalog title, and a failing catalog does not stop the others.
+        """
+        CatalogQueryFactory(title='Test Catalog')
+        CatalogQueryFactory(title='Broken Catalog')
+        CatalogQueryFactory(title=None)
+
+        def fetch_catalog_metadata(catalog_query_title):
+            if catalog_query_title == 'Broken Catalog':
+                raise Exception('Algolia is down')  # pylint: disable=broad-exception-raised
+            return CATALOG_METADATA
+        mock_fetch_catalog_metadata.side_effect = fetch_catalog_metadata
+
+        old_index_version = update_algolia_index_version()
+        catalog_snapshot_utils.build_all_catalog_snapshots(old_index_version)
+        index_version = update_algolia_index_version()
+        with patch('enterprise_catalog.apps.ai_curation.utils.catalog_snapshot_utils.logger') as mock_logger:
+            built_count = catalog_snapshot_utils.build_all_catalog_snapshots(index_version)
+
+        assert built_count == 1
+        mock_logger.exception.assert_called_once()
+        assert default_storage.exists(catalog_snapshot_utils.get_catalog_snapshot_path('Test Catalog', index_version))
+        assert not default_storage.exists(
+            catalog_snapshot_utils.get_catalog_snapshot_path('Broken Catalog', index_version)
+        )
+        # the snapshots of the previous index version are deleted
+        assert not default_storage.exists(
+            catalog_snapshot_utils.get_catalog_snapshot_path('Test Catalog', old_index_version)
+        )
+
+    def test_build_catalog_snapshot_concurrently(self, mock_fetch_catalog_metadata):
+        """
+        Validate a snapshot saved by a concurrent build is not duplicated under another name.
+        """
+        mock_fetch_catalog_metadata.return_value = CATALOG_METADATA
+        path = catalog_snapshot_utils.get_catalog_snapshot_path('Test Catalog')
+        default_storage.save(path, ContentFile(b'saved by a concurrent build'))
+
+        # the concurrent build saves the snapshot after this build checked it does not exist yet
+        exists_results = iter([False])
+        exists = default_storage.exists
+        with patch.object(default_storage, 'exists', side_effect=lambda name: next(exists_results, exists(name))):
+            assert catalog_snapshot_utils.build_catalog_snapshot('Test Catalog') == path
+
+        directory, file_name = path.rsplit('/', 1)
+        assert default_storage.listdir(directory) == ([], [file_name])
+
+    @override_settings(SHOULD_USE_AI_CURATION_CATALOG_TFIDF_INDEX=True)
+    def test_get_catalog_tfidf_index(self, mock_fetch_catalog_metadata):
+        """
+        Validate the TF-IDF index of a catalog is built from its snapshot, once per index version.
+        """
+        mock_fetch_catalog_metadata.return_value = CATALOG_METADATA
+
+        tfidf_index = catalog_snapshot_utils.get_catalog_tfidf_index('Test Catalog')
+        assert tfidf_index.course_keys == ['course:MITx+20', 'course:MITx+19']
+        assert catalog_snapshot_utils.get_catalog_tfidf_index('Test Catalog') is tfidf_index
+        assert mock_fetch_catalog_metadata.call_count == 1
+
+        update_algolia_index_version()
+        assert catalog_snapshot_utils.get_catalog_tfidf_index('Test Catalog') is not tfidf_index
+
+    def test_get_catalog_tfidf_index_disabled(self, mock_fetch_catalog_metadata):
+        assert catalog_snapshot_utils.get_catalog_tfidf_index('Test Catalog') is None
+        mock_fetch_catalog_metadata.assert_not_called()
+
+    def test_get_catalog_keyword_index(self, mock_fetch_catalog_metadata):
+        """
+        Validate the keyword index of a catalog holds the courses of its snapshot.
+        """
+        mock_fetch_catalog_metadata.return_value = CATALOG_METADATA
+
+        keyword_index = catalog_snapshot_utils.get_catalog_keyword_index('Test Catalog')
+        assert list(keyword_index.position_by_course_key) == ['course:MITx+20', 'course:MITx+19']
+        assert catalog_snapshot_utils.get_catalog_keyword_index('Test Catalog') is keyword_index
+        assert mock_fetch_catalog_metadata.call_count == 1
+
+        with override_settings(SHOULD_USE_AI_CURATION_CATALOG_SNAPSHOTS=False):
+            assert catalog_snapshot_utils.get_catalog_keyword_index('Test Catalog') is None
@@ -2,10 +2,14 @@
 Tests for ai_curation app utils.
 """
 import json
+import threading
+import time
 from unittest.mock import patch
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from scipy.stats import percentileofscore
 
+from enterprise_catalog.apps.ai_curation.errors import AICurationError
 from enterprise_catalog.apps.ai_curation.utils.generate_curation_utils import (
     apply_keywords_filter,
     apply_programs_filter,
@@ -13,6 +17,7 @@ from enterprise_catalog.apps.ai_curation.utils.generate_curation_utils import (
     apply_tfidf_filter,
     count_terms_in_description,
     generate_curation,
+    get_percentiles_of_scores,
 )
 
 
@@ -132,6 +137,13 @@ class TestUtils(TestCase):
 
         assert {c['title'] for c in filtered_courses} == {'Python for data science', 'Java for data science'}
 
+    def test_get_percentiles_of_scores(self):
+        """
+        Validate get_percentiles_of_scores function matches scipy's percentileofscore.
+        """
+        for scores in ([], [0.5], [0.0, 0.0, 0.0], [0.9, 0.5, 0.5, 0.1, 0.0], [0.3, 0.1, 0.7, 0.1, 0.3, 0.3]):
+            assert get_percentiles_of_scores(scores) == [percentileofscore(scores, score) for score in scores]
+
     def test_apply_programs_filter(self):
         """
         Validate apply_programs_filter function.
@@ -154,13 +166,13 @@ class TestUtils(TestCase):
 
         assert apply_programs_filter(courses, []) == []
 
-    @patch('enterprise_catalog.apps.ai_curation.utils.generate_curation_utils.fetch_catalog_metadata_from_algolia')
+    @patch('enterprise_catalog.apps.ai_curation.utils.generate_curation_utils.get_catalog_metadata')
     @patch('enterprise_catalog.apps.ai_curation.utils.generate_curation_utils.get_keywords_to_prose')
     @patch('enterprise_catalog.apps.ai_curation.utils.generate_curation_utils.get_filtered_subjects')
     @patch('enterprise_catalog.apps.ai_curation.utils.generate_curation_utils.get_query_keywords')
     def test_generate_curation(
         self, mock_get_query_keywords, mock_get_filtered_subjects, mock_get_keywords_to_prose,
-        mock_fetch_catalog_metadata_from_algolia
+        mock_get_catalog_metadata
     ):
         """
         Validate apply_tfidf_filter function.
@@ -207,7 +219,7 @@ class TestUtils(TestCase):
                 'outcome': 'Learn data science with Java',
             },
         ]
-        mock_fetch_catalog_metadata_from_algolia.return_value = (
+        mock_get_catalog_metadata.return_value = (
             ocm_courses,
             exec_ed_courses,
             [],
@@ -221,3 +233,95 @@ class TestUtils(TestCase):
         assert len(result['ocm_courses']) == 1
         assert result['ocm_courses'][0]['title'] == 'Python for data science'
         assert result['ocm_courses'][0]['aggregation_key'] == 'course:MITx+19'
+
+    @override_settings(SHOULD_RUN_AI_CURATION_CHAT_COMPLETIONS_CONCURRENTLY=True)
+    @patch('enterprise_catalog.apps.ai_curation.utils.generate_curation_utils.get_catalog_metadata')
+    @patch('enterprise_catalog.apps.ai_curation.utils.generate_curation_utils.get_keywords_to_prose')
+    @patch('enterprise_catalog.apps.ai_curation.utils.generate_curation_utils.get_filtered_subjects')
+    @patch('enterprise_catalog.apps.ai_curation.utils.generate_curation_utils.get_query_keywords')
+    def test_generate_curation_concurrent_chat_completions(
+        self, mock_get_query_keywords, mock_get_filtered_subjects, mock_get_keywords_to_prose,
+        mock_get_catalog_metadata
+    ):
+        """
+        Validate the subjects filter and the query keywords are requested at the same time,
+        and the keywords are only requested once.
+        """
+        both_requested = threading.Barrier(2, timeout=5)
+
+        def get_query_keywords(query):  # pylint: disable=unused-argument
+            both_requested.wait()
+            return ['python']
+
+        def get_filtered_subjects(query, subjects):  # pylint: disable=unused-argument
+            both_requested.wait()
+            return ['Python']
+
+        mock_get_query_keywords.side_effect = get_query_keywords
+        mock_get_filtered_subjects.side_effect = get_filtered_subjects
+        mock_get_keywords_to_prose.return_value = 'Python'
+        mock_get_catalog_metadata.return_value = ([], [], [], ['Python'])
+
+        result = generate_curation('python', 'Test Catalog', 'task_id')
+
+        assert result['ocm_courses'] == []
+        mock_get_query_keywords.assert_called_once_with('python')
+        mock_get_keywords_to_prose.assert_called_once_with('python', ['python'])
+
+    @override_settings(
+        SHOULD_RUN_AI_CURATION_CHAT_COMPLETIONS_CONCURRENTLY=True, AI_CURATION_CHAT_COMPLETIONS_TIMEOUT=0.1,
+    )
+    @patch('enterprise_catalog.apps.ai_curation.utils.generate_curation_utils.get_catalog_metadata')
+    @patch('enterprise_catalog.apps.ai_curation.utils.generate_curation_utils.get_keywords_to_prose')
+    @patch('enterprise_catalog.apps.ai_curation.utils.generate_curation_utils.get_filtered_subjects')
+    @patch('enterprise_catalog.apps.ai_curation.utils.generate_curation_utils.get_query_keywords')
+    def test_generate_curation_chat_completions_timeout(
+        self, mock_get_query_keywords, mock_get_filtered_subjects, mock_get_keywords_to_prose,
+        mock_get_catalog_metadata
+    ):
+        """
+        Validate curation fails once the chat completions time budget is spent.
+        """
+        released = threading.Event()
+        mock_get_query_keywords.side_effect = lambda query: released.wait(5)
+        mock_get_filtered_subjects.return_value = ['Python']
+        mock_get_keywords_to_prose.return_value = 'Python'
+        mock_get_catalog_metadata.return_value = ([], [], [], ['Python'])
+
+        try:
+            with self.assertRaises(AICurationError) as context:
+                generate_curation('python', 'Test Catalog', 'task_id')
+        finally:
+            released.set()
+        assert context.exception.status_code == 504
+
+    @override_settings(
+        SHOULD_RUN_AI_CURATION_CHAT_COMPLETIONS_CONCURRENTLY=True, AI_CURATION_CHAT_COMPLETIONS_TIMEOUT=0.2,
+    )
+    @patch('enterprise_catalog.apps.ai_curation.utils.generate_curation_utils.get_catalog_metadata')
+    @patch('enterprise_catalog.apps.ai_curation.utils.generate_curation_utils.get_keywords_to_prose')
+    @patch('enterprise_catalog.apps.ai_curation.utils.generate_curation_utils.get_filtered_subjects')
+    @patch('enterprise_catalog.apps.ai_curation.utils.generate_curation_utils.get_query_keywords')
+    def test_generate_curation_slow_catalog_metadata(
+        self, mock_get_query_keywords, mock_get_filtered_subjects, mock_get_keywords_to_prose,
+        mock_get_catalog_metadata
+    ):
+        """
+        Validate the time spent loading the catalog metadata does not count against the subjects filter budget.
+        """
+        def get_catalog_metadata(catalog_name):  # pylint: disable=unused-argument
+            time.sleep(0.3)
+            return [], [], [], ['Python']
+
+        def get_filtered_subjects(query, subjects):  # pylint: disable=unused-argument
+            time.sleep(0.1)
+            return ['Python']
+
+        mock_get_query_keywords.return_value = ['python']
+        mock_get_filtered_subjects.side_effect = get_filtered_subjects
+        mock_get_keywords_to_prose.return_value = 'Python'
+        mock_get_catalog_metadata.side_effect = get_catalog_metadata
+
+        result = generate_curation('python', 'Test Catalog', 'task_id')
+
+        assert result['ocm_courses'] == []
@@ -0,0 +1,72 @@
+"""
+Tests for ai_curation app keyword utils.
+"""
+import random
+
+from django.test import TestCase
+
+from enterprise_catalog.apps.ai_curation.utils.generate_curation_utils import (
+    apply_keywords_filter,
+    count_terms_in_description,
+)
+from enterprise_catalog.apps.ai_curation.utils.keyword_utils import (
+    KeywordIndex,
+    get_course_keywords_text,
+)
+
+
+WORDS = ['python', 'Data', 'data science', 'ΟΔΟΣ', 'İstanbul', 'c++', 'Title', 'skills', ',', ' ']
+
+
+def random_course(rng, index):
+    return {
+        'aggregation_key': rng.choice([f'course:edX+{index}', f'course:edX+{index}', None, 'course:edX+duplicate']),
+        'title': ''.join(rng.choices(WORDS, k=rng.randint(0, 4))),
+        'skills': [''.join(rng.choices(WORDS, k=rng.randint(1, 2))) for _ in range(rng.randint(0, 3))],
+    }
+
+
+class TestKeywordUtils(TestCase):
+    """
+    Tests for the AI Curation keyword utils functions.
+    """
+
+    def test_count_terms_equivalence(self):
+        """
+        Validate the index counts terms exactly like count_terms_in_description, including empty, repeated,
+        overlapping and mixed-case terms, and courses without a unique aggregation key.
+        """
+        rng = random.Random(0)
+        for _ in range(50):
+            courses = [random_course(rng, index) for index in range(rng.randint(0, 30))]
+            keyword_index = KeywordIndex(courses)
+            # also count courses missing from the index, e.g. when the snapshot is older than the courses
+            counted_courses = rng.sample(courses, len(courses) // 2) + [
+                {**random_course(rng, 'unknown'), 'aggregation_key': 'course:edX+unknown'},
+            ]
+            search_terms = [
+                ''.join(rng.choices(WORDS + ['', 'on', 'a', 'tle: '], k=rng.randint(0, 3)))
+                for _ in range(rng.randint(0, 8))
+            ]
+            search_terms += ['skills taught: ', 'python']
+
+            expected = [
+                count_terms_in_description(search_terms, get_course_keywords_text(course))
+                for course in counted_courses
+            ]
+            assert keyword_index.count_terms(search_terms, counted_courses) == expected
+            # the second time, the terms are looked up in the index
+            assert keyword_index.count_terms(search_terms, counted_courses) == expected
+
+    def test_apply_keywords_filter_with_index(self):
+        courses = [
+            {'aggregation_key': 'course:1', 'title': 'Python for data science', 'skills': ['python', 'data']},
+            {'aggregation_key': 'course:2', 'title': 'Test String', 'skills': []},
+            {'aggregation_key': 'course:3', 'title': 'Java for data science', 'skills': ['java']},
+        ]
+        keyword_index = KeywordIndex(courses)
+
+        for keywords, kw_threshold in ((['python', 'data', 'data engineering'], 2), (['java', 'data science'], 1)):
+            assert apply_keywords_filter(courses, keywords, kw_threshold, keyword_index) == apply_keywords_filter(
+                courses, keywords, kw_threshold,
+            )
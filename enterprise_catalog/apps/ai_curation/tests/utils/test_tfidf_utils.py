@@ -0,0 +1,77 @@
+"""
+Tests for ai_curation app TF-IDF utils.
+"""
+import numpy as np
+from django.test import TestCase
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from enterprise_catalog.apps.ai_curation.utils.generate_curation_utils import (
+    apply_tfidf_filter,
+)
+from enterprise_catalog.apps.ai_curation.utils.tfidf_utils import (
+    CatalogTfidfIndex,
+    get_course_tfidf_text,
+)
+
+
+COURSES = [
+    {
+        'aggregation_key': 'course:edX+python',
+        'title': 'Python for data science',
+        'skills': ['python', 'data science'],
+        'short_description': 'How to use python for data science',
+        'outcome': 'Learn data science with python'
+    },
+    {
+        'aggregation_key': 'course:edX+java',
+        'title': 'Java for data science',
+        'skills': ['java', 'data science'],
+        'short_description': 'How to use java for data science',
+        'outcome': 'Learn data science with java'
+    },
+    {
+        'aggregation_key': 'course:edX+rust',
+        'title': 'Software Engineering',
+        'skills': ['C', 'C++', 'Rust'],
+        'short_description': 'How to use C, C++, Rust for software engineering',
+        'outcome': 'Learn software engineering with C, C++, Rust'
+    },
+]
+
+
+class TestTfidfUtils(TestCase):
+    """
+    Tests for the AI Curation TF-IDF utils functions.
+    """
+
+    def test_cosine_similarities(self):
+        """
+        Validate the index scores a query like a vectorizer fitted over all the catalog courses.
+        """
+        tfidf_index = CatalogTfidfIndex.from_bytes(CatalogTfidfIndex.from_courses(COURSES).to_bytes())
+
+        vectorizer = TfidfVectorizer()
+        course_vectors = vectorizer.fit_transform([get_course_tfidf_text(course) for course in COURSES])
+        query = 'python data science, and some words the catalog has never seen'
+        expected = cosine_similarity(vectorizer.transform([query]), course_vectors)[0]
+
+        assert np.allclose(tfidf_index.get_cosine_similarities(query, COURSES), expected)
+        # only the given courses are scored, in their order, and unknown courses score 0
+        unknown_course = {**COURSES[0], 'aggregation_key': 'course:edX+unknown'}
+        similarities = tfidf_index.get_cosine_similarities(query, [COURSES[2], unknown_course, COURSES[0]])
+        assert np.allclose(similarities, [expected[2], 0.0, expected[0]])
+        assert tfidf_index.get_cosine_similarities(query, []) == []
+
+    def test_nothing_to_index(self):
+        assert CatalogTfidfIndex.from_courses([]) is None
+
+    def test_apply_tfidf_filter_with_index(self):
+        courses = [dict(course) for course in COURSES]
+        tfidf_index = CatalogTfidfIndex.from_courses(courses)
+
+        filtered_courses, _ = apply_tfidf_filter(
+            'python data science', courses, tfidf_threshold=0.4, tfidf_index=tfidf_index,
+        )
+
+        assert {c['title'] for c in filtered_courses} == {'Python for data science', 'Java for data science'}
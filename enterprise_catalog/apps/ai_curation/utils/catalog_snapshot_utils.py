@@ -0,0 +1,266 @@
+"""
+Utility functions for catalog snapshots.
+
+A catalog snapshot holds the course, program and subject data that AI curation extracts from the
+Algolia index for one catalog query title, and optionally the TF-IDF vectors of its courses.
+Snapshots are built once per Algolia index version and kept in the default storage, so curation
+requests do not page through the whole catalog.
+"""
+import functools
+import gzip
+import hashlib
+import json
+import logging
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from enterprise_catalog.apps.catalog.algolia_utils import (
+    get_algolia_index_version,
+)
+from enterprise_catalog.apps.catalog.models import CatalogQuery
+
+from .algolia_utils import fetch_catalog_metadata_from_algolia
+from .keyword_utils import KeywordIndex
+from .tfidf_utils import CatalogTfidfIndex
+
+
+logger = logging.getLogger(__name__)
+
+CATALOG_SNAPSHOTS_DIRECTORY = 'ai-curation-snapshots'
+
+# How many built snapshot and TF-IDF index paths a process remembers, so it does not ask the storage whether
+# they exist on every curation request.
+MAX_BUILT_PATHS = 1000
+
+# The built path of each requested path (None for a catalog without a TF-IDF index). Paths are unique per
+# index version, so a built path never goes stale.
+_built_paths = {}
+
+
+def _get_catalog_snapshot_path(catalog_query_title: str, index_version: str, extension: str) -> str:
+    if index_version is None:
+        index_version = get_algolia_index_version()
+    title_hash = hashlib.sha256(catalog_query_title.encode()).hexdigest()
+    return f'{CATALOG_SNAPSHOTS_DIRECTORY}/{index_version}/{title_hash}.{extension}'
+
+
+def get_catalog_snapshot_path(catalog_query_title: str, index_version: str = None) -> str:
+    """
+    Returns the default storage path of the snapshot of the given catalog title, for the given (or current)
+    Algolia index version.
+    """
+    return _get_catalog_snapshot_path(catalog_query_title, index_version, 'json.gz')
+
+
+def get_catalog_tfidf_index_path(catalog_query_title: str, index_version: str = None) -> str:
+    """
+    Returns the default storage path of the TF-IDF index of the given catalog title, for the given (or current)
+    Algolia index version.
+    """
+    return _get_catalog_snapshot_path(catalog_query_title, index_version, 'tfidf.npz')
+
+
+def _remember_built_path(path: str, built_path):
+    if len(_built_paths) >= MAX_BUILT_PATHS:
+        _built_paths.clear()
+    _built_paths[path] = built_path
+    return built_path
+
+
+def _save_catalog_snapshot_file(path: str, content: bytes) -> str:
+    """
+    Saves the content at the given path. When a concurrent build saved the same path first, the storage saves
+    this copy under a suffixed name instead, which is deleted: both builds hold the same data, and readers only
+    ever look up the unsuffixed path.
+    """
+    saved_path = default_storage.save(path, ContentFile(content))
+    if saved_path != path:
+        default_storage.delete(saved_path)
+    return path
+
+
+def build_catalog_snapshot(catalog_query_title: str, index_version: str = None) -> str:
+    """
+    Fetches the catalog metadata of the given catalog title from Algolia and saves it as a snapshot,
+    unless the snapshot already exists.
+
+    Returns:
+        str: The default storage path of the snapshot.
+    """
+    path = get_catalog_snapshot_path(catalog_query_title, index_version)
+    if path in _built_paths:
+        return _built_paths[path]
+    if default_storage.exists(path):
+        return _remember_built_path(path, path)
+
+    ocm_courses, exec_ed_courses, programs, subjects = fetch_catalog_metadata_from_algolia(catalog_query_title)
+    snapshot = {
+        'ocm_courses': ocm_courses,
+        'exec_ed_courses': exec_ed_courses,
+        'programs': programs,
+        'subjects': subjects,
+    }
+    content = gzip.compress(json.dumps(snapshot, separators=(',', ':')).encode())
+    _save_catalog_snapshot_file(path, content)
+    logger.info(
+        '[AI_CURATION] Saved catalog snapshot %s (%s bytes) for catalog: %s.',
+        path, len(content), catalog_query_title,
+    )
+    return _remember_built_path(path, path)
+
+
+def build_catalog_tfidf_index(catalog_query_title: str, index_version: str = None) -> str:
+    """
+    Fits the TF-IDF index of all the courses in the snapshot of the given catalog title and saves it,
+    unless it already exists.
+
+    Returns:
+        str: The default storage path of the TF-IDF index, or None if the catalog has nothing to index.
+    """
+    path = get_catalog_tfidf_index_path(catalog_query_title, index_version)
+    if path in _built_paths:
+        return _built_paths[path]
+    if default_storage.exists(path):
+        return _remember_built_path(path, path)
+
+    ocm_courses, exec_ed_courses, _, _ = _load_catalog_snapshot(
+        build_catalog_snapshot(catalog_query_title, index_version)
+    )
+    tfidf_index = CatalogTfidfIndex.from_courses(ocm_courses + exec_ed_courses)
+    if tfidf_index is None:
+        return _remember_built_path(path, None)
+    content = tfidf_index.to_bytes()
+    _save_catalog_snapshot_file(path, content)
+    logger.info(
+        '[AI_CURATION] Saved catalog TF-IDF index %s (%s bytes, %s courses, %s terms) for catalog: %s.',
+        path, len(content), len(tfidf_index.course_keys), len(tfidf_index.terms), catalog_query_title,
+    )
+    return _remember_built_path(path, path)
+
+
+def build_all_catalog_snapshots(index_version: str) -> int:
+    """
+    Builds the snapshot (and, with ``SHOULD_USE_AI_CURATION_CATALOG_TFIDF_INDEX`` enabled, the TF-IDF index)
+    of every known catalog title for the given Algolia index version, then deletes the snapshots of older
+    index versions.
+
+    Returns:
+        int: The number of snapshots built.
+    """
+    catalog_query_titles = CatalogQuery.objects.exclude(
+        title__isnull=True,
+    ).exclude(
+        title='',
+    ).values_list('title', flat=True).distinct()
+
+    built_count = 0
+    for catalog_query_title in catalog_query_titles:
+        try:
+            build_catalog_snapshot(catalog_query_title, index_version)
+            if getattr(settings, 'SHOULD_USE_AI_CURATION_CATALOG_TFIDF_INDEX', False):
+                build_catalog_tfidf_index(catalog_query_title, index_version)
+            built_count += 1
+        except Exception:  # pylint: disable=broad-except
+            # a missing snapshot is built on demand by the first curation request that needs it
+            logger.exception('[AI_CURATION] Could not build catalog snapshot for catalog: %s.', catalog_query_title)
+    prune_catalog_snapshots(index_version)
+    return built_count
+
+
+def prune_catalog_snapshots(index_version: str) -> int:
+    """
+    Deletes the snapshots and TF-IDF indexes of every Algolia index version other than the given one and the
+    current one, which curation requests no longer read.
+
+    Returns:
+        int: The number of files deleted.
+    """
+    kept_index_versions = {index_version, get_algolia_index_version()}
+    try:
+        index_versions, _ = default_storage.listdir(CATALOG_SNAPSHOTS_DIRECTORY)
+    except FileNotFoundError:
+        # no snapshot has been saved yet
+        return 0
+
+    deleted_count = 0
+    for old_index_version in set(index_versions) - kept_index_versions:
+        directory = f'{CATALOG_SNAPSHOTS_DIRECTORY}/{old_index_version}'
+        _, file_names = default_storage.listdir(directory)
+        for file_name in file_names:
+            default_storage.delete(f'{directory}/{file_name}')
+            deleted_count += 1
+        logger.info(
+            '[AI_CURATION] Deleted %s catalog snapshot files of index version %s.', len(file_names), old_index_version,
+        )
+    return deleted_count
+
+
+@functools.lru_cache(maxsize=8)
+def _read_catalog_snapshot(path: str) -> bytes:
+    # paths are unique per index version, so the compressed snapshots can be kept in memory as long as we like
+    with default_storage.open(path, 'rb') as snapshot_file:
+        return snapshot_file.read()
+
+
+def _load_catalog_snapshot(path: str):
+    snapshot = json.loads(gzip.decompress(_read_catalog_snapshot(path)))
+    return snapshot['ocm_courses'], snapshot['exec_ed_courses'], snapshot['programs'], snapshot['subjects']
+
+
+@functools.lru_cache(maxsize=8)
+def _load_catalog_tfidf_index(path: str) -> CatalogTfidfIndex:
+    # the index is never modified, so it is shared by all the curation requests of this process
+    with default_storage.open(path, 'rb') as index_file:
+        return CatalogTfidfIndex.from_bytes(index_file.read())
+
+
+@functools.lru_cache(maxsize=8)
+def _load_catalog_keyword_index(path: str) -> KeywordIndex:
+    # built from the snapshot, so it is as fresh as the snapshot and shared by all the curation requests
+    ocm_courses, exec_ed_courses, _, _ = _load_catalog_snapshot(path)
+    return KeywordIndex(ocm_courses + exec_ed_courses)
+
+
+def get_catalog_metadata(catalog_query_title: str):
+    """
+    Returns the ocm_courses, exec_ed_courses, programs, subjects of the given catalog title, like
+    ``fetch_catalog_metadata_from_algolia``, but from the catalog snapshot when
+    ``SHOULD_USE_AI_CURATION_CATALOG_SNAPSHOTS`` is enabled.
+
+    Every call returns new objects, which callers may modify.
+    """
+    if not getattr(settings, 'SHOULD_USE_AI_CURATION_CATALOG_SNAPSHOTS', False):
+        return fetch_catalog_metadata_from_algolia(catalog_query_title)
+
+    return _load_catalog_snapshot(build_catalog_snapshot(catalog_query_title))
+
+
+def get_catalog_tfidf_index(catalog_query_title: str):
+    """
+    Returns the TF-IDF index of the courses of the given catalog title when both
+    ``SHOULD_USE_AI_CURATION_CATALOG_SNAPSHOTS`` and ``SHOULD_USE_AI_CURATION_CATALOG_TFIDF_INDEX``
+    are enabled, otherwise None.
+    """
+    if not (
+        getattr(settings, 'SHOULD_USE_AI_CURATION_CATALOG_SNAPSHOTS', False)
+        and getattr(settings, 'SHOULD_USE_AI_CURATION_CATALOG_TFIDF_INDEX', False)
+    ):
+        return None
+
+    path = build_catalog_tfidf_index(catalog_query_title)
+    if path is None:
+        return None
+    return _load_catalog_tfidf_index(path)
+
+
+def get_catalog_keyword_index(catalog_query_title: str):
+    """
+    Returns the keyword index of the courses of the given catalog title when
+    ``SHOULD_USE_AI_CURATION_CATALOG_SNAPSHOTS`` is enabled, otherwise None.
+    """
+    if not getattr(settings, 'SHOULD_USE_AI_CURATION_CATALOG_SNAPSHOTS', False):
+        return None
+
+    return _load_catalog_keyword_index(build_catalog_snapshot(catalog_query_title))
@@ -2,23 +2,34 @@
 Utility functions for curation generation.
 """
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
 
+import numpy as np
+from django.conf import settings
 from django.core.cache import cache
 from rest_framework import status
-from scipy.stats import percentileofscore
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 
 from enterprise_catalog.apps.ai_curation.errors import AICurationError
 from enterprise_catalog.apps.api.v1.constants import SegmentEvents
 
-from .algolia_utils import fetch_catalog_metadata_from_algolia
+from .catalog_snapshot_utils import (
+    get_catalog_keyword_index,
+    get_catalog_metadata,
+    get_catalog_tfidf_index,
+)
+from .keyword_utils import get_course_keywords_text
 from .open_ai_utils import (
     get_filtered_subjects,
     get_keywords_to_prose,
     get_query_keywords,
 )
 from .segment_utils import track_ai_curation
+from .tfidf_utils import get_course_tfidf_text
 
 
 logger = logging.getLogger(__name__)
@@ -34,6 +45,18 @@ def get_cache_key(task_id: str, content_type: str) -> str:
     return CACHE_KEY.format(task_id=task_id, content_type=content_type)
 
 
+@contextmanager
+def record_stage_latency(stage_latencies: dict, stage: str):
+    """
+    Records the time spent in the block, in milliseconds, as ``stage_latencies[stage]``.
+    """
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_latencies[stage] = round((time.perf_counter() - start_time) * 1000, 1)
+
+
 def count_terms_in_description(search_terms, product_description):
     """
     Count the number of search terms found in the product description.
@@ -76,7 +99,7 @@ def apply_subjects_filter(courses: list, subjects: set):
     return [course for course in courses if len(subjects.intersection(course['subjects'])) > 0]
 
 
-def apply_keywords_filter(courses: list, keywords: list, kw_threshold: int = 2):
+def apply_keywords_filter(courses: list, keywords: list, kw_threshold: int = 2, keyword_index=None):
     """
     Filter the courses based on the given keywords.
 
@@ -84,13 +107,18 @@ def apply_keywords_filter(courses: list, keywords: list, kw_threshold: int = 2):
         courses (list): List of courses
         keywords (list): List of keywords to filter by
         kw_threshold (int): The minimum number of keywords that should be found in the course description
+        keyword_index (KeywordIndex): Optional keyword index of the catalog courses, which counts the keywords
+            of all the courses at once
 
     Returns:
         list: List of courses filtered by the given keywords
     """
+    if keyword_index is not None:
+        counts = keyword_index.count_terms(keywords, courses)
+        return [course for course, count in zip(courses, counts) if count > kw_threshold]
     return [
         course for course in courses if count_terms_in_description(
-            keywords, f'Title: {course["title"]}, Skills taught: {", ".join(course["skills"])}'
+            keywords, get_course_keywords_text(course)
         ) > kw_threshold
     ]
 
@@ -116,30 +144,52 @@ def get_cosine_similarities(search_string, product_strings):
     return cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:])[0]
 
 
-def calculate_tfidf_score(keywords_to_prose: str, courses: list):
+def get_percentiles_of_scores(scores: list) -> list:
+    """
+    Returns the percentile rank of each score within the scores, like ``scipy.stats.percentileofscore``
+    with its default ``kind='rank'``, in a single pass over the sorted scores instead of one pass per score.
+
+    Arguments:
+        scores (list): List of scores, none of them NaN
+
+    Returns:
+        list: The percentile rank (0-100) of each score, in the order of the scores.
+    """
+    if len(scores) == 0:
+        return []
+    scores = np.asarray(scores, dtype=float)
+    sorted_scores = np.sort(scores)
+    # number of scores strictly below, and below or equal to, each score
+    left = np.searchsorted(sorted_scores, scores, side='left')
+    right = np.searchsorted(sorted_scores, scores, side='right')
+    return ((left + right + (left < right)) * (50.0 / len(scores))).tolist()
+
+
+def calculate_tfidf_score(keywords_to_prose: str, courses: list, tfidf_index=None):
     """
     Calculate the TF-IDF score for the given query and courses.
 
     Arguments:
         keywords_to_prose (str): Expanded version of the query
         courses (list): List of courses
+        tfidf_index (CatalogTfidfIndex): Optional precomputed TF-IDF vectors of the catalog courses. Without it,
+            each course is vectorized together with the query.
 
     Returns:
         list: List of courses with the TF-IDF score, sorted by the score in descending order.
     """
-    for course in courses:
-        # Get the cosine similarity between the keywords and the course
-        course['tf_idf_score'] = get_cosine_similarities(keywords_to_prose, [
-            (
-                f'Title: {course["title"]}, Skills taught: {", ".join(course["skills"])}, Description: '
-                f'{course["short_description"]}, Syllabus: {course["outcome"]}'
-            )
-        ])[0]
+    if tfidf_index is not None:
+        for course, score in zip(courses, tfidf_index.get_cosine_similarities(keywords_to_prose, courses)):
+            course['tf_idf_score'] = score
+    else:
+        for course in courses:
+            # Get the cosine similarity between the keywords and the course
+            course['tf_idf_score'] = get_cosine_similarities(keywords_to_prose, [get_course_tfidf_text(course)])[0]
 
     sorted_by_score = sorted(courses, key=lambda item: item['tf_idf_score'], reverse=True)
     scores = [course['tf_idf_score'] for course in sorted_by_score]
-    for course in sorted_by_score:
-        course['tf_idf_percentile'] = percentileofscore(scores, course['tf_idf_score']) / 100
+    for course, percentile in zip(sorted_by_score, get_percentiles_of_scores(scores)):
+        course['tf_idf_percentile'] = percentile / 100
 
     return sorted_by_score
 
@@ -158,7 +208,7 @@ def filter_by_threshold(courses: list, tfidf_threshold: float):
     return [course for course in courses if course['tf_idf_percentile'] > tfidf_threshold]
 
 
-def apply_tfidf_filter(keywords_to_prose: str, courses: list, tfidf_threshold: float):
+def apply_tfidf_filter(keywords_to_prose: str, courses: list, tfidf_threshold: float, tfidf_index=None):
     """
     Filter the courses based on the TF-IDF score.
 
@@ -166,11 +216,12 @@ def apply_tfidf_filter(keywords_to_prose: str, courses: list, tfidf_threshold: f
         keywords_to_prose (str): Expanded version of the query
         courses (list): List of courses
         tfidf_threshold (float): The minimum TF-IDF score that a course should have
+        tfidf_index (CatalogTfidfIndex): Optional precomputed TF-IDF vectors of the catalog courses
 
     Returns:
         list: List of courses filtered by the TF-IDF score
     """
-    courses = calculate_tfidf_score(keywords_to_prose, courses)
+    courses = calculate_tfidf_score(keywords_to_prose, courses, tfidf_index)
     return filter_by_threshold(courses, tfidf_threshold), courses
 
 
@@ -190,6 +241,37 @@ def apply_programs_filter(courses: list, programs: list):
     return [program for program in programs if program['title'] in unique_programs]
 
 
+def _get_query_keywords_and_prose(query: str):
+    keywords = get_query_keywords(query)
+    return keywords, get_keywords_to_prose(query, keywords)
+
+
+def _get_chat_completions_result(future, deadline: float, task_id: str):
+    """
+    Returns the result of the given chat completions future, raising an AICurationError if it is not
+    available before the deadline (a ``time.monotonic`` value).
+    """
+    try:
+        return future.result(timeout=max(deadline - time.monotonic(), 0))
+    except FutureTimeoutError as ex:
+        logger.error(f'[AI_CURATION] Chat completions timed out for task_id: {task_id}')
+        raise AICurationError(
+            dev_message=f'Chat completions timed out for task_id: {task_id}.',
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT
+        ) from ex
+
+
+def _get_catalog_indexes(catalog_name: str, stage_latencies: dict):
+    """
+    Returns the TF-IDF index and the keyword index of the given catalog, recording how long each took to load.
+    """
+    with record_stage_latency(stage_latencies, 'tfidf_index'):
+        tfidf_index = get_catalog_tfidf_index(catalog_name)
+    with record_stage_latency(stage_latencies, 'keyword_index'):
+        keyword_index = get_catalog_keyword_index(catalog_name)
+    return tfidf_index, keyword_index
+
+
 def generate_curation(query: str, catalog_name: str, task_id: str):
     """
     Generate the AI curation for the given query.
@@ -202,28 +284,66 @@ def generate_curation(query: str, catalog_name: str, task_id: str):
     Returns:
         dict: AI curation response
     """
-    ocm_courses, exec_ed_courses, programs, subjects = fetch_catalog_metadata_from_algolia(catalog_name)
-    filtered_subjects = set(get_filtered_subjects(query, subjects))
-    # filter courses and exec ed courses based on the filtered subjects
-    filtered_ocm_courses = apply_subjects_filter(ocm_courses, filtered_subjects)
-    filtered_exec_ed_courses = apply_subjects_filter(exec_ed_courses, filtered_subjects)
+    stage_latencies = {}
+    if getattr(settings, 'SHOULD_RUN_AI_CURATION_CHAT_COMPLETIONS_CONCURRENTLY', False):
+        # The chat completions run in background threads while the catalog data loads. Only the subjects
+        # filter needs the catalog subjects; the keywords and their prose only need the query. Each chat
+        # completion gets its own time budget from when it is requested.
+        executor = ThreadPoolExecutor(max_workers=2)
+        try:
+            keywords_deadline = time.monotonic() + settings.AI_CURATION_CHAT_COMPLETIONS_TIMEOUT
+            keywords_future = executor.submit(_get_query_keywords_and_prose, query)
+            with record_stage_latency(stage_latencies, 'catalog_metadata'):
+                ocm_courses, exec_ed_courses, programs, subjects = get_catalog_metadata(catalog_name)
+            filtered_subjects_deadline = time.monotonic() + settings.AI_CURATION_CHAT_COMPLETIONS_TIMEOUT
+            filtered_subjects_future = executor.submit(get_filtered_subjects, query, subjects)
+            tfidf_index, keyword_index = _get_catalog_indexes(catalog_name, stage_latencies)
+
+            with record_stage_latency(stage_latencies, 'filtered_subjects'):
+                filtered_subjects = set(
+                    _get_chat_completions_result(filtered_subjects_future, filtered_subjects_deadline, task_id)
+                )
+            with record_stage_latency(stage_latencies, 'query_keywords_and_prose'):
+                keywords, keywords_to_prose = _get_chat_completions_result(keywords_future, keywords_deadline, task_id)
+        finally:
+            # don't wait for, or start, completions nobody will use once the budget is spent
+            executor.shutdown(wait=False, cancel_futures=True)
+    else:
+        with record_stage_latency(stage_latencies, 'catalog_metadata'):
+            ocm_courses, exec_ed_courses, programs, subjects = get_catalog_metadata(catalog_name)
+        tfidf_index, keyword_index = _get_catalog_indexes(catalog_name, stage_latencies)
+        with record_stage_latency(stage_latencies, 'filtered_subjects'):
+            filtered_subjects = set(get_filtered_subjects(query, subjects))
+        with record_stage_latency(stage_latencies, 'query_keywords'):
+            keywords = get_query_keywords(query)
+        with record_stage_latency(stage_latencies, 'keywords_to_prose'):
+            keywords_to_prose = get_keywords_to_prose(query, keywords)
+
+    with record_stage_latency(stage_latencies, 'subjects_filter'):
+        # filter courses and exec ed courses based on the filtered subjects
+        filtered_ocm_courses = apply_subjects_filter(ocm_courses, filtered_subjects)
+        filtered_exec_ed_courses = apply_subjects_filter(exec_ed_courses, filtered_subjects)
 
-    keywords = get_query_keywords(query)
     kw_threshold = 2
-    # filter courses and exec ed courses based on the keywords
-    filtered_ocm_courses = apply_keywords_filter(filtered_ocm_courses, keywords, kw_threshold)
-    filtered_exec_ed_courses = apply_keywords_filter(filtered_exec_ed_courses, keywords, kw_threshold)
-
-    # Calculate keywords to prose
-    keywords_to_prose = get_keywords_to_prose(query)
+    with record_stage_latency(stage_latencies, 'keywords_filter'):
+        # filter courses and exec ed courses based on the keywords
+        filtered_ocm_courses = apply_keywords_filter(filtered_ocm_courses, keywords, kw_threshold, keyword_index)
+        filtered_exec_ed_courses = apply_keywords_filter(
+            filtered_exec_ed_courses, keywords, kw_threshold, keyword_index
+        )
 
     tfidf_threshold = .2
-    # filter courses and exec ed courses based on the TI-IDF score
-    filtered_ocm_courses, partially_filtered_ocm_courses = apply_tfidf_filter(
-        keywords_to_prose, filtered_ocm_courses, tfidf_threshold
-    )
-    filtered_exec_ed_courses, partially_filtered_exec_ed_courses = apply_tfidf_filter(
-        keywords_to_prose, filtered_exec_ed_courses, tfidf_threshold
+    with record_stage_latency(stage_latencies, 'tfidf_filter'):
+        # filter courses and exec ed courses based on the TI-IDF score
+        filtered_ocm_courses, partially_filtered_ocm_courses = apply_tfidf_filter(
+            keywords_to_prose, filtered_ocm_courses, tfidf_threshold, tfidf_index
+        )
+        filtered_exec_ed_courses, partially_filtered_exec_ed_courses = apply_tfidf_filter(
+            keywords_to_prose, filtered_exec_ed_courses, tfidf_threshold, tfidf_index
+        )
+    logger.info(
+        f'[AI_CURATION] Curation stage latencies (ms) for task_id: {task_id}, catalog: {catalog_name}: '
+        f'{stage_latencies}'
     )
 
     # Cache data for tweaking the filter
@@ -0,0 +1,73 @@
+"""
+Utility functions for keyword matching of catalog courses.
+"""
+from collections import Counter
+
+
+# How many search terms a KeywordIndex remembers the matching courses of.
+MAX_INDEXED_TERMS = 10000
+
+
+def get_course_keywords_text(course: dict) -> str:
+    """
+    Returns the text of a course that the query keywords are searched in.
+    """
+    return f'Title: {course["title"]}, Skills taught: {", ".join(course["skills"])}'
+
+
+class KeywordIndex:
+    """
+    An inverted index from search terms to the positions of the catalog courses whose keywords text contains
+    them. Course texts are lower-cased once, and the courses of a term are only searched for the first time the
+    term is counted, so counting the keywords of a query is mostly index lookups.
+
+    Terms are matched like ``count_terms_in_description``: case-insensitive substrings of the course text, which
+    is why terms are indexed as they are queried rather than by tokenizing the texts upfront (e.g. "data" is
+    found in "database").
+    """
+
+    def __init__(self, courses: list):
+        self._course_texts = [get_course_keywords_text(course).lower() for course in courses]
+        course_key_counts = Counter(course.get('aggregation_key') for course in courses)
+        # courses without an aggregation key, or sharing one, are not looked up by key
+        self.position_by_course_key = {
+            course['aggregation_key']: position
+            for position, course in enumerate(courses)
+            if course.get('aggregation_key') and course_key_counts[course['aggregation_key']] == 1
+        }
+        self._positions_by_term = {}
+
+    def _get_positions(self, term: str) -> list:
+        """
+        Returns the positions of the courses whose text contains the lower-cased term.
+        """
+        positions = self._positions_by_term.get(term)
+        if positions is None:
+            positions = [position for position, text in enumerate(self._course_texts) if term in text]
+            if len(self._positions_by_term) >= MAX_INDEXED_TERMS:
+                self._positions_by_term.clear()
+            self._positions_by_term[term] = positions
+        return positions
+
+    def count_terms(self, search_terms: list, courses: list) -> list:
+        """
+        Count the number of search terms found in each of the given courses. Courses that are not in the
+        index are searched directly.
+
+        Returns:
+            list: The number of search terms found in each course, in the order of the courses.
+        """
+        search_terms_lower = [term.lower() for term in search_terms]
+        counts_by_position = Counter()
+        for term in search_terms_lower:
+            counts_by_position.update(self._get_positions(term))
+
+        counts = []
+        for course in courses:
+            position = self.position_by_course_key.get(course.get('aggregation_key'))
+            if position is not None:
+                counts.append(counts_by_position[position])
+            else:
+                course_text = get_course_keywords_text(course).lower()
+                counts.append(sum(term in course_text for term in search_terms_lower))
+        return counts
@@ -1,15 +1,47 @@
 """
 Utility functions for communication with OpenAI.
 """
+import hashlib
+import json
 from logging import getLogger
 
 from django.conf import settings
+from django.core.cache import cache
 
 from enterprise_catalog.apps.ai_curation.openai_client import chat_completions
 
 
 LOGGER = getLogger(__name__)
 
+RESPONSE_CACHE_KEY_TPL = 'ai_curation_response:{hash}'
+
+
+def get_response_cache_key(prompt, query, *args):
+    """
+    Returns the cache key of the chat completions response to the given prompt template, for the given query
+    and other prompt arguments. Queries are normalized, so case and spacing do not matter.
+    """
+    normalized_query = ' '.join(query.lower().split())
+    request_hash = hashlib.sha256(json.dumps([prompt, normalized_query, *args]).encode()).hexdigest()
+    return RESPONSE_CACHE_KEY_TPL.format(hash=request_hash)
+
+
+def cached_chat_completions(cache_key, messages):
+    """
+    Returns ``chat_completions(messages=messages)``, from the cache when ``SHOULD_CACHE_AI_CURATION_RESPONSES``
+    is enabled and the same request was already answered.
+    """
+    if not getattr(settings, 'SHOULD_CACHE_AI_CURATION_RESPONSES', False):
+        return chat_completions(messages=messages)
+
+    response = cache.get(cache_key)
+    if response is not None:
+        LOGGER.info('[AI_CURATION] Cached response found. Prompt: [%s]', messages)
+        return response
+    response = chat_completions(messages=messages)
+    cache.set(cache_key, response, settings.AI_CURATION_RESPONSE_CACHE_TIMEOUT)
+    return response
+
 
 def get_filtered_subjects(query, subjects):
     """
@@ -29,7 +61,10 @@ def get_filtered_subjects(query, subjects):
         }
     ]
     LOGGER.info('[AI_CURATION] Filtering subjects. Prompt: [%s]', messages)
-    filtered_subjects = chat_completions(messages=messages)
+    filtered_subjects = cached_chat_completions(
+        get_response_cache_key(settings.AI_CURATION_FILTER_SUBJECTS_PROMPT, query, sorted(subjects)),
+        messages,
+    )
     LOGGER.info('[AI_CURATION] Filtering subjects. Response: [%s]', filtered_subjects)
     return filtered_subjects
 
@@ -51,22 +86,27 @@ def get_query_keywords(query):
         }
     ]
     LOGGER.info('[AI_CURATION] Generating keywords. Prompt: [%s]', messages)
-    keywords = chat_completions(messages=messages)
+    keywords = cached_chat_completions(
+        get_response_cache_key(settings.AI_CURATION_QUERY_TO_KEYWORDS_PROMPT, query),
+        messages,
+    )
     LOGGER.info('[AI_CURATION] Generating keywords. Response: [%s]', keywords)
     return keywords
 
 
-def get_keywords_to_prose(query):
+def get_keywords_to_prose(query, keywords=None):
     """
     Get an expanded version of the query, roughly 100 words in length, stuffed with the keywords
 
     Args:
         query (str): Search query given by the user
+        keywords (list): The keywords of the query, as returned by `get_query_keywords`. Generated if not given.
 
     Returns:
         str: Expanded version of the query
     """
-    keywords = get_query_keywords(query)
+    if keywords is None:
+        keywords = get_query_keywords(query)
     content = settings.AI_CURATION_KEYWORDS_TO_PROSE_PROMPT.format(query=query, keywords=keywords)
     messages = [
         {
@@ -74,7 +114,10 @@ def get_keywords_to_prose(query):
         }
     ]
     LOGGER.info('[AI_CURATION] Generating prose from keywords. Prompt: [%s]', messages)
-    keywords_to_prose = chat_completions(messages=messages)
+    keywords_to_prose = cached_chat_completions(
+        get_response_cache_key(settings.AI_CURATION_KEYWORDS_TO_PROSE_PROMPT, query, keywords),
+        messages,
+    )
     LOGGER.info('[AI_CURATION] Generating prose from keywords. Response: [%s]', keywords_to_prose)
     # keywords_to_prose will always be a list - empty or with a valid prose
     if keywords_to_prose:
@@ -0,0 +1,103 @@
+"""
+Utility functions for TF-IDF scoring of catalog courses.
+"""
+import io
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+
+def get_course_tfidf_text(course: dict) -> str:
+    """
+    Returns the text of a course that is compared with the curation query.
+    """
+    return (
+        f'Title: {course["title"]}, Skills taught: {", ".join(course["skills"])}, Description: '
+        f'{course["short_description"]}, Syllabus: {course["outcome"]}'
+    )
+
+
+class CatalogTfidfIndex:
+    """
+    The TF-IDF vectors of all the courses of a catalog, fitted over all of them, so a query only has to be
+    vectorized and multiplied with the rows of the courses it is scored against.
+    """
+
+    def __init__(self, course_keys, terms, idf, matrix):
+        self.course_keys = list(course_keys)
+        self.row_by_course_key = {course_key: row for row, course_key in enumerate(self.course_keys)}
+        self.terms = terms
+        self.idf = idf
+        self.matrix = sparse.csr_matrix(matrix)
+        self._count_vectorizer = CountVectorizer(vocabulary={term: column for column, term in enumerate(terms)})
+
+    @classmethod
+    def from_courses(cls, courses: list):
+        """
+        Fits the TF-IDF vectors of the given courses, keyed by their aggregation key.
+
+        Returns:
+            CatalogTfidfIndex: The index, or None if the courses have no words to index.
+        """
+        vectorizer = TfidfVectorizer()
+        try:
+            matrix = vectorizer.fit_transform([get_course_tfidf_text(course) for course in courses])
+        except ValueError:
+            # there are no courses, or they only hold stop words
+            return None
+        return cls(
+            [course.get('aggregation_key') or '' for course in courses],
+            vectorizer.get_feature_names_out(),
+            vectorizer.idf_,
+            matrix,
+        )
+
+    @classmethod
+    def from_bytes(cls, content: bytes):
+        """
+        Loads an index serialized by ``to_bytes``.
+        """
+        with np.load(io.BytesIO(content), allow_pickle=False) as arrays:
+            matrix = sparse.csr_matrix(
+                (arrays['data'], arrays['indices'], arrays['indptr']), shape=tuple(arrays['shape']),
+            )
+            # pylint cannot infer that the arrays of an archive are numpy arrays
+            course_keys = arrays['course_keys'].tolist()  # pylint: disable=no-member
+            terms = arrays['terms'].tolist()  # pylint: disable=no-member
+            return cls(course_keys, terms, arrays['idf'], matrix)
+
+    def to_bytes(self) -> bytes:
+        """
+        Serializes the index as a compressed numpy archive.
+        """
+        output = io.BytesIO()
+        np.savez_compressed(
+            output,
+            data=self.matrix.data,
+            indices=self.matrix.indices,
+            indptr=self.matrix.indptr,
+            shape=np.array(self.matrix.shape),
+            idf=self.idf,
+            terms=np.array(self.terms, dtype=str),
+            course_keys=np.array(self.course_keys, dtype=str),
+        )
+        return output.getvalue()
+
+    def get_cosine_similarities(self, search_string: str, courses: list) -> list:
+        """
+        Calculate the cosine similarity between the search string and each of the given courses.
+        Courses that are not in the index score 0.
+
+        Returns:
+            list: List of cosine similarities, in the order of the courses.
+        """
+        rows = [self.row_by_course_key.get(course.get('aggregation_key') or '') for course in courses]
+        indexed_rows = [row for row in rows if row is not None]
+        # same weighting as TfidfVectorizer: raw term counts times idf, l2 normalized
+        query_vector = normalize(sparse.csr_matrix(
+            self._count_vectorizer.transform([search_string]).multiply(self.idf)
+        ))
+        similarities = iter((self.matrix[indexed_rows] @ query_vector.T).toarray().ravel())
+        return [next(similarities) if row is not None else 0.0 for row in rows]
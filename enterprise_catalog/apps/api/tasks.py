@@ -19,7 +19,25 @@ from django.db.utils import OperationalError
 from django_celery_results.models import TaskResult
 from requests.exceptions import ConnectionError as RequestsConnectionError
 
+from enterprise_catalog.apps.ai_curation.tasks import build_catalog_snapshots
+from enterprise_catalog.apps.api.v1.default_catalog_results import (
+    prewarm_default_catalog_results,
+)
+from enterprise_catalog.apps.api.v1.export_artifacts import (
+    clear_export_artifact_pending,
+    generate_export_artifact,
+    get_export_artifact_path,
+    prune_export_artifacts,
+)
+from enterprise_catalog.apps.api_client.constants import (
+    DISCOVERY_SEARCH_ALL_ENDPOINT,
+)
 from enterprise_catalog.apps.api_client.discovery import DiscoveryApiClient
+from enterprise_catalog.apps.api_client.discovery_cache import (
+    discovery_response_cache_enabled,
+    get_discovery_cache_stats,
+    get_or_fetch_discovery_response,
+)
 from enterprise_catalog.apps.catalog.algolia_utils import (
     ALGOLIA_FIELDS,
     ALGOLIA_JSON_METADATA_MAX_SIZE,
@@ -34,6 +52,8 @@ from enterprise_catalog.apps.catalog.algolia_utils import (
     new_search_client_or_error,
     partition_course_keys_for_indexing,
     partition_program_keys_for_indexing,
+    set_global_course_review_avg,
+    update_algolia_index_version,
 )
 from enterprise_catalog.apps.catalog.constants import (
     COURSE,
@@ -54,6 +74,7 @@ from enterprise_catalog.apps.catalog.models import (
     ContentMetadata,
     create_course_associated_programs,
     update_contentmetadata_from_discovery,
+    update_contentmetadata_from_local_evaluation,
 )
 from enterprise_catalog.apps.catalog.serializers import (
     NormalizedContentMetadataSerializer,
@@ -61,6 +82,7 @@ from enterprise_catalog.apps.catalog.serializers import (
 from enterprise_catalog.apps.catalog.utils import (
     batch,
     get_content_filter_hash,
+    get_discovery_content_filter,
     localized_utcnow,
 )
 from enterprise_catalog.apps.video_catalog.models import Video
@@ -180,6 +202,13 @@ class RequiredTaskUnreadyError(Exception):
     """
 
 
+class CatalogQueryGroupUpdateError(Exception):
+    """
+    An exception representing a state where one or more catalog queries of a group
+    could not be updated, while the other catalog queries of the group were.
+    """
+
+
 def expiring_task_semaphore(time_delta=None):
     """
     Celery Task decorator that wraps a bound (bind=True) task.
@@ -258,12 +287,20 @@ def update_full_content_metadata_task(self, force=False, dry_run=False):  # pyli
     """
 
     content_keys = [metadata.content_key for metadata in ContentMetadata.objects.filter(content_type=COURSE)]
-    _update_full_content_metadata_course(content_keys, dry_run)
+    all_course_reviews = _update_full_content_metadata_course(
+        content_keys, dry_run, prefetch_course_reviews=True,
+    ) or {}
+    # Derive the global average rating from the same reviews snapshot rather than rescanning every course record.
+    course_reviews = {key: all_course_reviews[key] for key in content_keys if key in all_course_reviews}
+    if course_reviews and not dry_run:
+        set_global_course_review_avg(course_reviews)
     content_keys = [metadata.content_key for metadata in ContentMetadata.objects.filter(content_type=PROGRAM)]
     _update_full_content_metadata_program(content_keys, dry_run)
+    if discovery_response_cache_enabled():
+        logger.info('Discovery response cache stats after full metadata update: %s', get_discovery_cache_stats())
 
 
-def _update_full_content_metadata_course(content_keys, dry_run=False):
+def _update_full_content_metadata_course(content_keys, dry_run=False, prefetch_course_reviews=False):
     """
     Given content_keys, finds the associated ContentMetadata records with a type of course and looks up the full
     course metadata from discovery's /api/v1/courses endpoint to pad the ContentMetadata objects. The course
@@ -273,13 +310,16 @@ def _update_full_content_metadata_course(content_keys, dry_run=False):
         content_keys (list of str): A list of content keys representing ContentMetadata objects that should have their
             metadata updated with the full Course metadata. This list gets filtered down to only those representing
             Course ContentMetadata objects.
+        prefetch_course_reviews (bool): If true, the complete course reviews dataset is pulled from discovery once
+            (on the first batch with courses) and every batch looks its reviews up in that snapshot, instead of
+            traversing discovery's /course_review/ endpoint once per batch.
 
     Returns:
-        list of str: Returns the course keys that were updated and should be indexed in Algolia
-            by the B2C logic. This is passed to the `index_enterprise_catalog_in_algolia_task` from
-            the `EnterpriseCatalogRefreshDataFromDiscovery` view.
+        dict: When ``prefetch_course_reviews`` is true, the snapshot of all course reviews keyed by course key
+            (None if no batch had any courses). Otherwise None.
     """
     indexable_course_keys = []
+    all_course_reviews = None
     for content_keys_batch in batch(content_keys, batch_size=TASK_BATCH_SIZE):
         full_course_dicts = _fetch_courses_by_keys(content_keys_batch)
         if not full_course_dicts:
@@ -287,7 +327,13 @@ def _update_full_content_metadata_course(content_keys, dry_run=False):
             continue
 
         fetched_course_keys = [course['key'] for course in full_course_dicts]
-        course_reviews_by_content_key = DiscoveryApiClient().get_course_reviews(fetched_course_keys)
+        if prefetch_course_reviews:
+            if all_course_reviews is None:
+                all_course_reviews = DiscoveryApiClient().get_course_reviews()
+                logger.info('Fetched %d course reviews from course-discovery for this run.', len(all_course_reviews))
+            course_reviews_by_content_key = all_course_reviews
+        else:
+            course_reviews_by_content_key = DiscoveryApiClient().get_course_reviews(fetched_course_keys)
         metadata_by_key = _get_course_records_by_key(fetched_course_keys)
 
         # Iterate through the courses to update the json_metadata field,
@@ -337,6 +383,7 @@ def _update_full_content_metadata_course(content_keys, dry_run=False):
     logger.info(
         '{} total course keys were updated and are ready for indexing in Algolia'.format(len(indexable_course_keys))
     )
+    return all_course_reviews
 
 
 def _update_full_restricted_course_metadata(modified_metadata_record, course_review, dry_run):
@@ -1382,6 +1429,22 @@ def _reindex_algolia(indexable_content_keys, nonindexable_content_keys, dry_run=
         algolia_client=algolia_client,
         dry_run=dry_run,
     )
+    if not dry_run:
+        # artifacts derived from the previous index contents (e.g. catalog exports) are now stale
+        index_version = update_algolia_index_version()
+        if getattr(settings, 'SHOULD_CACHE_DEFAULT_CATALOG_RESULTS', False):
+            try:
+                prewarm_default_catalog_results(algolia_client, index_version)
+            except Exception:  # pylint: disable=broad-except
+                # results missing from the cache are searched on demand, so this must not fail the reindex
+                logger.exception(f'{_reindex_algolia_prefix(dry_run)} Could not prewarm default catalog results.')
+        if getattr(settings, 'SHOULD_USE_AI_CURATION_CATALOG_SNAPSHOTS', False):
+            build_catalog_snapshots.delay(index_version)
+        try:
+            prune_export_artifacts(index_version)
+        except Exception:  # pylint: disable=broad-except
+            # stale exports are never served, so failing to delete them must not fail the reindex
+            logger.exception(f'{_reindex_algolia_prefix(dry_run)} Could not prune catalog exports.')
 
 
 @shared_task(base=LoggedTaskWithRetry, bind=True)
@@ -1391,6 +1454,10 @@ def update_catalog_metadata_task(self, catalog_query_id, force=False, dry_run=Fa
     Associates ContentMetadata objects with the appropriate catalog query by pulling data
     from /search/all on discovery.
 
+    With ``settings.SHOULD_EVALUATE_CATALOG_QUERIES_LOCALLY``, queries whose content filter can be
+    evaluated locally are matched against the existing ContentMetadata records instead, and only the
+    remaining queries fall back to discovery.
+
     Args:
         catalog_query_id (str): The id for the catalog query to update.
         force (bool): If true, forces execution of task and ignores time since last run.
@@ -1405,7 +1472,11 @@ def update_catalog_metadata_task(self, catalog_query_id, force=False, dry_run=Fa
         logger.error('Could not find a CatalogQuery with id %s', catalog_query_id)
 
     try:
-        associated_content_keys = update_contentmetadata_from_discovery(catalog_query, dry_run)
+        associated_content_keys = None
+        if getattr(settings, 'SHOULD_EVALUATE_CATALOG_QUERIES_LOCALLY', False):
+            associated_content_keys = update_contentmetadata_from_local_evaluation(catalog_query, dry_run)
+        if associated_content_keys is None:
+            associated_content_keys = update_contentmetadata_from_discovery(catalog_query, dry_run)
     except Exception as e:
         logger.exception(
             f'Something went wrong while updating content metadata from discovery using catalog: {catalog_query_id} '
@@ -1420,6 +1491,73 @@ def update_catalog_metadata_task(self, catalog_query_id, force=False, dry_run=Fa
     )
 
 
+@shared_task(base=LoggedTaskWithRetry, bind=True)
+@expiring_task_semaphore()
+def update_catalog_query_group_metadata_task(
+    self, catalog_query_ids, force=False, dry_run=False,  # pylint: disable=unused-argument
+):
+    """
+    Associates ContentMetadata objects with each catalog query in a group of queries that share
+    the same discovery content filter (see ``group_catalog_queries_by_discovery_filter``), pulling
+    data from /search/all on discovery only once for the whole group.
+
+    Args:
+        catalog_query_ids (list of int): The ids of the catalog queries to update.
+        force (bool): If true, forces execution of task and ignores time since last run.
+    """
+    start_time = time.perf_counter()
+    catalog_queries = list(CatalogQuery.objects.filter(id__in=catalog_query_ids).order_by('id'))
+    if not catalog_queries:
+        logger.error('Could not find any CatalogQuery with ids %s', catalog_query_ids)
+        return
+
+    discovery_content_filter = get_discovery_content_filter(catalog_queries[0].content_filter)
+    discovery_client = DiscoveryApiClient()
+    search_results = get_or_fetch_discovery_response(
+        DISCOVERY_SEARCH_ALL_ENDPOINT,
+        {'content_filter': discovery_content_filter},
+        functools.partial(discovery_client.get_metadata_by_content_filter, discovery_content_filter),
+    )
+
+    # Like independent per-query tasks, a failing query must not keep the rest of the group from being updated.
+    failed_catalog_query_ids = []
+    first_exception = None
+    for catalog_query in catalog_queries:
+        # A query's filter may have been edited since the group was planned; such a query fetches its own results.
+        if get_discovery_content_filter(catalog_query.content_filter) == discovery_content_filter:
+            shared_search_results = search_results
+        else:
+            shared_search_results = None
+        try:
+            associated_content_keys = update_contentmetadata_from_discovery(
+                catalog_query, dry_run, search_results=shared_search_results,
+            )
+        except Exception as e:  # pylint: disable=broad-except
+            logger.exception(
+                f'Something went wrong while updating content metadata from discovery using catalog: '
+                f'{catalog_query.id} after update_catalog_query_group_metadata_task_seconds='
+                f'{time.perf_counter() - start_time} seconds',
+                exc_info=e,
+            )
+            failed_catalog_query_ids.append(catalog_query.id)
+            first_exception = first_exception or e
+            continue
+        logger.info(
+            f'Updated {len(associated_content_keys)} associated content keys for catalog {catalog_query.id} '
+            f'from shared discovery results of catalog query group {catalog_query_ids}'
+        )
+    logger.info(
+        f'Finished update_catalog_query_group_metadata_task for catalogs {catalog_query_ids} '
+        f'with {len(failed_catalog_query_ids)} failed catalogs '
+        f'after update_catalog_query_group_metadata_task_seconds={time.perf_counter() - start_time} seconds'
+    )
+    if failed_catalog_query_ids:
+        raise CatalogQueryGroupUpdateError(
+            f'Could not update content metadata for catalogs {failed_catalog_query_ids} '
+            f'of catalog query group {catalog_query_ids}'
+        ) from first_exception
+
+
 @shared_task(base=LoggedTaskWithRetry, bind=True)
 @expiring_task_semaphore()
 def fetch_missing_course_metadata_task(self, force=False, dry_run=False):  # pylint: disable=unused-argument
@@ -1593,3 +1731,30 @@ def fetch_missing_pathway_metadata_task(self, force=False, dry_run=False):  # py
             pathway.associated_content_metadata.clear()
 
     logger.info('[FETCH_MISSING_METADATA] fetch_missing_pathway_metadata_task execution completed.')
+
+
+@shared_task(base=LoggedTaskWithRetry, bind=True)
+@expiring_task_semaphore()
+def generate_catalog_export_task(  # pylint: disable=unused-argument
+    self, export_format, algolia_query, facets, use_learner_portal_url=False, index_version=None, force=False,
+):
+    """
+    Generates a catalog CSV or XLSX export and stores it in the default storage, for the catalog export
+    endpoints to serve until the Algolia index is rebuilt.
+
+    Args:
+        export_format (str): Either "csv" or "xlsx".
+        algolia_query (str): The Algolia search query.
+        facets (dict): Lists of facet values to filter on, by facet name.
+        use_learner_portal_url (bool): Whether exported links point to the learner portal.
+        index_version (str): The Algolia index version the export is requested for.
+        force (bool): If true, forces execution of task and ignores time since last run.
+    """
+    try:
+        return generate_export_artifact(export_format, algolia_query, facets, use_learner_portal_url, index_version)
+    except Exception:
+        # let the next request for this export enqueue it again, rather than wait for the pending marker to expire
+        clear_export_artifact_pending(
+            get_export_artifact_path(export_format, algolia_query, facets, use_learner_portal_url, index_version)
+        )
+        raise
@@ -10,12 +10,17 @@ from unittest import mock
 import ddt
 from algoliasearch.exceptions import AlgoliaException
 from celery import states
+from django.core.cache import cache
 from django.test import TestCase, override_settings
 from django_celery_results.models import TaskResult
 
 from enterprise_catalog.apps.academy.tests.factories import AcademyFactory
 from enterprise_catalog.apps.api import tasks
 from enterprise_catalog.apps.api.constants import CourseMode
+from enterprise_catalog.apps.api.v1.export_artifacts import (
+    get_export_artifact_path,
+    mark_export_artifact_pending,
+)
 from enterprise_catalog.apps.api_client.discovery import CatalogQueryMetadata
 from enterprise_catalog.apps.catalog.constants import (
     COURSE,
@@ -247,6 +252,124 @@ class UpdateCatalogMetadataTaskTests(TestCase):
         tasks.update_catalog_metadata_task.apply(args=(bad_id,))
         mock_update_data_from_discovery.assert_not_called()
 
+    @override_settings(SHOULD_EVALUATE_CATALOG_QUERIES_LOCALLY=True)
+    @mock.patch('enterprise_catalog.apps.api.tasks.update_contentmetadata_from_discovery')
+    @mock.patch('enterprise_catalog.apps.api.tasks.update_contentmetadata_from_local_evaluation')
+    def test_update_catalog_metadata_locally(self, mock_update_data_locally, mock_update_data_from_discovery):
+        """
+        Assert discovery is not called when the catalog query is evaluated locally.
+        """
+        mock_update_data_locally.return_value = ['edX+DemoX']
+        tasks.update_catalog_metadata_task.apply(args=(self.catalog_query.id, False, False))
+        mock_update_data_locally.assert_called_once_with(self.catalog_query, False)
+        mock_update_data_from_discovery.assert_not_called()
+
+    @override_settings(SHOULD_EVALUATE_CATALOG_QUERIES_LOCALLY=True)
+    @mock.patch('enterprise_catalog.apps.api.tasks.update_contentmetadata_from_discovery')
+    @mock.patch('enterprise_catalog.apps.api.tasks.update_contentmetadata_from_local_evaluation')
+    def test_update_catalog_metadata_locally_falls_back_to_discovery(
+        self, mock_update_data_locally, mock_update_data_from_discovery,
+    ):
+        """
+        Assert discovery is called when the catalog query cannot be evaluated locally.
+        """
+        mock_update_data_locally.return_value = None
+        tasks.update_catalog_metadata_task.apply(args=(self.catalog_query.id, False, False))
+        mock_update_data_locally.assert_called_once_with(self.catalog_query, False)
+        mock_update_data_from_discovery.assert_called_once_with(self.catalog_query, False)
+
+
+class UpdateCatalogQueryGroupMetadataTaskTests(TestCase):
+    """
+    Tests for the `update_catalog_query_group_metadata_task`.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.catalog_query_a = CatalogQueryFactory(content_filter={'content_type': 'course'})
+        cls.catalog_query_b = CatalogQueryFactory(
+            content_filter={
+                'content_type': 'course',
+                'enterprise_force_include_aggregation_keys': ['course:edX+DemoX'],
+            },
+        )
+
+    @mock.patch('enterprise_catalog.apps.api.tasks.update_contentmetadata_from_discovery')
+    @mock.patch('enterprise_catalog.apps.api.tasks.DiscoveryApiClient')
+    def test_update_catalog_query_group_fetches_once(self, mock_client, mock_update_data_from_discovery):
+        """
+        Assert /search/all/ is requested once and its results are shared by every catalog query in the group.
+        """
+        search_results = [{'key': 'edX+DemoX', 'aggregation_key': 'course:edX+DemoX'}]
+        mock_client.return_value.get_metadata_by_content_filter.return_value = search_results
+
+        tasks.update_catalog_query_group_metadata_task.apply(
+            args=([self.catalog_query_a.id, self.catalog_query_b.id], False, False),
+        )
+
+        mock_client.return_value.get_metadata_by_content_filter.assert_called_once_with({'content_type': 'course'})
+        assert mock_update_data_from_discovery.call_args_list == [
+            mock.call(self.catalog_query_a, False, search_results=search_results),
+            mock.call(self.catalog_query_b, False, search_results=search_results),
+        ]
+
+    @mock.patch('enterprise_catalog.apps.api.tasks.update_contentmetadata_from_discovery')
+    @mock.patch('enterprise_catalog.apps.api.tasks.DiscoveryApiClient')
+    def test_update_catalog_query_group_filter_changed(self, mock_client, mock_update_data_from_discovery):
+        """
+        Assert a catalog query whose filter no longer matches the group's fetches its own results.
+        """
+        mock_client.return_value.get_metadata_by_content_filter.return_value = [{'key': 'edX+DemoX'}]
+        self.catalog_query_b.content_filter = {'content_type': 'program'}
+        self.catalog_query_b.save()
+
+        tasks.update_catalog_query_group_metadata_task.apply(
+            args=([self.catalog_query_a.id, self.catalog_query_b.id], False, False),
+        )
+
+        mock_update_data_from_discovery.assert_called_with(self.catalog_query_b, False, search_results=None)
+
+    @mock.patch('enterprise_catalog.apps.api.tasks.update_contentmetadata_from_discovery')
+    @mock.patch('enterprise_catalog.apps.api.tasks.DiscoveryApiClient')
+    def test_update_catalog_query_group_continues_after_failure(self, mock_client, mock_update_data_from_discovery):
+        """
+        Assert a failing catalog query does not keep the rest of the group from being updated,
+        and the task fails afterwards with the failed catalog queries.
+        """
+        mock_client.return_value.get_metadata_by_content_filter.return_value = []
+        mock_update_data_from_discovery.side_effect = [Exception('Something went wrong'), ['course:edX+DemoX']]
+
+        result = tasks.update_catalog_query_group_metadata_task.apply(
+            args=([self.catalog_query_a.id, self.catalog_query_b.id], False, False),
+        )
+
+        assert mock_update_data_from_discovery.call_count == 2
+        assert mock_update_data_from_discovery.call_args.args[0] == self.catalog_query_b
+        assert isinstance(result.result, tasks.CatalogQueryGroupUpdateError)
+        assert str(self.catalog_query_a.id) in str(result.result)
+
+
+class GenerateCatalogExportTaskTests(TestCase):
+    """
+    Tests for the `generate_catalog_export_task`.
+    """
+
+    @mock.patch('enterprise_catalog.apps.api.tasks.generate_export_artifact')
+    def test_failed_export_can_be_requested_again(self, mock_generate_export_artifact):
+        """
+        Assert a failed export job clears the pending marker, so the next request for the export enqueues it again.
+        """
+        cache.clear()
+        mock_generate_export_artifact.side_effect = Exception('Algolia is down')
+        path = get_export_artifact_path('csv', '', {'language': ['English']}, index_version='1')
+        assert mark_export_artifact_pending(path)
+
+        result = tasks.generate_catalog_export_task.apply(args=('csv', '', {'language': ['English']}, False, '1'))
+
+        assert result.failed()
+        assert mark_export_artifact_pending(path)
+
 
 class FetchMissingCourseMetadataTaskTests(TestCase):
     """
@@ -2747,6 +2870,45 @@ class IndexEnterpriseCatalogCoursesInAlgoliaTaskTests(TestCase):
         self.assertEqual(mock_update_content_metadata_program.call_count, 2)
         self.assertEqual(mock_create_course_associated_programs.call_count, 2)
 
+    @mock.patch('enterprise_catalog.apps.api.tasks._fetch_courses_by_keys')
+    @mock.patch('enterprise_catalog.apps.api.tasks.DiscoveryApiClient.get_course_reviews')
+    @mock.patch('enterprise_catalog.apps.api.tasks.create_course_associated_programs')
+    @mock.patch('enterprise_catalog.apps.api.tasks._update_full_content_metadata_program')
+    def test_update_full_content_metadata_course_prefetch_course_reviews(
+        self,
+        mock_update_content_metadata_program,  # pylint: disable=unused-argument
+        mock_create_course_associated_programs,  # pylint: disable=unused-argument
+        mock_get_course_reviews,
+        mock_fetch_courses_by_keys
+    ):
+        """
+        Assert the complete course reviews dataset is fetched once and shared by every batch.
+        """
+        all_course_reviews = {
+            'course1': {'reviews_count': 10, 'avg_course_rating': 4.5},
+            'course2': {'reviews_count': 5, 'avg_course_rating': 3.8},
+            'other-course': {'reviews_count': 1, 'avg_course_rating': 1.0},
+        }
+        content_metadata_1 = ContentMetadataFactory(content_type=COURSE, content_key='course1')
+        content_metadata_2 = ContentMetadataFactory(content_type=COURSE, content_key='course2')
+        mock_fetch_courses_by_keys.side_effect = [
+            [{'key': 'course1', 'title': 'Course 1'}],
+            [{'key': 'course2', 'title': 'Course 2'}],
+        ]
+        mock_get_course_reviews.return_value = all_course_reviews
+
+        with mock.patch('enterprise_catalog.apps.api.tasks.TASK_BATCH_SIZE', 1):
+            returned_course_reviews = tasks._update_full_content_metadata_course(  # pylint: disable=protected-access
+                ['course1', 'course2'], prefetch_course_reviews=True,
+            )
+
+        mock_get_course_reviews.assert_called_once_with()
+        assert returned_course_reviews == all_course_reviews
+        content_metadata_1.refresh_from_db()
+        content_metadata_2.refresh_from_db()
+        assert content_metadata_1.json_metadata.get('reviews_count') == 10
+        assert content_metadata_2.json_metadata.get('avg_course_rating') == 3.8
+
     @mock.patch('enterprise_catalog.apps.api.tasks._fetch_courses_by_keys')
     @mock.patch('enterprise_catalog.apps.api.tasks.DiscoveryApiClient.get_course_reviews')
     @mock.patch('enterprise_catalog.apps.api.tasks.ContentMetadata.objects.filter')
@@ -0,0 +1,145 @@
+"""
+Default catalog results: the top Algolia results of a catalog, shown by the learner portal when
+a search has no query yet.
+
+Results only depend on the catalog title and the learning type facets, and only change when the
+Algolia index is rebuilt, so they are cached by those facets and the Algolia index version.
+"""
+import hashlib
+import json
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+from enterprise_catalog.apps.catalog.algolia_utils import (
+    get_algolia_index_version,
+    get_initialized_algolia_client,
+)
+from enterprise_catalog.apps.catalog.models import CatalogQuery
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CATALOG_RESULTS_CACHE_KEY_TPL = 'default_catalog_results:{index_version}:{hash}'
+DEFAULT_CATALOG_RESULTS_HITS_PER_PAGE = 4
+DEFAULT_CATALOG_RESULTS_ATTRIBUTES = [
+    'title',
+    'key',
+    'content_type',
+    'partners',
+    'advertised_course_run',
+    'programs',
+    'program_titles',
+    'level_type',
+    'language',
+    'transcript_languages',
+    'short_description',
+    'subjects',
+    'aggregation_key',
+    'skills',
+    'skill_names',
+    'first_enrollable_paid_seat_price',
+    'marketing_url',
+    'upcoming_course_runs',
+    'type',
+    'recent_enrollment_count',
+    'original_image_url',
+    'full_description',
+    'enterprise_catalog_query_uuids',
+    'enterprise_catalog_query_titles',
+    'card_image_url',
+    'availability',
+    'program_type',
+    'course_keys',
+    'authoring_organizations',
+]
+
+
+def get_default_catalog_results_cache_key(catalog_query_title, learning_type, learning_type_v2=None,
+                                          index_version=None):
+    """
+    Returns the cache key of the default results for the given facets, for the given (or current) index version.
+    """
+    if index_version is None:
+        index_version = get_algolia_index_version()
+    facets = {
+        'enterprise_catalog_query_titles': catalog_query_title,
+        'learning_type': learning_type,
+        'learning_type_v2': learning_type_v2,
+    }
+    facets_hash = hashlib.sha256(json.dumps(facets, sort_keys=True).encode()).hexdigest()
+    return DEFAULT_CATALOG_RESULTS_CACHE_KEY_TPL.format(index_version=index_version, hash=facets_hash)
+
+
+def search_default_catalog_results(algolia_client, catalog_query_title, learning_type, learning_type_v2=None):
+    """
+    Searches Algolia for the default results of the given catalog title and learning type.
+
+    Returns:
+        list: The Algolia hits.
+    """
+    catalog_filter = [
+        f'enterprise_catalog_query_titles:{catalog_query_title}',
+        f'learning_type:{learning_type}'
+    ]
+
+    if learning_type_v2:
+        # if we have the v2 learning type, replace the original learning type
+        catalog_filter[1] = f'learning_type_v2:{learning_type_v2}'
+
+    search_options = {
+        'facetFilters': catalog_filter,
+        'attributesToRetrieve': DEFAULT_CATALOG_RESULTS_ATTRIBUTES,
+        'hitsPerPage': DEFAULT_CATALOG_RESULTS_HITS_PER_PAGE,
+        'page': 0,
+    }
+    page = algolia_client.algolia_index.search('', search_options)
+    return page.get('hits')
+
+
+def get_default_catalog_results(catalog_query_title, learning_type, learning_type_v2=None):
+    """
+    Returns the default results of the given catalog title and learning type, from the cache when
+    ``SHOULD_CACHE_DEFAULT_CATALOG_RESULTS`` is enabled and they were already searched for the current index.
+    """
+    if not getattr(settings, 'SHOULD_CACHE_DEFAULT_CATALOG_RESULTS', False):
+        return search_default_catalog_results(
+            get_initialized_algolia_client(), catalog_query_title, learning_type, learning_type_v2,
+        )
+
+    cache_key = get_default_catalog_results_cache_key(catalog_query_title, learning_type, learning_type_v2)
+    hits = cache.get(cache_key)
+    if hits is None:
+        hits = search_default_catalog_results(
+            get_initialized_algolia_client(), catalog_query_title, learning_type, learning_type_v2,
+        )
+        cache.set(cache_key, hits, settings.DEFAULT_CATALOG_RESULTS_CACHE_TIMEOUT)
+    return hits
+
+
+def prewarm_default_catalog_results(algolia_client, index_version):
+    """
+    Caches the default results of every known catalog title, for each of the
+    ``DEFAULT_CATALOG_RESULTS_PREWARM_LEARNING_TYPES``, for the given index version.
+
+    Returns:
+        int: The number of cached results.
+    """
+    catalog_query_titles = CatalogQuery.objects.exclude(
+        title__isnull=True,
+    ).exclude(
+        title='',
+    ).values_list('title', flat=True).distinct()
+
+    cached_count = 0
+    for catalog_query_title in catalog_query_titles:
+        for learning_type in settings.DEFAULT_CATALOG_RESULTS_PREWARM_LEARNING_TYPES:
+            hits = search_default_catalog_results(algolia_client, catalog_query_title, learning_type)
+            cache_key = get_default_catalog_results_cache_key(
+                catalog_query_title, learning_type, index_version=index_version,
+            )
+            cache.set(cache_key, hits, settings.DEFAULT_CATALOG_RESULTS_CACHE_TIMEOUT)
+            cached_count += 1
+    logger.info('Prewarmed %s default catalog results for Algolia index version %s.', cached_count, index_version)
+    return cached_count
@@ -0,0 +1,181 @@
+"""
+Catalog export artifacts: CSV and XLSX exports generated in the background and kept in the default storage.
+
+An artifact is identified by its export format, its normalized search (query, facets and options) and the
+Algolia index version it was generated from, so it is reused until the index is rebuilt.
+"""
+import csv
+import hashlib
+import io
+import itertools
+import json
+import logging
+import tempfile
+
+import xlsxwriter
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from enterprise_catalog.apps.api.v1 import export_utils
+from enterprise_catalog.apps.api_client.discovery import DiscoveryApiClient
+from enterprise_catalog.apps.catalog.algolia_utils import (
+    get_algolia_index_version,
+    get_initialized_algolia_client,
+)
+
+
+logger = logging.getLogger(__name__)
+
+CSV_EXPORT_FORMAT = 'csv'
+XLSX_EXPORT_FORMAT = 'xlsx'
+EXPORT_CONTENT_TYPES = {
+    CSV_EXPORT_FORMAT: 'text/csv;charset=utf-8',
+    XLSX_EXPORT_FORMAT: 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+EXPORT_ARTIFACTS_DIRECTORY = 'catalog-exports'
+EXPORT_PENDING_CACHE_KEY_TPL = 'catalog_export_pending:{path}'
+EMPTY_EXPORT_ARTIFACT_SUFFIX = '.empty'
+
+
+def get_export_artifact_path(export_format, algolia_query, facets, use_learner_portal_url=False, index_version=None):
+    """
+    Returns the default storage path of the artifact for the given export, for the given (or current) index version.
+
+    Facets are normalized first, so the order of facets and of their values does not change the path.
+    """
+    if index_version is None:
+        index_version = get_algolia_index_version()
+    normalized_export = {
+        'query': algolia_query,
+        'facets': {facet_name: sorted(set(facet_values)) for facet_name, facet_values in facets.items()},
+        'use_learner_portal_url': bool(use_learner_portal_url),
+    }
+    export_hash = hashlib.sha256(json.dumps(normalized_export, sort_keys=True).encode()).hexdigest()
+    return f'{EXPORT_ARTIFACTS_DIRECTORY}/{index_version}/{export_hash}.{export_format}'
+
+
+def get_empty_export_artifact_path(path):
+    """
+    Returns the default storage path of the marker stored instead of the artifact at ``path``
+    when a workbook export finds no content.
+    """
+    return f'{path}{EMPTY_EXPORT_ARTIFACT_SUFFIX}'
+
+
+def is_empty_export_artifact(path):
+    return path.endswith(EMPTY_EXPORT_ARTIFACT_SUFFIX)
+
+
+def mark_export_artifact_pending(path):
+    """
+    Records that generation of the artifact at ``path`` has been requested. Returns False if it already was,
+    within ``CATALOG_EXPORT_PENDING_TIMEOUT`` seconds, so callers only enqueue one export job per artifact.
+    """
+    return cache.add(EXPORT_PENDING_CACHE_KEY_TPL.format(path=path), True, settings.CATALOG_EXPORT_PENDING_TIMEOUT)
+
+
+def clear_export_artifact_pending(path):
+    """
+    Forgets that generation of the artifact at ``path`` was requested, so the next request enqueues it again.
+    """
+    cache.delete(EXPORT_PENDING_CACHE_KEY_TPL.format(path=path))
+
+
+def prune_export_artifacts(index_version):
+    """
+    Deletes the artifacts of every Algolia index version other than the given one and the current one,
+    which are never served again.
+
+    Returns:
+        int: The number of files deleted.
+    """
+    kept_index_versions = {index_version, get_algolia_index_version()}
+    try:
+        index_versions, _ = default_storage.listdir(EXPORT_ARTIFACTS_DIRECTORY)
+    except FileNotFoundError:
+        # no export has been saved yet
+        return 0
+
+    deleted_count = 0
+    for old_index_version in set(index_versions) - kept_index_versions:
+        directory = f'{EXPORT_ARTIFACTS_DIRECTORY}/{old_index_version}'
+        _, file_names = default_storage.listdir(directory)
+        for file_name in file_names:
+            default_storage.delete(f'{directory}/{file_name}')
+            deleted_count += 1
+        logger.info('Deleted %s catalog exports of index version %s.', len(file_names), old_index_version)
+    return deleted_count
+
+
+def _save_export_artifact(path, content):
+    """
+    Saves the content at the given path. When a concurrent job saved the same path first, the storage saves
+    this copy under a suffixed name instead, which is deleted: both jobs generated the same export, and
+    requests only ever look up the unsuffixed path.
+    """
+    saved_path = default_storage.save(path, content)
+    if saved_path != path:
+        default_storage.delete(saved_path)
+    return path
+
+
+def _write_csv_export(output, algolia_query, facets):
+    # a leading BOM (utf-8-sig) makes the file excel-compatible with UTF-8 content
+    text_output = io.TextIOWrapper(output, encoding='utf-8-sig', newline='')
+    writer = csv.writer(text_output)
+    writer.writerow(export_utils.CSV_COURSE_HEADERS)
+    rows = export_utils.iter_course_csv_rows(
+        get_initialized_algolia_client(), DiscoveryApiClient(), facets, algolia_query,
+    )
+    for row in rows:
+        writer.writerow(row)
+    text_output.flush()
+    text_output.detach()
+
+
+def _write_xlsx_export(output, algolia_query, facets, use_learner_portal_url):
+    """
+    Writes the workbook export into ``output``, and returns False without writing anything if there are no hits.
+    """
+    hits = export_utils.get_workbook_hits(get_initialized_algolia_client().algolia_index, algolia_query, facets)
+    first_hit = next(hits, None)
+    if first_hit is None:
+        return False
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+    export_utils.write_hits_to_workbook(workbook, itertools.chain([first_hit], hits), use_learner_portal_url)
+    workbook.close()
+    return True
+
+
+def generate_export_artifact(export_format, algolia_query, facets, use_learner_portal_url=False, index_version=None):
+    """
+    Generates the given export into a temporary file and saves it in the default storage,
+    unless the artifact already exists. A workbook export without any content is saved as an
+    empty marker instead (see ``get_empty_export_artifact_path``).
+
+    Returns:
+        str: The default storage path of the artifact (or of the empty marker).
+    """
+    path = get_export_artifact_path(export_format, algolia_query, facets, use_learner_portal_url, index_version)
+    for existing_path in (path, get_empty_export_artifact_path(path)):
+        if default_storage.exists(existing_path):
+            logger.info('Catalog export %s already exists, not generating it again.', existing_path)
+            return existing_path
+
+    with tempfile.TemporaryFile() as output:
+        if export_format == CSV_EXPORT_FORMAT:
+            _write_csv_export(output, algolia_query, facets)
+        elif export_format == XLSX_EXPORT_FORMAT:
+            if not _write_xlsx_export(output, algolia_query, facets, use_learner_portal_url):
+                empty_path = _save_export_artifact(get_empty_export_artifact_path(path), ContentFile(b''))
+                logger.info('Catalog export %s found no content.', empty_path)
+                return empty_path
+        else:
+            raise ValueError(f'Unknown catalog export format: {export_format}')
+        output.seek(0)
+        _save_export_artifact(path, File(output))
+    logger.info('Generated catalog export %s.', path)
+    return path
@@ -1,11 +1,16 @@
 import datetime
 import logging
 import math
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 from dateutil import parser
+from django.conf import settings
 from django.utils.html import strip_tags
 
 from enterprise_catalog.apps.catalog.algolia_utils import ALGOLIA_INDEX_SETTINGS
+from enterprise_catalog.apps.catalog.constants import COURSE
+from enterprise_catalog.apps.catalog.models import ContentMetadata
 
 
 logger = logging.getLogger(__name__)
@@ -138,6 +143,73 @@ def write_headers_to_sheet(worksheet, headers, cell_format):
         worksheet.write(0, col_num, cell_data, cell_format)
 
 
+def write_row_data(row, worksheet, row_num):
+    """
+    Helper function to write a given row of cells into a given worksheet, returning the next row number.
+    """
+    for col_num, cell_data in enumerate(row):
+        worksheet.write(row_num, col_num, cell_data)
+    return row_num + 1
+
+
+def write_hits_to_workbook(workbook, hits, use_learner_portal_url=False):
+    """
+    Writes Algolia catalog hits into the worksheets of ``workbook``, one worksheet per kind of content.
+
+    Rows are only ever appended to a worksheet, so this works with xlsxwriter's ``constant_memory`` mode.
+    """
+    header_format = workbook.add_format({'bold': True})
+
+    # content row index, starting at 1 which is after header row
+    course_row_num = 1
+    program_row_num = 1
+    course_run_row_num = 1
+    exec_ed_row_num = 1
+    exec_ed_results_found = False
+    edx_course_results_found = False
+    edx_program_results_found = False
+    course_run_results_found = False
+    for hit in hits:
+        if hit.get('content_type') == 'course':
+            is_exec_ed = hit.get('course_type') == 'executive-education-2u'
+            if is_exec_ed:
+                if not exec_ed_results_found:
+                    exec_ed_results_found = True
+                    exec_ed_worksheet = workbook.add_worksheet('Executive Education')
+                    write_headers_to_sheet(
+                        exec_ed_worksheet, CSV_EXEC_ED_COURSE_HEADERS, header_format
+                    )
+                course_row = exec_ed_course_to_row(hit, use_learner_portal_url)
+                exec_ed_row_num = write_row_data(course_row, exec_ed_worksheet, exec_ed_row_num)
+            else:
+                if not edx_course_results_found:
+                    edx_course_results_found = True
+                    course_worksheet = workbook.add_worksheet('Courses')
+                    write_headers_to_sheet(
+                        course_worksheet, CSV_COURSE_HEADERS, header_format
+                    )
+                course_row = course_hit_to_row(hit, use_learner_portal_url)
+                course_row_num = write_row_data(course_row, course_worksheet, course_row_num)
+            for course_run in course_hit_runs(hit):
+                if not course_run_results_found:
+                    course_run_results_found = True
+                    course_run_worksheet = workbook.add_worksheet('Course Runs')
+                    write_headers_to_sheet(
+                        course_run_worksheet, CSV_COURSE_RUN_HEADERS, header_format
+                    )
+                course_run_row = course_run_to_row(hit, course_run)
+                course_run_row_num = write_row_data(course_run_row, course_run_worksheet, course_run_row_num)
+        if hit.get('content_type') == 'program':
+            if not edx_program_results_found:
+                edx_program_results_found = True
+                program_worksheet = workbook.add_worksheet('Programs')
+                write_headers_to_sheet(
+                    program_worksheet, CSV_PROGRAM_HEADERS, header_format
+                )
+            program_row = program_hit_to_row(hit, use_learner_portal_url)
+            program_row_num = write_row_data(program_row, program_worksheet, program_row_num)
+
+
 def fetch_catalog_types(hit):
     """
     Helper function to extract only the three needed catalog types.
@@ -466,3 +538,180 @@ def validate_query_facets(facets):
         if facet not in get_valid_facets():
             invalid_facets.append(facet)
     return invalid_facets
+
+
+def facets_to_facet_filters(facets):
+    """
+    Helper function to turn a dict of facet values into Algolia `facetFilters`: distinct facets are
+    combined with AND, multiple values of the same facet with OR.
+    """
+    facet_filters = []
+    for facet_name, facet_values in facets.items():
+        facet_filters.append([f'{facet_name}:{facet_value}' for facet_value in facet_values])
+    return facet_filters
+
+
+def iter_algolia_hits(algolia_index, algolia_query, facets, hits_per_page=100):
+    """
+    Yields every hit for the given query and facets, searching the index one page at a time.
+    """
+    search_options = {
+        'facetFilters': facets_to_facet_filters(facets),
+        'attributesToRetrieve': ALGOLIA_ATTRIBUTES_TO_RETRIEVE,
+        'hitsPerPage': hits_per_page,
+        'page': 0,
+    }
+    # Algolia search will only retrieve all results if you query by empty string.
+    page = algolia_index.search(algolia_query, search_options)
+    while len(page['hits']) > 0:
+        yield from page['hits']
+        search_options['page'] = search_options['page'] + 1
+        page = algolia_index.search(algolia_query, search_options)
+
+
+def browse_algolia_hits(algolia_index, algolia_query, facets, hits_per_page=1000):
+    """
+    Yields every hit for the given query and facets using Algolia's browse iteration, which fetches
+    up to 1000 hits per request and is not subject to the index's pagination limit.
+    """
+    return iter(algolia_index.browse_objects({
+        'query': algolia_query,
+        'facetFilters': facets_to_facet_filters(facets),
+        'attributesToRetrieve': ALGOLIA_ATTRIBUTES_TO_RETRIEVE,
+        'hitsPerPage': hits_per_page,
+    }))
+
+
+def get_workbook_hits(algolia_index, algolia_query, facets):
+    """
+    Yields the hits for a catalog workbook export, browsing the index when
+    ``SHOULD_STREAM_CATALOG_WORKBOOK_EXPORTS`` is enabled and paging through search results otherwise.
+    """
+    if getattr(settings, 'SHOULD_STREAM_CATALOG_WORKBOOK_EXPORTS', False):
+        return browse_algolia_hits(
+            algolia_index, algolia_query, facets, hits_per_page=settings.CATALOG_EXPORT_BROWSE_HITS_PER_PAGE,
+        )
+    return iter_algolia_hits(algolia_index, algolia_query, facets)
+
+
+def _get_course_keys(course_hits):
+    return [hit.get('key') for hit in course_hits if hit.get('key')]
+
+
+def get_local_courses_by_key(hits):
+    """
+    Returns the discovery course JSON stored in ``ContentMetadata`` for the course hits of one page of
+    Algolia hits, by course key, in a single query. Returns nothing unless
+    ``SHOULD_ENRICH_CATALOG_EXPORTS_LOCALLY`` is enabled.
+    """
+    if not getattr(settings, 'SHOULD_ENRICH_CATALOG_EXPORTS_LOCALLY', False):
+        return {}
+    course_keys = _get_course_keys([hit for hit in hits if hit.get('content_type') == COURSE])
+    if not course_keys:
+        return {}
+    # only load the key and metadata columns, without instantiating models
+    return dict(
+        ContentMetadata.objects.filter(
+            content_type=COURSE,
+            content_key__in=course_keys,
+        ).values_list('content_key', '_json_metadata')
+    )
+
+
+def enrich_course_hits(discovery_client, hits, local_courses_by_key=None):
+    """
+    Returns the course hits of one page of Algolia hits, each combined with extra, non-indexed fields
+    (as ``discovery_course``) from ``local_courses_by_key`` or, for courses missing from it, from discovery.
+    """
+    # ignore program data (for now)
+    course_hits = [hit for hit in hits if hit.get('content_type') == COURSE]
+
+    # build a lookup dictionary for efficient lookup when combining
+    course_by_key = dict(local_courses_by_key or {})
+    missing_course_keys = [key for key in _get_course_keys(course_hits) if key not in course_by_key]
+    if len(missing_course_keys) > 0:
+        query_params = {'keys': ','.join(missing_course_keys)}
+        courses = discovery_client.get_courses(query_params=query_params)
+        for course in courses:
+            course_by_key[course.get('key')] = course
+
+    # combine discovery metadata with the algolia results
+    for hit in course_hits:
+        if course_by_key.get(hit.get('key')):
+            hit['discovery_course'] = course_by_key.get(hit.get('key'))
+    return course_hits
+
+
+def _iter_enriched_course_hits(algolia_index, discovery_client, algolia_query, search_options):
+    # Algolia search will only retrieve all results if you query by empty string.
+    page = algolia_index.search(algolia_query, search_options)
+    while len(page['hits']) > 0:
+        yield from enrich_course_hits(discovery_client, page['hits'], get_local_courses_by_key(page['hits']))
+        search_options['page'] = search_options['page'] + 1
+        page = algolia_index.search(algolia_query, search_options)
+
+
+def _iter_pipelined_enriched_course_hits(algolia_index, discovery_client, algolia_query, search_options, depth):
+    """
+    Same as ``_iter_enriched_course_hits``, but while the hits of page N-1 are consumed, the search for page N+1
+    and the discovery enrichment of page N run in background threads. At most ``depth`` enriched pages wait
+    to be consumed, which caps memory use.
+    """
+    # one thread each, so searches happen in page order and discovery only sees one request at a time
+    search_executor = ThreadPoolExecutor(max_workers=1)
+    enrichment_executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        page_number = search_options['page']
+        search_future = search_executor.submit(algolia_index.search, algolia_query, dict(search_options))
+        enriched_pages = deque()
+        while True:
+            hits = search_future.result()['hits']
+            if len(hits) == 0:
+                break
+            page_number += 1
+            search_future = search_executor.submit(
+                algolia_index.search, algolia_query, {**search_options, 'page': page_number},
+            )
+            # the local lookup stays in this thread, which owns the database connection
+            enriched_pages.append(enrichment_executor.submit(
+                enrich_course_hits, discovery_client, hits, get_local_courses_by_key(hits),
+            ))
+            while len(enriched_pages) > depth:
+                yield from enriched_pages.popleft().result()
+        while enriched_pages:
+            yield from enriched_pages.popleft().result()
+    finally:
+        # don't start work nobody will consume if the caller stops early, e.g. when a download is cancelled
+        search_executor.shutdown(cancel_futures=True)
+        enrichment_executor.shutdown(cancel_futures=True)
+
+
+def iter_course_csv_rows(algolia_client, discovery_client, facets, algolia_query):
+    """
+    Yields a CSV row for every course hit for the given query and facets, after combining
+    each page of hits with extra, non-indexed fields from discovery (or, with
+    ``SHOULD_ENRICH_CATALOG_EXPORTS_LOCALLY`` enabled, from the locally stored content metadata).
+
+    With ``SHOULD_PIPELINE_CATALOG_CSV_EXPORTS`` enabled, Algolia paging and discovery enrichment
+    overlap with each other and with the consumption of rows.
+    """
+    search_options = {
+        'facetFilters': facets_to_facet_filters(facets),
+        'attributesToRetrieve': ALGOLIA_ATTRIBUTES_TO_RETRIEVE,
+        'hitsPerPage': 100,
+        'page': 0,
+    }
+    if getattr(settings, 'SHOULD_PIPELINE_CATALOG_CSV_EXPORTS', False):
+        course_hits = _iter_pipelined_enriched_course_hits(
+            algolia_client.algolia_index,
+            discovery_client,
+            algolia_query,
+            search_options,
+            settings.CATALOG_CSV_EXPORT_PIPELINE_DEPTH,
+        )
+    else:
+        course_hits = _iter_enriched_course_hits(
+            algolia_client.algolia_index, discovery_client, algolia_query, search_options,
+        )
+    for hit in course_hits:
+        yield hit_to_row(hit)
@@ -0,0 +1,93 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from enterprise_catalog.apps.api.v1 import default_catalog_results
+from enterprise_catalog.apps.catalog.algolia_utils import (
+    update_algolia_index_version,
+)
+from enterprise_catalog.apps.catalog.tests.factories import CatalogQueryFactory
+
+
+MOCK_HITS = {'hits': [{'aggregation_key': 'course:edX+course', 'key': 'edX+course', 'title': 'A course'}]}
+
+
+@override_settings(SHOULD_CACHE_DEFAULT_CATALOG_RESULTS=True)
+class DefaultCatalogResultsTests(TestCase):
+    """
+    Tests for the cached default catalog results.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_search_facet_filters(self):
+        algolia_client = mock.Mock()
+        algolia_client.algolia_index.search.return_value = MOCK_HITS
+
+        default_catalog_results.search_default_catalog_results(algolia_client, 'A la carte', 'course')
+        default_catalog_results.search_default_catalog_results(
+            algolia_client, 'A la carte', 'course', learning_type_v2='Executive Education',
+        )
+
+        first_call, second_call = algolia_client.algolia_index.search.call_args_list
+        assert first_call.args[1]['facetFilters'] == [
+            'enterprise_catalog_query_titles:A la carte', 'learning_type:course',
+        ]
+        assert second_call.args[1]['facetFilters'] == [
+            'enterprise_catalog_query_titles:A la carte', 'learning_type_v2:Executive Education',
+        ]
+
+    @mock.patch('enterprise_catalog.apps.api.v1.default_catalog_results.get_initialized_algolia_client')
+    def test_results_cached_until_reindex(self, mock_algolia_client):
+        """
+        Test results are only searched once per facets and index version
+        """
+        mock_search = mock_algolia_client.return_value.algolia_index.search
+        mock_search.return_value = MOCK_HITS
+
+        for _ in range(2):
+            hits = default_catalog_results.get_default_catalog_results('A la carte', 'course')
+            assert hits == MOCK_HITS['hits']
+        assert mock_search.call_count == 1
+
+        default_catalog_results.get_default_catalog_results('A la carte', 'program')
+        default_catalog_results.get_default_catalog_results('A la carte', 'course', 'Executive Education')
+        assert mock_search.call_count == 3
+
+        update_algolia_index_version()
+        default_catalog_results.get_default_catalog_results('A la carte', 'course')
+        assert mock_search.call_count == 4
+
+    @override_settings(SHOULD_CACHE_DEFAULT_CATALOG_RESULTS=False)
+    @mock.patch('enterprise_catalog.apps.api.v1.default_catalog_results.get_initialized_algolia_client')
+    def test_results_not_cached(self, mock_algolia_client):
+        mock_search = mock_algolia_client.return_value.algolia_index.search
+        mock_search.return_value = MOCK_HITS
+
+        for _ in range(2):
+            default_catalog_results.get_default_catalog_results('A la carte', 'course')
+        assert mock_search.call_count == 2
+
+    @override_settings(DEFAULT_CATALOG_RESULTS_PREWARM_LEARNING_TYPES=['course', 'program'])
+    @mock.patch('enterprise_catalog.apps.api.v1.default_catalog_results.get_initialized_algolia_client')
+    def test_prewarm(self, mock_algolia_client):
+        """
+        Test results of every catalog title are cached for the new index version
+        """
+        CatalogQueryFactory(title='A la carte')
+        CatalogQueryFactory(title='Subscriptions')
+        CatalogQueryFactory(title=None)
+        algolia_client = mock.Mock()
+        algolia_client.algolia_index.search.return_value = MOCK_HITS
+
+        index_version = update_algolia_index_version()
+        assert default_catalog_results.prewarm_default_catalog_results(algolia_client, index_version) == 4
+
+        for catalog_query_title in ('A la carte', 'Subscriptions'):
+            for learning_type in ('course', 'program'):
+                hits = default_catalog_results.get_default_catalog_results(catalog_query_title, learning_type)
+                assert hits == MOCK_HITS['hits']
+        mock_algolia_client.assert_not_called()
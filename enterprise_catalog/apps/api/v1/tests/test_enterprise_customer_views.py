@@ -1,6 +1,7 @@
 import uuid
 from datetime import datetime, timedelta
 from unittest import mock
+from urllib.parse import urlencode
 
 import pytz
 from algoliasearch.exceptions import AlgoliaException
@@ -10,6 +11,7 @@ from rest_framework import status
 from enterprise_catalog.apps.api.base.tests.enterprise_customer_views import (
     BaseEnterpriseCustomerViewSetTests,
 )
+from enterprise_catalog.apps.catalog.models import ContentAssociationChange
 from enterprise_catalog.apps.catalog.tests.factories import (
     ContentMetadataFactory,
     EnterpriseCatalogFactory,
@@ -205,6 +207,84 @@ class EnterpriseCustomerViewSetTests(BaseEnterpriseCustomerViewSetTests):
         assert not response.data.get('items_found')
         assert not response.data.get('items_not_included')
 
+    @mock.patch('enterprise_catalog.apps.api_client.enterprise_cache.EnterpriseApiClient')
+    def test_generate_diff_pages_items_not_included(self, mock_api_client):
+        """
+        Test that the generate_diff endpoint pages `items_not_included` in content key order with a cursor.
+        """
+        mock_api_client.return_value.get_enterprise_customer.return_value = {
+            'slug': self.enterprise_slug,
+            'enable_learner_portal': True,
+            'modified': str(datetime.now().replace(tzinfo=pytz.UTC)),
+        }
+        contents = [ContentMetadataFactory(content_key=f'edX+Course{index}') for index in range(5)]
+        self.add_metadata_to_catalog(self.enterprise_catalog, contents)
+        url = self._get_generate_diff_base_url()
+        content_keys = [contents[1].content_key, 'bad+key']
+
+        response = self.client.post(url + '?page_size=2', {'content_keys': content_keys})
+        assert response.status_code == 200
+        assert response.data['items_not_included'] == [{'content_key': 'edX+Course0'}, {'content_key': 'edX+Course2'}]
+        assert response.data['items_not_found'] == [{'content_key': 'bad+key'}]
+        assert [item['content_key'] for item in response.data['items_found']] == ['edX+Course1']
+        assert response.data['next_cursor'] == 'edX+Course2'
+        assert not response.data['since_applied']
+
+        next_cursor = response.data['next_cursor']
+        response = self.client.post(
+            url + '?' + urlencode({'page_size': 2, 'cursor': next_cursor}), {'content_keys': content_keys},
+        )
+        assert response.data['items_not_included'] == [{'content_key': 'edX+Course3'}, {'content_key': 'edX+Course4'}]
+        response = self.client.post(
+            url + '?' + urlencode({'page_size': 2, 'cursor': response.data['next_cursor']}),
+            {'content_keys': content_keys},
+        )
+        assert response.data['items_not_included'] == []
+        assert response.data['next_cursor'] is None
+
+        # without a page size, the rest of the listing is returned at once
+        response = self.client.post(url + '?' + urlencode({'cursor': next_cursor}), {'content_keys': content_keys})
+        assert response.data['items_not_included'] == [{'content_key': 'edX+Course3'}, {'content_key': 'edX+Course4'}]
+        assert response.data['next_cursor'] is None
+
+        response = self.client.post(url + '?page_size=0', {'content_keys': content_keys})
+        assert response.status_code == 400
+
+    @override_settings(SHOULD_RECORD_CONTENT_ASSOCIATION_CHANGES=True)
+    @mock.patch('enterprise_catalog.apps.api_client.enterprise_cache.EnterpriseApiClient')
+    def test_generate_diff_since(self, mock_api_client):
+        """
+        Test that the generate_diff endpoint only returns content modified or associated after `since`.
+        """
+        since = self.enterprise_catalog.modified + timedelta(minutes=1)
+        mock_api_client.return_value.get_enterprise_customer.return_value = {
+            'slug': self.enterprise_slug,
+            'enable_learner_portal': True,
+            'modified': str(since - timedelta(days=1)),
+        }
+        unchanged_content = ContentMetadataFactory(content_key='edX+Unchanged', modified=since - timedelta(days=1))
+        modified_content = ContentMetadataFactory(content_key='edX+Modified', modified=since + timedelta(hours=1))
+        associated_content = ContentMetadataFactory(content_key='edX+Associated', modified=since - timedelta(days=1))
+        self.add_metadata_to_catalog(self.enterprise_catalog, [unchanged_content, modified_content, associated_content])
+        ContentAssociationChange.record_changes(self.enterprise_catalog.catalog_query, ['edX+Associated'], [])
+        ContentAssociationChange.objects.update(created=since + timedelta(hours=1))
+        url = self._get_generate_diff_base_url() + f'?since={since.strftime("%Y-%m-%dT%H:%M:%S.%fZ")}'
+
+        response = self.client.post(url)
+        assert response.status_code == 200
+        assert response.data['since_applied']
+        assert response.data['items_not_included'] == [
+            {'content_key': 'edX+Associated'}, {'content_key': 'edX+Modified'},
+        ]
+
+        with override_settings(SHOULD_RECORD_CONTENT_ASSOCIATION_CHANGES=False):
+            response = self.client.post(url)
+        assert not response.data['since_applied']
+        assert len(response.data['items_not_included']) == 3
+
+        response = self.client.post(self._get_generate_diff_base_url() + '?since=yesterday')
+        assert response.status_code == 400
+
     def test_contains_content_items_unauthorized_non_catalog_learner(self):
         """
         Verify the contains_content_items endpoint rejects users that are not catalog learners
@@ -344,6 +424,78 @@ class EnterpriseCustomerViewSetTests(BaseEnterpriseCustomerViewSetTests):
         catalog_list = response.json()['catalog_list']
         assert catalog_list == []
 
+    def test_get_content_metadata_from_first_containing_catalog(self):
+        """
+        Verify the customer content metadata endpoint only looks up the content in the oldest catalog containing it,
+        by content key and by content uuid.
+        """
+        second_catalog = EnterpriseCatalogFactory(enterprise_uuid=self.enterprise_uuid)
+        third_catalog = EnterpriseCatalogFactory(enterprise_uuid=self.enterprise_uuid)
+        content_metadata = ContentMetadataFactory()
+        self.add_metadata_to_catalog(self.enterprise_catalog, [ContentMetadataFactory()])
+        self.add_metadata_to_catalog(second_catalog, [content_metadata])
+        self.add_metadata_to_catalog(third_catalog, [content_metadata])
+
+        view_path = 'enterprise_catalog.apps.api.v1.views.enterprise_customer.EnterpriseCustomerViewSet'
+        for content_identifier, lookup_method in (
+            (content_metadata.content_key, 'get_metadata_by_content_key'),
+            (content_metadata.content_uuid, 'get_metadata_by_uuid'),
+        ):
+            url = self._get_content_metadata_base_url(self.enterprise_uuid, content_identifier)
+            with mock.patch(f'{view_path}.{lookup_method}', autospec=True, return_value=content_metadata) as lookup:
+                response = self.client.get(url + '?skip_customer_fetch=true')
+
+            assert response.status_code == status.HTTP_200_OK
+            assert response.json()['key'] == content_metadata.content_key
+            lookup.assert_called_once()
+            assert lookup.call_args.args[1] == second_catalog
+
+    def test_get_content_metadata_not_in_catalogs(self):
+        """
+        Verify the customer content metadata endpoint returns a 404 without looking in each catalog
+        when none of the customer's catalogs contain the content.
+        """
+        EnterpriseCatalogFactory(enterprise_uuid=self.enterprise_uuid)
+        self.add_metadata_to_catalog(self.enterprise_catalog, [ContentMetadataFactory()])
+        content_metadata = ContentMetadataFactory()
+
+        view_path = 'enterprise_catalog.apps.api.v1.views.enterprise_customer.EnterpriseCustomerViewSet'
+        for content_identifier, lookup_method in (
+            (content_metadata.content_key, 'get_metadata_by_content_key'),
+            (content_metadata.content_uuid, 'get_metadata_by_uuid'),
+        ):
+            url = self._get_content_metadata_base_url(self.enterprise_uuid, content_identifier)
+            with mock.patch(f'{view_path}.{lookup_method}', autospec=True) as lookup:
+                response = self.client.get(url + '?skip_customer_fetch=true')
+
+            assert response.status_code == status.HTTP_404_NOT_FOUND
+            lookup.assert_not_called()
+
+    def test_get_content_metadata_falls_back_to_each_catalog(self):
+        """
+        Verify the customer content metadata endpoint tries each catalog in turn when the catalog found to contain
+        the content returns no metadata for it.
+        """
+        second_catalog = EnterpriseCatalogFactory(enterprise_uuid=self.enterprise_uuid)
+        content_metadata = ContentMetadataFactory()
+        self.add_metadata_to_catalog(self.enterprise_catalog, [content_metadata])
+        self.add_metadata_to_catalog(second_catalog, [content_metadata])
+
+        url = self._get_content_metadata_base_url(self.enterprise_uuid, content_metadata.content_key)
+        with mock.patch(
+            'enterprise_catalog.apps.api.v1.views.enterprise_customer.EnterpriseCustomerViewSet'
+            '.get_metadata_by_content_key',
+            autospec=True,
+            side_effect=[None, None, content_metadata],
+        ) as lookup:
+            response = self.client.get(url + '?skip_customer_fetch=true')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['key'] == content_metadata.content_key
+        assert [call.args[1] for call in lookup.call_args_list] == [
+            self.enterprise_catalog, self.enterprise_catalog, second_catalog,
+        ]
+
     def test_filter_content_items_unauthorized_non_catalog_learner(self):
         """
         Verify the filter_content_items endpoint rejects users that are not catalog learners
@@ -0,0 +1,157 @@
+import codecs
+import io
+import zipfile
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+
+from enterprise_catalog.apps.api.v1 import export_artifacts, export_utils
+
+
+IN_MEMORY_STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+MOCK_HITS = [
+    {
+        'aggregation_key': 'course:edX+course',
+        'key': 'edX+course',
+        'content_type': 'course',
+        'title': 'A course',
+        'enterprise_catalog_query_titles': ['A la carte'],
+    },
+    {
+        'aggregation_key': 'program:1234',
+        'content_type': 'program',
+        'title': 'A program',
+        'enterprise_catalog_query_titles': ['A la carte'],
+    },
+]
+
+
+@override_settings(STORAGES=IN_MEMORY_STORAGES)
+class ExportArtifactsTests(TestCase):
+    """
+    Tests for the catalog export artifacts.
+    """
+
+    def test_export_artifact_path(self):
+        """
+        Test the path only depends on the normalized export and the index version
+        """
+        path = export_artifacts.get_export_artifact_path(
+            'csv', 'query', {'language': ['English', 'Spanish'], 'level_type': ['Introductory']}, index_version='1',
+        )
+        assert path.startswith('catalog-exports/1/')
+        assert path.endswith('.csv')
+        assert path == export_artifacts.get_export_artifact_path(
+            'csv', 'query', {'level_type': ['Introductory'], 'language': ['Spanish', 'English']}, index_version='1',
+        )
+        assert path != export_artifacts.get_export_artifact_path(
+            'csv', 'query', {'language': ['English', 'Spanish'], 'level_type': ['Introductory']}, index_version='2',
+        )
+        assert path != export_artifacts.get_export_artifact_path(
+            'csv', 'other query', {'language': ['English', 'Spanish'], 'level_type': ['Introductory']},
+            index_version='1',
+        )
+
+    @mock.patch('enterprise_catalog.apps.api.v1.export_artifacts.DiscoveryApiClient')
+    @mock.patch('enterprise_catalog.apps.api.v1.export_artifacts.get_initialized_algolia_client')
+    def test_generate_csv_export_artifact(self, mock_algolia_client, mock_discovery_client):
+        """
+        Test a CSV artifact holds the same rows as the streamed CSV export, and is only generated once
+        """
+        mock_algolia_client.return_value.algolia_index.search.side_effect = [{'hits': MOCK_HITS}, {'hits': []}]
+        mock_discovery_client.return_value.get_courses.return_value = []
+
+        facets = {'language': ['English']}
+        path = export_artifacts.generate_export_artifact('csv', '', facets, index_version='1')
+        assert path == export_artifacts.get_export_artifact_path('csv', '', facets, index_version='1')
+
+        with default_storage.open(path, 'rb') as artifact:
+            content = artifact.read()
+        assert content.startswith(codecs.BOM_UTF8)
+        lines = content.decode('utf-8-sig').split('\r\n')
+        assert lines[0] == ','.join(export_utils.CSV_COURSE_HEADERS)
+        # only the course is exported
+        assert len(lines) == 3
+        assert lines[1].startswith('A course,')
+
+        export_artifacts.generate_export_artifact('csv', '', {'language': ['English']}, index_version='1')
+        assert mock_algolia_client.return_value.algolia_index.search.call_count == 2
+
+    @mock.patch('enterprise_catalog.apps.api.v1.export_artifacts.get_initialized_algolia_client')
+    def test_generate_xlsx_export_artifact(self, mock_algolia_client):
+        """
+        Test an XLSX artifact is a workbook with a worksheet per kind of content
+        """
+        mock_algolia_client.return_value.algolia_index.search.side_effect = [{'hits': MOCK_HITS}, {'hits': []}]
+
+        path = export_artifacts.generate_export_artifact('xlsx', '', {}, use_learner_portal_url=True, index_version='1')
+
+        with default_storage.open(path, 'rb') as artifact:
+            with zipfile.ZipFile(io.BytesIO(artifact.read())) as workbook:
+                workbook_xml = workbook.read('xl/workbook.xml').decode()
+        assert 'name="Courses"' in workbook_xml
+        assert 'name="Programs"' in workbook_xml
+
+    @mock.patch('enterprise_catalog.apps.api.v1.export_artifacts.get_initialized_algolia_client')
+    def test_generate_empty_xlsx_export_artifact(self, mock_algolia_client):
+        """
+        Test an XLSX export without hits is stored as an empty marker, and is only generated once
+        """
+        mock_algolia_client.return_value.algolia_index.search.return_value = {'hits': []}
+
+        path = export_artifacts.generate_export_artifact('xlsx', '', {}, index_version='1')
+
+        assert export_artifacts.is_empty_export_artifact(path)
+        assert not default_storage.exists(export_artifacts.get_export_artifact_path('xlsx', '', {}, index_version='1'))
+        assert export_artifacts.generate_export_artifact('xlsx', '', {}, index_version='1') == path
+        assert mock_algolia_client.return_value.algolia_index.search.call_count == 1
+
+    def test_generate_unknown_export_format(self):
+        with self.assertRaises(ValueError):
+            export_artifacts.generate_export_artifact('pdf', '', {}, index_version='1')
+
+    # a storage of its own, without the artifacts of the other tests
+    @override_settings(STORAGES=IN_MEMORY_STORAGES)
+    @mock.patch('enterprise_catalog.apps.api.v1.export_artifacts.get_initialized_algolia_client')
+    def test_generate_export_artifact_concurrently(self, mock_algolia_client):
+        """
+        Test an artifact saved by a concurrent job is not duplicated under another name
+        """
+        mock_algolia_client.return_value.algolia_index.search.return_value = {'hits': []}
+        path = export_artifacts.get_empty_export_artifact_path(
+            export_artifacts.get_export_artifact_path('xlsx', '', {}, index_version='1'),
+        )
+        default_storage.save(path, ContentFile(b''))
+
+        # the concurrent job saves the artifact after this job checked it does not exist yet
+        exists_results = iter([False, False])
+        exists = default_storage.exists
+        with mock.patch.object(default_storage, 'exists', side_effect=lambda name: next(exists_results, exists(name))):
+            assert export_artifacts.generate_export_artifact('xlsx', '', {}, index_version='1') == path
+
+        directory, file_name = path.rsplit('/', 1)
+        assert default_storage.listdir(directory) == ([], [file_name])
+
+    @override_settings(STORAGES=IN_MEMORY_STORAGES)
+    def test_prune_export_artifacts(self):
+        """
+        Test the artifacts of older index versions are deleted
+        """
+        old_path = export_artifacts.get_export_artifact_path('csv', '', {}, index_version='1')
+        path = export_artifacts.get_export_artifact_path('csv', '', {}, index_version='2')
+        for artifact_path in (old_path, path):
+            default_storage.save(artifact_path, ContentFile(b'export'))
+
+        assert export_artifacts.prune_export_artifacts('2') == 1
+        assert not default_storage.exists(old_path)
+        assert default_storage.exists(path)
+
+    @override_settings(STORAGES=IN_MEMORY_STORAGES)
+    def test_prune_export_artifacts_without_exports(self):
+        assert export_artifacts.prune_export_artifacts('1') == 0
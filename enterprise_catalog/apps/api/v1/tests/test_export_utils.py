@@ -1,9 +1,18 @@
-from django.test import TestCase
+import copy
+from unittest import mock
+
+import ddt
+from django.test import TestCase, override_settings
 
 from enterprise_catalog.apps.api.v1 import export_utils
 from enterprise_catalog.apps.catalog import algolia_utils
+from enterprise_catalog.apps.catalog.constants import COURSE
+from enterprise_catalog.apps.catalog.tests.factories import (
+    ContentMetadataFactory,
+)
 
 
+@ddt.ddt
 class ExportUtilsTests(TestCase):
     """
     Tests for the Enterprise Catalog API export utils
@@ -15,3 +24,118 @@ class ExportUtilsTests(TestCase):
         """
         # assert that ALGOLIA_ATTRIBUTES_TO_RETRIEVE is a SUBSET of ALGOLIA_FIELDS
         assert set(export_utils.ALGOLIA_ATTRIBUTES_TO_RETRIEVE) <= set(algolia_utils.ALGOLIA_FIELDS)
+
+    def test_iter_algolia_hits(self):
+        """
+        Test every page of search results is yielded, with the facets combined into facet filters
+        """
+        algolia_index = mock.Mock()
+        algolia_index.search.side_effect = [
+            {'hits': [{'key': 'a'}, {'key': 'b'}]},
+            {'hits': [{'key': 'c'}]},
+            {'hits': []},
+        ]
+        facets = {'language': ['English', 'Spanish'], 'level_type': ['Introductory']}
+
+        hits = list(export_utils.iter_algolia_hits(algolia_index, 'query', facets, hits_per_page=2))
+
+        assert [hit['key'] for hit in hits] == ['a', 'b', 'c']
+        assert algolia_index.search.call_count == 3
+        search_options = algolia_index.search.call_args.args[1]
+        assert search_options['facetFilters'] == [['language:English', 'language:Spanish'], ['level_type:Introductory']]
+        assert search_options['hitsPerPage'] == 2
+
+    def _mock_search_pages(self, num_pages):
+        pages = [
+            {'hits': [
+                {
+                    'content_type': 'course',
+                    'key': f'edX+course{page}x{index}',
+                    'title': f'Course {page}.{index}',
+                    'enterprise_catalog_query_titles': ['A la carte'],
+                }
+                for index in range(3)
+            ] + [{'content_type': 'program', 'title': 'A program'}]}
+            for page in range(num_pages)
+        ] + [{'hits': []}]
+
+        def search(query, search_options):  # pylint: disable=unused-argument
+            return copy.deepcopy(pages[search_options['page']])
+        return search
+
+    def _mock_get_courses(self, query_params):
+        return [{'key': key, 'title': f'Discovery {key}'} for key in query_params['keys'].split(',')[::2]]
+
+    @ddt.data(0, 1, 5)
+    def test_pipelined_course_csv_rows(self, num_pages):
+        """
+        Test the pipelined CSV export yields the same rows, in the same order, as the sequential one
+        """
+        algolia_client = mock.Mock()
+        algolia_client.algolia_index.search.side_effect = self._mock_search_pages(num_pages)
+        discovery_client = mock.Mock()
+        discovery_client.get_courses.side_effect = self._mock_get_courses
+        facets = {'language': ['English']}
+
+        expected_rows = list(export_utils.iter_course_csv_rows(algolia_client, discovery_client, facets, ''))
+        assert len(expected_rows) == num_pages * 3
+        for depth in (1, 2, 10):
+            with override_settings(SHOULD_PIPELINE_CATALOG_CSV_EXPORTS=True, CATALOG_CSV_EXPORT_PIPELINE_DEPTH=depth):
+                rows = list(export_utils.iter_course_csv_rows(algolia_client, discovery_client, facets, ''))
+            assert rows == expected_rows
+        assert discovery_client.get_courses.call_count == num_pages * 4
+
+    @override_settings(SHOULD_PIPELINE_CATALOG_CSV_EXPORTS=True, CATALOG_CSV_EXPORT_PIPELINE_DEPTH=1)
+    def test_pipelined_course_csv_rows_stopped_early(self):
+        """
+        Test the pipelined CSV export stops fetching pages when its consumer stops early
+        """
+        algolia_client = mock.Mock()
+        algolia_client.algolia_index.search.side_effect = self._mock_search_pages(100)
+        discovery_client = mock.Mock()
+        discovery_client.get_courses.side_effect = self._mock_get_courses
+
+        rows = export_utils.iter_course_csv_rows(algolia_client, discovery_client, {}, '')
+        next(rows)
+        rows.close()
+
+        # at most the page being consumed, the pages waiting to be consumed and the next page were searched
+        assert algolia_client.algolia_index.search.call_count <= 4
+
+    @ddt.data(False, True)
+    def test_locally_enriched_course_csv_rows(self, should_pipeline):
+        """
+        Test course hits are enriched from the locally stored course metadata, and only courses
+        missing from it are requested from discovery
+        """
+        local_course = ContentMetadataFactory(content_type=COURSE, content_key='edX+course0x1')
+        algolia_client = mock.Mock()
+        algolia_client.algolia_index.search.side_effect = self._mock_search_pages(1)
+        discovery_client = mock.Mock()
+        discovery_client.get_courses.side_effect = self._mock_get_courses
+
+        with override_settings(
+            SHOULD_ENRICH_CATALOG_EXPORTS_LOCALLY=True,
+            SHOULD_PIPELINE_CATALOG_CSV_EXPORTS=should_pipeline,
+            CATALOG_CSV_EXPORT_PIPELINE_DEPTH=1,
+        ):
+            rows = list(export_utils.iter_course_csv_rows(algolia_client, discovery_client, {}, ''))
+
+        assert len(rows) == 3
+        discovery_client.get_courses.assert_called_once_with(
+            query_params={'keys': 'edX+course0x0,edX+course0x2'},
+        )
+
+        hits = self._mock_search_pages(1)('', {'page': 0})['hits']
+        with override_settings(SHOULD_ENRICH_CATALOG_EXPORTS_LOCALLY=True):
+            with self.assertNumQueries(1):
+                local_courses_by_key = export_utils.get_local_courses_by_key(hits)
+        assert local_courses_by_key == {'edX+course0x1': local_course.json_metadata}
+        course_hits = export_utils.enrich_course_hits(discovery_client, hits, local_courses_by_key)
+        assert course_hits[1]['discovery_course'] == local_course.json_metadata
+
+    def test_local_enrichment_disabled(self):
+        ContentMetadataFactory(content_type=COURSE, content_key='edX+course0x1')
+        hits = self._mock_search_pages(1)('', {'page': 0})['hits']
+        with self.assertNumQueries(0):
+            assert not export_utils.get_local_courses_by_key(hits)
@@ -1,6 +1,9 @@
+import codecs
 import copy
+import io
 import json
 import uuid
+import zipfile
 from collections import OrderedDict
 from datetime import datetime
 from unittest import mock
@@ -9,7 +12,11 @@ from urllib.parse import urljoin
 import ddt
 import pytz
 from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from django.db import IntegrityError
+from django.test import override_settings
 from django.utils.http import urlencode
 from django.utils.text import slugify
 from rest_framework import status
@@ -21,8 +28,12 @@ from enterprise_catalog.apps.academy.tests.factories import (
     AcademyFactory,
     TagFactory,
 )
+from enterprise_catalog.apps.api.v1 import export_artifacts
 from enterprise_catalog.apps.api.v1.serializers import ContentMetadataSerializer
 from enterprise_catalog.apps.api.v1.tests.mixins import APITestMixin
+from enterprise_catalog.apps.api.v1.tests.test_export_artifacts import (
+    IN_MEMORY_STORAGES,
+)
 from enterprise_catalog.apps.api.v1.utils import is_any_course_run_active
 from enterprise_catalog.apps.catalog.constants import (
     COURSE,
@@ -133,7 +144,7 @@ class EnterpriseCatalogDefaultCatalogResultsTests(APITestMixin):
         assert response.status_code == 400
         assert response.json() == {'Error': "invalid facet(s): ['invalid_facet'] provided."}
 
-    @mock.patch('enterprise_catalog.apps.api.v1.views.default_catalog_results.get_initialized_algolia_client')
+    @mock.patch('enterprise_catalog.apps.api.v1.default_catalog_results.get_initialized_algolia_client')
     def test_valid_facet_validation(self, mock_algolia_client):
         """
         Tests a successful request with facets.
@@ -144,7 +155,7 @@ class EnterpriseCatalogDefaultCatalogResultsTests(APITestMixin):
         response = self.client.get(f'{url}?{facets}')
         assert response.status_code == 200
 
-    @mock.patch('enterprise_catalog.apps.api.v1.views.default_catalog_results.get_initialized_algolia_client')
+    @mock.patch('enterprise_catalog.apps.api.v1.default_catalog_results.get_initialized_algolia_client')
     def test_default_catalog_results_view_works_with_one_and_many_course_types(self, mock_algolia_client):
         """
         Test that the default catalog results view rejects requests where the query param course_type is not a list
@@ -836,6 +847,70 @@ class EnterpriseCatalogCsvDataViewTests(APITestMixin):
         }
         assert response.data == expected_response
 
+    @override_settings(SHOULD_STREAM_CATALOG_CSV_DATA=True)
+    @mock.patch('enterprise_catalog.apps.api.v1.views.catalog_csv_data.get_initialized_algolia_client')
+    def test_streamed_csv_data(self, mock_algolia_client):
+        """
+        Tests the streamed response holds the same JSON document as the buffered one.
+        """
+        mock_algolia_client.return_value.algolia_index.search.side_effect = [self.mock_algolia_hits, {'hits': []}]
+        url = self._get_contains_content_base_url()
+        facets = 'language=English'
+        response = self.client.get(f'{url}?{facets}')
+        assert response.status_code == 200
+        assert response.streaming
+        # nothing is searched until the response is consumed
+        mock_algolia_client.return_value.algolia_index.search.assert_not_called()
+        assert json.loads(b''.join(response.streaming_content)) == {'csv_data': self.expected_result_data}
+
+    @override_settings(
+        SHOULD_STREAM_CATALOG_CSV_DATA=True, SHOULD_CACHE_CATALOG_EXPORTS=True, STORAGES=IN_MEMORY_STORAGES,
+    )
+    @mock.patch('enterprise_catalog.apps.api.v1.views.catalog_export_artifacts.generate_catalog_export_task')
+    def test_streamed_cached_csv_data(self, mock_export_task):
+        """
+        Tests a stored CSV export artifact is streamed back without its BOM.
+        """
+        cache.clear()
+        url = self._get_contains_content_base_url()
+        facets = 'language=English'
+        response = self.client.get(f'{url}?{facets}')
+        assert response.status_code == 202
+
+        path = export_artifacts.get_export_artifact_path(
+            'csv', '', {'language': ['English']},
+            index_version=mock_export_task.delay.call_args.kwargs['index_version'],
+        )
+        default_storage.save(path, ContentFile(codecs.BOM_UTF8 + self.expected_result_data.encode()))
+        response = self.client.get(f'{url}?{facets}')
+        assert response.status_code == 200
+        assert json.loads(b''.join(response.streaming_content)) == {'csv_data': self.expected_result_data}
+
+    @override_settings(SHOULD_CACHE_CATALOG_EXPORTS=True, STORAGES=IN_MEMORY_STORAGES)
+    @mock.patch('enterprise_catalog.apps.api.v1.views.catalog_export_artifacts.generate_catalog_export_task')
+    @mock.patch('enterprise_catalog.apps.api.v1.export_artifacts.DiscoveryApiClient')
+    @mock.patch('enterprise_catalog.apps.api.v1.export_artifacts.get_initialized_algolia_client')
+    def test_cached_export(self, mock_algolia_client, mock_discovery_client, mock_export_task):
+        """
+        Tests the first request enqueues an export job and later requests are served from its artifact.
+        """
+        cache.clear()
+        # run the export job as soon as it is enqueued
+        mock_export_task.delay.side_effect = export_artifacts.generate_export_artifact
+        mock_algolia_client.return_value.algolia_index.search.side_effect = [self.mock_algolia_hits, {'hits': []}]
+        mock_discovery_client.return_value.get_courses.return_value = []
+        url = self._get_contains_content_base_url()
+        facets = 'language=English'
+        response = self.client.get(f'{url}?{facets}')
+        assert response.status_code == 202
+        assert response['Retry-After'] == str(settings.CATALOG_EXPORT_RETRY_AFTER_SECONDS)
+
+        for _ in range(2):
+            response = self.client.get(f'{url}?{facets}')
+            assert response.status_code == 200
+            assert response.data == {'csv_data': self.expected_result_data}
+        assert mock_algolia_client.return_value.algolia_index.search.call_count == 2
+
 
 class EnterpriseCatalogWorkbookViewTests(APITestMixin):
     """
@@ -1092,6 +1167,84 @@ class EnterpriseCatalogWorkbookViewTests(APITestMixin):
         response = self.client.get(f'{url}?{facets}')
         assert response.status_code == 200
 
+    @override_settings(SHOULD_STREAM_CATALOG_WORKBOOK_EXPORTS=True, CATALOG_EXPORT_BROWSE_HITS_PER_PAGE=500)
+    @mock.patch('enterprise_catalog.apps.api.v1.views.catalog_workbook.get_initialized_algolia_client')
+    def test_streamed_export(self, mock_algolia_client):
+        """
+        Tests the streamed export browses the index and streams back a complete workbook.
+        """
+        algolia_index = mock_algolia_client.return_value.algolia_index
+        algolia_index.browse_objects.return_value = iter(self.mock_algolia_hits['hits'])
+        url = self._get_contains_content_base_url()
+        facets = 'language=English'
+        response = self.client.get(f'{url}?{facets}')
+        assert response.status_code == 200
+        assert response.streaming
+        algolia_index.search.assert_not_called()
+        browse_options = algolia_index.browse_objects.call_args.args[0]
+        assert browse_options['facetFilters'] == [['language:English']]
+        assert browse_options['hitsPerPage'] == 500
+
+        with zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content))) as workbook:
+            workbook_xml = workbook.read('xl/workbook.xml').decode()
+        assert 'name="Courses"' in workbook_xml
+        assert 'name="Programs"' in workbook_xml
+
+    @override_settings(SHOULD_CACHE_CATALOG_EXPORTS=True, STORAGES=IN_MEMORY_STORAGES)
+    @mock.patch('enterprise_catalog.apps.api.v1.views.catalog_export_artifacts.generate_catalog_export_task')
+    def test_cached_export(self, mock_export_task):
+        """
+        Tests the export job is only enqueued once per artifact, and the artifact is served once it is stored.
+        """
+        cache.clear()
+        url = self._get_contains_content_base_url()
+        facets = 'language=English&use_learner_portal_url=true'
+        for _ in range(2):
+            response = self.client.get(f'{url}?{facets}')
+            assert response.status_code == 202
+        mock_export_task.delay.assert_called_once_with(
+            'xlsx', '', {'language': ['English']}, use_learner_portal_url=True, index_version=mock.ANY,
+        )
+
+        path = export_artifacts.get_export_artifact_path(
+            'xlsx', '', {'language': ['English']}, use_learner_portal_url=True,
+            index_version=mock_export_task.delay.call_args.kwargs['index_version'],
+        )
+        default_storage.save(path, ContentFile(b'workbook'))
+        response = self.client.get(f'{url}?{facets}')
+        assert response.status_code == 200
+        assert b''.join(response.streaming_content) == b'workbook'
+        assert response['Content-Disposition'].startswith('attachment; filename=Enterprise-Catalog-Export-')
+
+    @override_settings(SHOULD_CACHE_CATALOG_EXPORTS=True, STORAGES=IN_MEMORY_STORAGES)
+    @mock.patch('enterprise_catalog.apps.api.v1.views.catalog_export_artifacts.generate_catalog_export_task')
+    @mock.patch('enterprise_catalog.apps.api.v1.export_artifacts.get_initialized_algolia_client')
+    def test_cached_export_empty_results_error(self, mock_algolia_client, mock_export_task):
+        """
+        Tests a cached export without any hits is an error, like an export generated on request.
+        """
+        cache.clear()
+        mock_algolia_client.return_value.algolia_index.search.return_value = {'hits': []}
+        mock_export_task.delay.side_effect = export_artifacts.generate_export_artifact
+        url = self._get_contains_content_base_url()
+
+        response = self.client.get(f'{url}?language=English')
+        assert response.status_code == 202
+        response = self.client.get(f'{url}?language=English')
+        assert response.status_code == 400
+
+    @override_settings(SHOULD_STREAM_CATALOG_WORKBOOK_EXPORTS=True)
+    @mock.patch('enterprise_catalog.apps.api.v1.views.catalog_workbook.get_initialized_algolia_client')
+    def test_streamed_export_empty_results_error(self, mock_algolia_client):
+        """
+        Tests the streamed export when algolia returns no hits.
+        """
+        mock_algolia_client.return_value.algolia_index.browse_objects.return_value = iter([])
+        url = self._get_contains_content_base_url()
+        facets = 'language=English'
+        response = self.client.get(f'{url}?{facets}')
+        assert response.status_code == 400
+
 
 class EnterpriseCatalogContainsContentItemsTests(APITestMixin):
     """
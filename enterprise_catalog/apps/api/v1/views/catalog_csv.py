@@ -9,6 +9,10 @@ from rest_framework.response import Response
 from rest_framework.status import HTTP_400_BAD_REQUEST
 
 from enterprise_catalog.apps.api.v1 import export_utils
+from enterprise_catalog.apps.api.v1.export_artifacts import CSV_EXPORT_FORMAT
+from enterprise_catalog.apps.api.v1.views.catalog_export_artifacts import (
+    CatalogExportArtifactMixin,
+)
 from enterprise_catalog.apps.api_client.discovery import DiscoveryApiClient
 from enterprise_catalog.apps.catalog.algolia_utils import (
     get_initialized_algolia_client,
@@ -25,7 +29,7 @@ class Echo:
         return value
 
 
-class CatalogCsvView(GenericAPIView):
+class CatalogCsvView(CatalogExportArtifactMixin, GenericAPIView):
     """
     Catalog CSV data generation view. All query params are assumed to be facet filters used to filter indexed data when
     searching. All distinct facets provided are interpreted as a conjunction (AND), however multiple identical facets
@@ -48,52 +52,8 @@ class CatalogCsvView(GenericAPIView):
         # discovery to gather extra, non-indexed fields
         discovery_client = DiscoveryApiClient()
 
-        facet_filters = []
-        for facet_name, facet_values in facets.items():
-            combined_facets = []
-            for facet_value in facet_values:
-                combined_facets.append(f'{facet_name}:{facet_value}')
-            facet_filters.append(combined_facets)
-
-        search_options = {
-            'facetFilters': facet_filters,
-            'attributesToRetrieve': export_utils.ALGOLIA_ATTRIBUTES_TO_RETRIEVE,
-            'hitsPerPage': 100,
-            'page': 0,
-        }
-
-        # Algolia search will only retrieve all results if you query by empty string.
-        page = algolia_client.algolia_index.search(algoliaQuery, search_options)
-        while len(page['hits']) > 0:
-            course_keys_chunk = []
-            for hit in page.get('hits', []):
-                # ignore program data (for now)
-                if hit.get('content_type') != 'course':
-                    continue
-                if hit.get('key'):
-                    course_keys_chunk.append(hit.get('key'))
-
-            # build a lookup dictionary for efficient lookup when combining
-            course_by_key = {}
-            if len(course_keys_chunk) > 0:
-                query_params = {'keys': ','.join(course_keys_chunk)}
-                courses = discovery_client.get_courses(query_params=query_params)
-                for course in courses:
-                    course_by_key[course.get('key')] = course
-
-            # combine discovery metadata with the algolia results
-            # append the hit to the results
-            for hit in page.get('hits', []):
-                # ignore program data (for now)
-                if hit.get('content_type') != 'course':
-                    continue
-                if course_by_key.get(hit.get('key')):
-                    hit['discovery_course'] = course_by_key.get(hit.get('key'))
-                row = export_utils.hit_to_row(hit)
-                yield writer.writerow(row)
-
-            search_options['page'] = search_options['page'] + 1
-            page = algolia_client.algolia_index.search(algoliaQuery, search_options)
+        for row in export_utils.iter_course_csv_rows(algolia_client, discovery_client, facets, algoliaQuery):
+            yield writer.writerow(row)
 
     @action(detail=True)
     def get(self, request, **kwargs):
@@ -110,6 +70,12 @@ class CatalogCsvView(GenericAPIView):
         if invalid_facets:
             return Response(f'Error: invalid facet(s): {invalid_facets} provided.', status=HTTP_400_BAD_REQUEST)
 
+        if self.should_serve_export_artifacts():
+            artifact_path = self.get_export_artifact_or_request(CSV_EXPORT_FORMAT, algoliaQuery, facets)
+            if artifact_path is None:
+                return self.export_pending_response()
+            return self.export_artifact_response(artifact_path, CSV_EXPORT_FORMAT)
+
         filename = f'Enterprise-Catalog-Export-{time.strftime("%Y%m%d%H%M%S")}.csv'
 
         response = StreamingHttpResponse(
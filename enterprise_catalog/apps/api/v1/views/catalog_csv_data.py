@@ -1,19 +1,28 @@
+import codecs
 import csv
-from io import StringIO
+import json
 
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import StreamingHttpResponse
 from rest_framework.decorators import action
 from rest_framework.generics import GenericAPIView
 from rest_framework.response import Response
 from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
 
 from enterprise_catalog.apps.api.v1 import export_utils
+from enterprise_catalog.apps.api.v1.export_artifacts import CSV_EXPORT_FORMAT
+from enterprise_catalog.apps.api.v1.views.catalog_csv import Echo
+from enterprise_catalog.apps.api.v1.views.catalog_export_artifacts import (
+    CatalogExportArtifactMixin,
+)
 from enterprise_catalog.apps.api_client.discovery import DiscoveryApiClient
 from enterprise_catalog.apps.catalog.algolia_utils import (
     get_initialized_algolia_client,
 )
 
 
-class CatalogCsvDataView(GenericAPIView):
+class CatalogCsvDataView(CatalogExportArtifactMixin, GenericAPIView):
     """
     Catalog CSV data generation view. All query params are assumed to be facet filters used to filter indexed data when
     searching. All distinct facets provided are interpreted as a conjunction (AND), however multiple identical facets
@@ -39,69 +48,63 @@ class CatalogCsvDataView(GenericAPIView):
         if invalid_facets:
             return Response(f'Error: invalid facet(s): {invalid_facets} provided.', status=HTTP_400_BAD_REQUEST)
 
+        should_stream = getattr(settings, 'SHOULD_STREAM_CATALOG_CSV_DATA', False)
+        if self.should_serve_export_artifacts():
+            # the CSV export artifact also serves the data endpoint, without its leading BOM
+            artifact_path = self.get_export_artifact_or_request(CSV_EXPORT_FORMAT, algoliaQuery, facets)
+            if artifact_path is None:
+                return self.export_pending_response()
+            if should_stream:
+                return self.streamed_csv_data_response(self.iter_artifact_lines(artifact_path))
+            with default_storage.open(artifact_path, 'rb') as artifact:
+                csv_data = artifact.read().decode('utf-8-sig')
+            return Response({'csv_data': csv_data}, status=HTTP_200_OK)
+
+        if should_stream:
+            return self.streamed_csv_data_response(self.iter_csv_lines(facets, algoliaQuery))
         csv_data = self.retrieve_indexed_data(facets, algoliaQuery)
         return Response({'csv_data': csv_data}, status=HTTP_200_OK)
 
-    def retrieve_indexed_data(self, facets, algoliaQuery):
+    def iter_csv_lines(self, facets, algoliaQuery):
         """
-        Helper function to retrieve and format indexed Algolia data into a CSV format.
+        Yields the CSV data for the indexed Algolia data one line at a time, enriching one page of hits at a time
+        like ``CatalogCsvView.iter_items``, so hits are never all held in memory.
         """
+        writer = csv.writer(Echo())
+        yield writer.writerow(export_utils.CSV_COURSE_HEADERS)
+
         # algolia to search
         algolia_client = get_initialized_algolia_client()
         # discovery to gather extra, non-indexed fields
         discovery_client = DiscoveryApiClient()
 
-        facet_filters = []
-        for facet_name, facet_values in facets.items():
-            combined_facets = []
-            for facet_value in facet_values:
-                combined_facets.append(f'{facet_name}:{facet_value}')
-            facet_filters.append(combined_facets)
+        for row in export_utils.iter_course_csv_rows(algolia_client, discovery_client, facets, algoliaQuery):
+            yield writer.writerow(row)
 
-        search_options = {
-            'facetFilters': facet_filters,
-            'attributesToRetrieve': export_utils.ALGOLIA_ATTRIBUTES_TO_RETRIEVE,
-            'hitsPerPage': 100,
-            'page': 0,
-        }
-
-        # Algolia search will only retrieve all results if you query by empty string.
-        algolia_hits = []
-        page = algolia_client.algolia_index.search(algoliaQuery, search_options)
-        while len(page['hits']) > 0:
-            course_keys_chunk = []
-            for hit in page.get('hits', []):
-                # ignore program data (for now)
-                if hit.get('content_type') != 'course':
-                    continue
-                if hit.get('key'):
-                    course_keys_chunk.append(hit.get('key'))
-
-            # build a lookup dictionary for efficient lookup when combining
-            course_by_key = {}
-            if len(course_keys_chunk) > 0:
-                query_params = {'keys': ','.join(course_keys_chunk)}
-                courses = discovery_client.get_courses(query_params=query_params)
-                for course in courses:
-                    course_by_key[course.get('key')] = course
-
-            # combine discovery metadata with the algolia results
-            # append the hit to the results
-            for hit in page.get('hits', []):
-                # ignore program data (for now)
-                if hit.get('content_type') != 'course':
-                    continue
-                if course_by_key.get(hit.get('key')):
-                    hit['discovery_course'] = course_by_key.get(hit.get('key'))
-                algolia_hits.append(hit)
+    def iter_artifact_lines(self, artifact_path):
+        """
+        Yields the text of a stored CSV export artifact one line at a time, without its leading BOM.
+        """
+        with default_storage.open(artifact_path, 'rb') as artifact:
+            yield from codecs.iterdecode(artifact, 'utf-8-sig')
 
-            search_options['page'] = search_options['page'] + 1
-            page = algolia_client.algolia_index.search(algoliaQuery, search_options)
+    def streamed_csv_data_response(self, csv_lines):
+        """
+        Streams the ``{"csv_data": ...}`` JSON document as the CSV lines are produced.
+        """
+        def iter_json():
+            yield '{"csv_data": "'
+            for line in csv_lines:
+                # the JSON encoding of the line, without its surrounding quotes
+                yield json.dumps(line, ensure_ascii=False)[1:-1]
+            yield '"}'
+        # JsonResponse would buffer the whole document, which is what streaming the CSV lines avoids
+        return StreamingHttpResponse(  # pylint: disable=http-response-with-content-type-json
+            streaming_content=iter_json(), content_type='application/json',
+        )
 
-        with StringIO() as file:
-            writer = csv.writer(file)
-            writer.writerow(export_utils.CSV_COURSE_HEADERS)
-            for hit in algolia_hits:
-                row = export_utils.hit_to_row(hit)
-                writer.writerow(row)
-            return file.getvalue()
+    def retrieve_indexed_data(self, facets, algoliaQuery):
+        """
+        Helper function to retrieve and format indexed Algolia data into a CSV format.
+        """
+        return ''.join(self.iter_csv_lines(facets, algoliaQuery))
@@ -0,0 +1,68 @@
+import time
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse
+from rest_framework.response import Response
+from rest_framework.status import HTTP_202_ACCEPTED
+
+from enterprise_catalog.apps.api.tasks import generate_catalog_export_task
+from enterprise_catalog.apps.api.v1.export_artifacts import (
+    EXPORT_CONTENT_TYPES,
+    XLSX_EXPORT_FORMAT,
+    get_empty_export_artifact_path,
+    get_export_artifact_path,
+    mark_export_artifact_pending,
+)
+from enterprise_catalog.apps.catalog.algolia_utils import (
+    get_algolia_index_version,
+)
+
+
+class CatalogExportArtifactMixin:
+    """
+    Lets a catalog export view serve exports generated in the background by ``generate_catalog_export_task``,
+    when ``SHOULD_CACHE_CATALOG_EXPORTS`` is enabled.
+
+    The first request for an export (per Algolia index version) enqueues the job and gets a 202 response;
+    repeating the request returns the stored artifact once it is ready.
+    """
+
+    def should_serve_export_artifacts(self):
+        return getattr(settings, 'SHOULD_CACHE_CATALOG_EXPORTS', False)
+
+    def get_export_artifact_or_request(self, export_format, algolia_query, facets, use_learner_portal_url=False):
+        """
+        Returns the default storage path of the requested export for the current index version (or of its
+        empty marker, see ``is_empty_export_artifact``), or None after making sure a job to generate it
+        has been enqueued.
+        """
+        index_version = get_algolia_index_version()
+        path = get_export_artifact_path(export_format, algolia_query, facets, use_learner_portal_url, index_version)
+        if default_storage.exists(path):
+            return path
+        # only workbook exports without content are stored as an empty marker
+        if export_format == XLSX_EXPORT_FORMAT and default_storage.exists(get_empty_export_artifact_path(path)):
+            return get_empty_export_artifact_path(path)
+        if mark_export_artifact_pending(path):
+            generate_catalog_export_task.delay(
+                export_format,
+                algolia_query,
+                facets,
+                use_learner_portal_url=bool(use_learner_portal_url),
+                index_version=index_version,
+            )
+        return None
+
+    def export_artifact_response(self, path, export_format):
+        response = FileResponse(default_storage.open(path, 'rb'), content_type=EXPORT_CONTENT_TYPES[export_format])
+        filename = f'Enterprise-Catalog-Export-{time.strftime("%Y%m%d%H%M%S")}.{export_format}'
+        response['Content-Disposition'] = f'attachment; filename={filename}'
+        return response
+
+    def export_pending_response(self):
+        return Response(
+            {'detail': 'The export is being generated, please repeat this request shortly.'},
+            status=HTTP_202_ACCEPTED,
+            headers={'Retry-After': str(settings.CATALOG_EXPORT_RETRY_AFTER_SECONDS)},
+        )
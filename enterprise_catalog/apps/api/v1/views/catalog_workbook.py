@@ -1,15 +1,26 @@
 import io
+import itertools
 import logging
+import tempfile
 import time
 
 import xlsxwriter
-from django.http import HttpResponse
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
 from rest_framework.decorators import action
 from rest_framework.generics import GenericAPIView
 from rest_framework.response import Response
 from rest_framework.status import HTTP_400_BAD_REQUEST
 
 from enterprise_catalog.apps.api.v1 import export_utils
+from enterprise_catalog.apps.api.v1.export_artifacts import (
+    EXPORT_CONTENT_TYPES,
+    XLSX_EXPORT_FORMAT,
+    is_empty_export_artifact,
+)
+from enterprise_catalog.apps.api.v1.views.catalog_export_artifacts import (
+    CatalogExportArtifactMixin,
+)
 from enterprise_catalog.apps.catalog.algolia_utils import (
     get_initialized_algolia_client,
 )
@@ -17,14 +28,10 @@ from enterprise_catalog.apps.catalog.algolia_utils import (
 
 logger = logging.getLogger(__name__)
 
+WORKBOOK_CONTENT_TYPE = EXPORT_CONTENT_TYPES[XLSX_EXPORT_FORMAT]
 
-def write_row_data(row, worksheet, row_num):
-    for col_num, cell_data in enumerate(row):
-        worksheet.write(row_num, col_num, cell_data)
-    return row_num + 1
 
-
-class CatalogWorkbookView(GenericAPIView):
+class CatalogWorkbookView(CatalogExportArtifactMixin, GenericAPIView):
     """
     Catalog Workbook data generation view. All query params are assumed to be facet filters used to filter indexed data
     whenv searching. All distinct facets provided are interpreted as a conjunction (AND), however multiple identical
@@ -35,7 +42,6 @@ class CatalogWorkbookView(GenericAPIView):
     """
     permission_classes = []
 
-    # pylint: disable=too-many-statements
     @action(detail=True)
     def get(self, request, **kwargs):
         """
@@ -49,89 +55,40 @@ class CatalogWorkbookView(GenericAPIView):
         if invalid_facets:
             return Response(f'Error: invalid facet(s): {invalid_facets} provided.', status=HTTP_400_BAD_REQUEST)
 
-        # Create an in-memory output file for the new workbook.
-        output = io.BytesIO()
-
-        # Even though the final file will be in memory the module uses temp
-        # files during assembly for efficiency. To avoid this on servers that
-        # don't allow temp files, for example the Google APP Engine, set the
-        # 'in_memory' Workbook() constructor option as shown in the docs.
-        workbook = xlsxwriter.Workbook(output)
-        header_format = workbook.add_format({'bold': True})
+        if self.should_serve_export_artifacts():
+            artifact_path = self.get_export_artifact_or_request(
+                XLSX_EXPORT_FORMAT, algoliaQuery, facets, use_learner_portal_url,
+            )
+            if artifact_path is None:
+                return self.export_pending_response()
+            if is_empty_export_artifact(artifact_path):
+                return Response(f'Error: invalid query: {algoliaQuery} provided.', status=HTTP_400_BAD_REQUEST)
+            return self.export_artifact_response(artifact_path, XLSX_EXPORT_FORMAT)
 
         algolia_client = get_initialized_algolia_client()
+        should_stream = getattr(settings, 'SHOULD_STREAM_CATALOG_WORKBOOK_EXPORTS', False)
+        hits = export_utils.get_workbook_hits(algolia_client.algolia_index, algoliaQuery, facets)
 
-        facet_filters = []
-        for facet_name, facet_values in facets.items():
-            combined_facets = []
-            for facet_value in facet_values:
-                combined_facets.append(f'{facet_name}:{facet_value}')
-            facet_filters.append(combined_facets)
-
-        search_options = {
-            'facetFilters': facet_filters,
-            'attributesToRetrieve': export_utils.ALGOLIA_ATTRIBUTES_TO_RETRIEVE,
-            'hitsPerPage': 100,
-            'page': 0,
-        }
-
-        # Algolia search will only retrieve all results if you query by empty string.
-        page = algolia_client.algolia_index.search(algoliaQuery, search_options)
-
-        if len(page['hits']) == 0:
+        first_hit = next(hits, None)
+        if first_hit is None:
             return Response(f'Error: invalid query: {algoliaQuery} provided.', status=HTTP_400_BAD_REQUEST)
-
-        # content row index, starting at 1 which is after header row
-        course_row_num = 1
-        program_row_num = 1
-        course_run_row_num = 1
-        exec_ed_row_num = 1
-        exec_ed_results_found = False
-        edx_course_results_found = False
-        edx_program_results_found = False
-        course_run_results_found = False
-        while len(page['hits']) > 0:
-            for hit in page.get('hits', []):
-                if hit.get('content_type') == 'course':
-                    is_exec_ed = hit.get('course_type') == 'executive-education-2u'
-                    if is_exec_ed:
-                        if not exec_ed_results_found:
-                            exec_ed_results_found = True
-                            exec_ed_worksheet = workbook.add_worksheet('Executive Education')
-                            export_utils.write_headers_to_sheet(
-                                exec_ed_worksheet, export_utils.CSV_EXEC_ED_COURSE_HEADERS, header_format
-                            )
-                        course_row = export_utils.exec_ed_course_to_row(hit, use_learner_portal_url)
-                        exec_ed_row_num = write_row_data(course_row, exec_ed_worksheet, exec_ed_row_num)
-                    else:
-                        if not edx_course_results_found:
-                            edx_course_results_found = True
-                            course_worksheet = workbook.add_worksheet('Courses')
-                            export_utils.write_headers_to_sheet(
-                                course_worksheet, export_utils.CSV_COURSE_HEADERS, header_format
-                            )
-                        course_row = export_utils.course_hit_to_row(hit, use_learner_portal_url)
-                        course_row_num = write_row_data(course_row, course_worksheet, course_row_num)
-                    for course_run in export_utils.course_hit_runs(hit):
-                        if not course_run_results_found:
-                            course_run_results_found = True
-                            course_run_worksheet = workbook.add_worksheet('Course Runs')
-                            export_utils.write_headers_to_sheet(
-                                course_run_worksheet, export_utils.CSV_COURSE_RUN_HEADERS, header_format
-                            )
-                        course_run_row = export_utils.course_run_to_row(hit, course_run)
-                        course_run_row_num = write_row_data(course_run_row, course_run_worksheet, course_run_row_num)
-                if hit.get('content_type') == 'program':
-                    if not edx_program_results_found:
-                        edx_program_results_found = True
-                        program_worksheet = workbook.add_worksheet('Programs')
-                        export_utils.write_headers_to_sheet(
-                            program_worksheet, export_utils.CSV_PROGRAM_HEADERS, header_format
-                        )
-                    program_row = export_utils.program_hit_to_row(hit, use_learner_portal_url)
-                    program_row_num = write_row_data(program_row, program_worksheet, program_row_num)
-            search_options['page'] = search_options['page'] + 1
-            page = algolia_client.algolia_index.search(algoliaQuery, search_options)
+        hits = itertools.chain([first_hit], hits)
+
+        if should_stream:
+            # Assemble the workbook in a temporary file, flushing each worksheet row to disk as it is
+            # written, then stream the file back so the web worker never holds the whole workbook.
+            output = tempfile.TemporaryFile()
+            workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+        else:
+            # Create an in-memory output file for the new workbook.
+            output = io.BytesIO()
+            # Even though the final file will be in memory the module uses temp
+            # files during assembly for efficiency. To avoid this on servers that
+            # don't allow temp files, for example the Google APP Engine, set the
+            # 'in_memory' Workbook() constructor option as shown in the docs.
+            workbook = xlsxwriter.Workbook(output)
+
+        export_utils.write_hits_to_workbook(workbook, hits, use_learner_portal_url)
 
         # Close the workbook before sending the data.
         workbook.close()
@@ -140,11 +97,12 @@ class CatalogWorkbookView(GenericAPIView):
         output.seek(0)
 
         # Set up the Http response.
-        response = HttpResponse(
-            output,
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
         filename = f'Enterprise-Catalog-Export-{time.strftime("%Y%m%d%H%M%S")}.xlsx'
+        if should_stream:
+            # FileResponse reads the file in chunks and closes (and so deletes) it once sent.
+            response = FileResponse(output, content_type=WORKBOOK_CONTENT_TYPE)
+        else:
+            response = HttpResponse(output, content_type=WORKBOOK_CONTENT_TYPE)
         response['Content-Disposition'] = f'attachment; filename={filename}'
 
         return response
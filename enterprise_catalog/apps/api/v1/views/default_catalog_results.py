@@ -3,13 +3,14 @@ from rest_framework.generics import GenericAPIView
 from rest_framework.response import Response
 from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
 
+from enterprise_catalog.apps.api.v1.default_catalog_results import (
+    DEFAULT_CATALOG_RESULTS_ATTRIBUTES,
+    get_default_catalog_results,
+)
 from enterprise_catalog.apps.api.v1.export_utils import (
     querydict_to_dict,
     validate_query_facets,
 )
-from enterprise_catalog.apps.catalog.algolia_utils import (
-    get_initialized_algolia_client,
-)
 
 
 class DefaultCatalogResultsView(GenericAPIView):
@@ -22,37 +23,7 @@ class DefaultCatalogResultsView(GenericAPIView):
     permission_classes = []
     valid_facets = ['enterprise_catalog_query_titles', 'content_type']
 
-    algolia_attributes_to_retrieve = [
-        'title',
-        'key',
-        'content_type',
-        'partners',
-        'advertised_course_run',
-        'programs',
-        'program_titles',
-        'level_type',
-        'language',
-        'transcript_languages',
-        'short_description',
-        'subjects',
-        'aggregation_key',
-        'skills',
-        'skill_names',
-        'first_enrollable_paid_seat_price',
-        'marketing_url',
-        'upcoming_course_runs',
-        'type',
-        'recent_enrollment_count',
-        'original_image_url',
-        'full_description',
-        'enterprise_catalog_query_uuids',
-        'enterprise_catalog_query_titles',
-        'card_image_url',
-        'availability',
-        'program_type',
-        'course_keys',
-        'authoring_organizations',
-    ]
+    algolia_attributes_to_retrieve = DEFAULT_CATALOG_RESULTS_ATTRIBUTES
 
     def get_queryset(self, **kwargs):
         # Since this view does not hit any models, override the queryset
@@ -76,22 +47,7 @@ class DefaultCatalogResultsView(GenericAPIView):
         if invalid_facets:
             return Response({'Error': f'invalid facet(s): {invalid_facets} provided.'}, status=HTTP_400_BAD_REQUEST)
 
-        catalog_filter = [
-            f'enterprise_catalog_query_titles:{facets.get("enterprise_catalog_query_titles")[0]}',
-            f'learning_type:{learning_type}'
-        ]
-
-        if learning_type_v2:
-            # if we have the v2 learning type, replace the original learning type
-            catalog_filter[1] = f'learning_type_v2:{learning_type_v2}'
-
-        search_options = {
-            'facetFilters': catalog_filter,
-            'attributesToRetrieve': self.algolia_attributes_to_retrieve,
-            'hitsPerPage': 4,
-            'page': 0,
-        }
-        # algolia to search
-        algolia_client = get_initialized_algolia_client()
-        page = algolia_client.algolia_index.search('', search_options)
-        return Response({'default_content': page.get('hits')}, status=HTTP_200_OK)
+        default_content = get_default_catalog_results(
+            facets.get('enterprise_catalog_query_titles')[0], learning_type, learning_type_v2,
+        )
+        return Response({'default_content': default_content}, status=HTTP_200_OK)
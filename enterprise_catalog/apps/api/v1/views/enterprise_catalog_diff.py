@@ -1,3 +1,4 @@
+from django.utils.dateparse import parse_datetime
 from django.utils.decorators import method_decorator
 from rest_framework import viewsets
 from rest_framework.decorators import action
@@ -28,6 +29,7 @@ class EnterpriseCatalogDiff(BaseViewSet, viewsets.ModelViewSet):
     permission_required = 'catalog.has_learner_access'
     lookup_field = 'uuid'
     MAX_GET_CONTENT_KEYS = 100
+    MAX_PAGE_SIZE = 1000
 
     def get_permission_object(self):
         """
@@ -77,12 +79,54 @@ class EnterpriseCatalogDiff(BaseViewSet, viewsets.ModelViewSet):
             the content_keys param.
             'items_found': A list of dicts containing 'content_key's and 'date_updated' of content keys provided in the
             content_keys param that were found under the catalog.
+
+        Query params (optional, for incremental syncs, see ``EnterpriseCatalog.get_catalog_content_diff_page``):
+            'page_size': The maximum number of 'items_not_included' to return, up to ``MAX_PAGE_SIZE``.
+            'cursor': The 'next_cursor' returned with the previous page of 'items_not_included'.
+            'since': An ISO 8601 timestamp of the last sync; only content that changed after it is returned
+            when the response's 'since_applied' is true.
         """
         content_keys = unquote_course_keys(content_keys)
         enterprise_catalog = self.get_object()
+        if any(param in self.request.query_params for param in ('cursor', 'page_size', 'since')):
+            return self.catalog_diff_page(enterprise_catalog, content_keys)
         items_not_found, items_not_included, items_found = enterprise_catalog.get_catalog_content_diff(content_keys)
         return Response({
             'items_not_found': items_not_found,
             'items_not_included': items_not_included,
             'items_found': items_found
         })
+
+    def catalog_diff_page(self, enterprise_catalog, content_keys):
+        """
+        Generate one page of an incremental catalog diff, see ``catalog_diff``.
+        """
+        query_params = self.request.query_params
+        page_size = None
+        if 'page_size' in query_params:
+            try:
+                page_size = int(query_params['page_size'])
+            except ValueError:
+                page_size = 0
+            if not 0 < page_size <= self.MAX_PAGE_SIZE:
+                return Response(
+                    f'page_size must be an integer between 1 and {self.MAX_PAGE_SIZE}.',
+                    status=HTTP_400_BAD_REQUEST
+                )
+        since = None
+        if 'since' in query_params:
+            try:
+                since = parse_datetime(query_params['since'])
+            except ValueError:
+                since = None
+            if since is None or since.tzinfo is None:
+                return Response(
+                    'since must be an ISO 8601 timestamp with a timezone.',
+                    status=HTTP_400_BAD_REQUEST
+                )
+        return Response(enterprise_catalog.get_catalog_content_diff_page(
+            content_keys,
+            cursor=query_params.get('cursor'),
+            limit=page_size,
+            since=since,
+        ))
@@ -1,5 +1,6 @@
 import logging
 import uuid
+from functools import partial
 
 from algoliasearch.exceptions import AlgoliaException
 from django.core.exceptions import ImproperlyConfigured
@@ -22,7 +23,12 @@ from enterprise_catalog.apps.api.v1.serializers import (
 from enterprise_catalog.apps.api.v1.utils import unquote_course_keys
 from enterprise_catalog.apps.api.v1.views.base import BaseViewSet
 from enterprise_catalog.apps.api_client.algolia import AlgoliaSearchClient
-from enterprise_catalog.apps.catalog.models import EnterpriseCatalog
+from enterprise_catalog.apps.catalog.models import (
+    EnterpriseCatalog,
+    filter_content_keys_in_catalogs,
+    get_catalogs_containing_content_keys,
+    get_catalogs_containing_content_uuid,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -72,11 +78,14 @@ class EnterpriseCustomerViewSet(BaseViewSet):
         """
         return self.kwargs.get('enterprise_uuid')
 
-    def filter_content_keys(self, catalog, content_keys):
-        return catalog.filter_content_keys(content_keys)
+    def filter_content_keys(self, catalogs, content_keys):
+        return filter_content_keys_in_catalogs(catalogs, content_keys)
+
+    def get_catalogs_containing_content_keys(self, catalogs, content_keys):
+        return get_catalogs_containing_content_keys(catalogs, content_keys)
 
-    def contains_content_keys(self, catalog, content_keys):
-        return catalog.contains_content_keys(content_keys)
+    def get_catalogs_containing_content_uuid(self, catalogs, content_uuid):
+        return get_catalogs_containing_content_uuid(catalogs, content_uuid)
 
     def get_metadata_by_uuid(self, catalog, content_uuid):
         return catalog.content_metadata.filter(content_uuid=content_uuid).first()
@@ -123,22 +132,20 @@ class EnterpriseCustomerViewSet(BaseViewSet):
             )
         customer_catalogs = EnterpriseCatalog.objects.filter(enterprise_uuid=enterprise_uuid)
 
-        any_catalog_contains_content_items = False
-        catalogs_that_contain_course = []
         content_keys = requested_course_or_run_keys + program_uuids
-        for catalog in customer_catalogs:
-            if self.contains_content_keys(catalog, content_keys):
-                any_catalog_contains_content_items = True
-                if not (get_catalogs_containing_specified_content_ids or get_catalog_list):
-                    # Break as soon as we find a catalog that contains the specified content
-                    break
-                catalogs_that_contain_course.append(catalog.uuid)
+        containing_catalogs = self.get_catalogs_containing_content_keys(customer_catalogs, content_keys)
 
-        response_data = {
-            'contains_content_items': any_catalog_contains_content_items,
-        }
         if (get_catalogs_containing_specified_content_ids or get_catalog_list):
-            response_data['catalog_list'] = catalogs_that_contain_course
+            catalogs_that_contain_course = list(containing_catalogs.values_list('uuid', flat=True))
+            response_data = {
+                'contains_content_items': bool(catalogs_that_contain_course),
+                'catalog_list': catalogs_that_contain_course,
+            }
+        else:
+            # Stops as soon as the database finds a catalog that contains the specified content
+            response_data = {
+                'contains_content_items': containing_catalogs.exists(),
+            }
 
         return Response(response_data)
 
@@ -154,10 +161,7 @@ class EnterpriseCustomerViewSet(BaseViewSet):
         else:
             customer_catalogs = EnterpriseCatalog.objects.filter(enterprise_uuid=enterprise_uuid)
 
-        filtered_content_keys = set()
-        for catalog in customer_catalogs:
-            if items_included := self.filter_content_keys(catalog, content_keys):
-                filtered_content_keys = filtered_content_keys.union(items_included)
+        filtered_content_keys = self.filter_content_keys(customer_catalogs.only('catalog_query'), content_keys)
 
         response_data = {
             'filtered_content_keys': list(filtered_content_keys),
@@ -169,31 +173,49 @@ class EnterpriseCustomerViewSet(BaseViewSet):
         """
         Gets the first matching serialized ContentMetadata for a requested ``content_identifier``
         associated with any of a requested ``customer_uuid``'s catalogs.
+
+        Catalogs are tried oldest first. A single query finds the first catalog containing the content,
+        so a customer with many catalogs does not cost a query per catalog, especially when nothing matches.
         """
-        enterprise_catalogs = list(EnterpriseCatalog.objects.filter(
+        enterprise_catalogs = EnterpriseCatalog.objects.filter(
             enterprise_uuid=self.kwargs.get('enterprise_uuid')
-        ))
+        ).select_related('catalog_query').order_by('created', 'uuid')
         content_identifier = self.kwargs.get('content_identifier')
         serializer_context = {
             'skip_customer_fetch': bool(self.request.query_params.get('skip_customer_fetch', '').lower()),
         }
 
         try:
-            # Search for matching metadata if the value of the requested
-            # identifier is a valid UUID.
             content_uuid = uuid.UUID(content_identifier)
-            for catalog in enterprise_catalogs:
-                if content_with_uuid := self.get_metadata_by_uuid(catalog, content_uuid):
-                    return ContentMetadataSerializer(
-                        content_with_uuid,
-                        context={'enterprise_catalog': catalog, **serializer_context},
-                    )
         except ValueError:
+            content_uuid = None
+        if content_uuid:
+            # Search for matching metadata if the value of the requested
+            # identifier is a valid UUID.
+            containing_catalogs = self.get_catalogs_containing_content_uuid(enterprise_catalogs, content_uuid)
+            get_metadata = partial(self.get_metadata_by_uuid, content_uuid=content_uuid)
+        else:
             # Otherwise, search for matching metadata as a content key
+            containing_catalogs = self.get_catalogs_containing_content_keys(enterprise_catalogs, [content_identifier])
+            get_metadata = partial(self.get_metadata_by_content_key, content_key=content_identifier)
+
+        if catalog := containing_catalogs.first():
+            if content_metadata := get_metadata(catalog):
+                return ContentMetadataSerializer(
+                    content_metadata,
+                    context={'enterprise_catalog': catalog, **serializer_context},
+                )
+            # The per-catalog lookup disagrees with the set-based one (e.g. the catalog's
+            # content changed in between), so fall back to trying each catalog in turn.
+            logger.warning(
+                'Catalog %s matched content %s but returned no metadata for it, trying each catalog instead',
+                catalog.uuid,
+                content_identifier,
+            )
             for catalog in enterprise_catalogs:
-                if content_with_key := self.get_metadata_by_content_key(catalog, content_identifier):
+                if content_metadata := get_metadata(catalog):
                     return ContentMetadataSerializer(
-                        content_with_key,
+                        content_metadata,
                         context={'enterprise_catalog': catalog, **serializer_context},
                     )
         # If we've made it here without finding a matching ContentMetadata record,
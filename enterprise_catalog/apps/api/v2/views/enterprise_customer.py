@@ -5,7 +5,11 @@ from rest_framework.decorators import action
 from enterprise_catalog.apps.api.v1.views.enterprise_customer import (
     EnterpriseCustomerViewSet,
 )
-from enterprise_catalog.apps.catalog.models import ContentMetadata
+from enterprise_catalog.apps.catalog.models import (
+    ContentMetadata,
+    filter_content_keys_in_catalogs,
+    get_catalogs_containing_content_keys,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -35,11 +39,21 @@ class EnterpriseCustomerViewSetV2(EnterpriseCustomerViewSet):
             include_restricted=True,
         ).first()
 
-    def filter_content_keys(self, catalog, content_keys):
-        return catalog.filter_content_keys(content_keys, include_restricted=True)
+    def filter_content_keys(self, catalogs, content_keys):
+        return filter_content_keys_in_catalogs(catalogs, content_keys, include_restricted=True)
+
+    def get_catalogs_containing_content_keys(self, catalogs, content_keys):
+        return get_catalogs_containing_content_keys(catalogs, content_keys, include_restricted=True)
 
-    def contains_content_keys(self, catalog, content_keys):
-        return catalog.contains_content_keys(content_keys, include_restricted=True)
+    def get_catalogs_containing_content_uuid(self, catalogs, content_uuid):
+        """
+        As in ``get_metadata_by_uuid``, find the content metadata record with this uuid regardless of catalog,
+        then look for catalogs containing that record's content key.
+        """
+        record = ContentMetadata.objects.filter(content_uuid=content_uuid).first()
+        if not record:
+            return catalogs.none()
+        return self.get_catalogs_containing_content_keys(catalogs, [record.content_key])
 
     @action(detail=False, methods=['get'], url_path='secured-algolia-api-key')
     def secured_algolia_api_key(self, request, enterprise_uuid, **kwargs):
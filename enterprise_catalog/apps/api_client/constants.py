@@ -16,6 +16,17 @@ DISCOVERY_JOBS_SKILLS_ENDPOINT = urljoin(settings.DISCOVERY_SERVICE_URL, 'taxono
 DISCOVERY_OFFSET_SIZE = 200
 DISCOVERY_CATALOG_QUERY_CACHE_KEY_TPL = 'catalog_query:{id}'
 DISCOVERY_AVERAGE_COURSE_REVIEW_CACHE_KEY = 'average_course_review'
+ALGOLIA_INDEX_VERSION_CACHE_KEY = 'algolia_index_version'
+DISCOVERY_RESPONSE_CACHE_KEY_TPL = 'discovery_response:{hash}'
+DISCOVERY_RESPONSE_REVALIDATE_LOCK_KEY_TPL = 'discovery_response_revalidate:{hash}'
+DISCOVERY_RESPONSE_CACHE_STATS_KEY_TPL = 'discovery_response_stats:{endpoint}:{outcome}'
+# How long (seconds) a single caller may hold the right to refresh a stale discovery response.
+DISCOVERY_RESPONSE_REVALIDATE_LOCK_TIMEOUT = 60 * 5
+DISCOVERY_THROTTLE_WINDOW_KEY_TPL = 'discovery_throttle:window:{window}'
+DISCOVERY_THROTTLE_PAUSED_UNTIL_KEY = 'discovery_throttle:paused_until'
+DISCOVERY_CIRCUIT_FAILURES_KEY = 'discovery_circuit:failures'
+DISCOVERY_CIRCUIT_OPENED_AT_KEY = 'discovery_circuit:opened_at'
+DISCOVERY_CIRCUIT_TRIAL_LOCK_KEY = 'discovery_circuit:trial'
 
 COURSE_REVIEW_BAYESIAN_CONFIDENCE_NUMBER = 15
 
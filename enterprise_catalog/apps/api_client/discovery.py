@@ -1,6 +1,8 @@
 """
 Discovery service api client code.
 """
+import copy
+import functools
 import logging
 import time
 
@@ -11,6 +13,7 @@ from django.conf import settings
 from enterprise_catalog.apps.catalog.constants import (
     DISCOVERY_COURSE_KEY_BATCH_SIZE,
     DISCOVERY_PROGRAM_KEY_BATCH_SIZE,
+    FORCE_INCLUDE_AGGREGATION_KEYS_FILTER_KEY,
 )
 from enterprise_catalog.apps.catalog.content_metadata_utils import (
     tansform_force_included_courses,
@@ -27,6 +30,8 @@ from .constants import (
     DISCOVERY_SEARCH_ALL_ENDPOINT,
     DISCOVERY_VIDEO_SKILLS_ENDPOINT,
 )
+from .discovery_cache import get_or_fetch_discovery_response
+from .discovery_throttle import DiscoveryCircuitOpenError, throttled_request
 
 
 LOGGER = logging.getLogger(__name__)
@@ -50,39 +55,49 @@ class DiscoveryApiClient(BaseOAuthClient):
         """
         return (self.BACKOFF_FACTOR * (2 ** (attempt_count - 1)))
 
-    def _retrieve_metadata_page_for_content_filter(self, content_filter, page, request_params):
+    def _send(self, method, endpoint, **kwargs):
         """
-        Makes a request to discovery's /search/all/ endpoint with the specified
-        content_filter, page, and request_params
+        Sends a single request to discovery through the shared rate limiter and circuit breaker.
+        """
+        return throttled_request(functools.partial(getattr(self.client, method), endpoint, **kwargs))
+
+    def _request_with_retries(self, method, endpoint, page, description, timing_metric_name, **kwargs):
+        """
+        Makes a request to a discovery endpoint, retrying failed requests with exponential backoff,
+        and returns the decoded JSON response.
+
+        Arguments:
+            method (str): The HTTP method, e.g. 'get' or 'post'.
+            endpoint (str): The discovery endpoint to request.
+            page (int): The page being requested, for logging.
+            description (str): What is being retrieved, for logging, e.g. 'course review results'.
+            timing_metric_name (str): Name under which the response time is logged.
+            kwargs: Passed to the underlying request.
         """
-        LOGGER.info(f'Retrieving results from course-discovery for page {page}...')
         attempts = 0
-        request_params_with_page = request_params | {'page': page}
         while True:
             attempts = attempts + 1
             successful = True
             exception = None
             try:
-                response = self.client.post(
-                    DISCOVERY_SEARCH_ALL_ENDPOINT,
-                    json=content_filter,
-                    params=request_params_with_page,
-                    timeout=self.HTTP_TIMEOUT,
-                )
+                response = self._send(method, endpoint, timeout=self.HTTP_TIMEOUT, **kwargs)
                 successful = response.status_code < 400
                 elapsed_seconds = response.elapsed.total_seconds()
                 LOGGER.info(
-                    f'Retrieved results from course-discovery for page {page} in '
-                    f'retrieve_metadata_for_content_filter_seconds={elapsed_seconds} seconds.'
+                    f'Retrieved {description} from course-discovery for page {page} in '
+                    f'{timing_metric_name}={elapsed_seconds} seconds.'
                 )
+            except DiscoveryCircuitOpenError:
+                # Retrying while the circuit is open would only fail fast again.
+                raise
             except requests.exceptions.RequestException as err:
                 exception = err
-                LOGGER.exception(f'Error while retrieving results from course-discovery for page {page}')
+                LOGGER.exception(f'Error while retrieving {description} from course-discovery for page {page}')
                 successful = False
             if attempts <= self.MAX_RETRIES and not successful:
                 sleep_seconds = self._calculate_backoff(attempts)
                 LOGGER.warning(
-                    f'failed request detected from {DISCOVERY_SEARCH_ALL_ENDPOINT}, '
+                    f'failed request detected from {endpoint}, '
                     'backing-off before retrying, '
                     f'sleeping {sleep_seconds} seconds...'
                 )
@@ -95,12 +110,28 @@ class DiscoveryApiClient(BaseOAuthClient):
             return response.json()
         except requests.exceptions.JSONDecodeError as err:
             LOGGER.exception(
-                f'Invalid JSON while retrieving results from course-discovery for page {page}, '
+                f'Invalid JSON while retrieving {description} from course-discovery for page {page}, '
                 f'resonse status code: {response.status_code}, '
                 f'response body: {response.text}'
             )
             raise err
 
+    def _retrieve_metadata_page_for_content_filter(self, content_filter, page, request_params):
+        """
+        Makes a request to discovery's /search/all/ endpoint with the specified
+        content_filter, page, and request_params
+        """
+        LOGGER.info(f'Retrieving results from course-discovery for page {page}...')
+        return self._request_with_retries(
+            'post',
+            DISCOVERY_SEARCH_ALL_ENDPOINT,
+            page,
+            'results',
+            'retrieve_metadata_for_content_filter_seconds',
+            json=content_filter,
+            params=request_params | {'page': page},
+        )
+
     def retrieve_metadata_for_content_filter(self, content_filter, request_params):
         """
         Given a content filter and query params dict, makes one or more requests to the
@@ -142,48 +173,14 @@ class DiscoveryApiClient(BaseOAuthClient):
         """
         page = request_params.get('page', 1)
         LOGGER.info(f'Retrieving course reviews from course-discovery for page {page}...')
-        attempts = 0
-        while True:
-            attempts = attempts + 1
-            successful = True
-            exception = None
-            try:
-                response = self.client.get(
-                    DISCOVERY_COURSE_REVIEWS_ENDPOINT,
-                    params=request_params,
-                    timeout=self.HTTP_TIMEOUT,
-                )
-                successful = response.status_code < 400
-                elapsed_seconds = response.elapsed.total_seconds()
-                LOGGER.info(
-                    f'Retrieved course review results from course-discovery for page {page} in '
-                    f'retrieve_course_reviews_seconds={elapsed_seconds} seconds.'
-                )
-            except requests.exceptions.RequestException as err:
-                exception = err
-                LOGGER.exception(f'Error while retrieving course review results from course-discovery for page {page}')
-                successful = False
-            if attempts <= self.MAX_RETRIES and not successful:
-                sleep_seconds = self._calculate_backoff(attempts)
-                LOGGER.warning(
-                    f'failed request detected from {DISCOVERY_SEARCH_ALL_ENDPOINT}, '
-                    'backing-off before retrying, '
-                    f'sleeping {sleep_seconds} seconds...'
-                )
-                time.sleep(sleep_seconds)
-            else:
-                if exception:
-                    raise exception
-                break
-        try:
-            return response.json()
-        except requests.exceptions.JSONDecodeError as err:
-            LOGGER.exception(
-                f'Invalid JSON while retrieving course review results from course-discovery for page {page}, '
-                f'resonse status code: {response.status_code}, '
-                f'response body: {response.text}'
-            )
-            raise err
+        return self._request_with_retries(
+            'get',
+            DISCOVERY_COURSE_REVIEWS_ENDPOINT,
+            page,
+            'course review results',
+            'retrieve_course_reviews_seconds',
+            params=request_params,
+        )
 
     def get_course_reviews(self, course_keys=None):
         """
@@ -220,48 +217,14 @@ class DiscoveryApiClient(BaseOAuthClient):
         """
         page = request_params.get('page', 1)
         LOGGER.info(f'Retrieving video skills from course-discovery for page {page}...')
-        attempts = 0
-        while True:
-            attempts = attempts + 1
-            successful = True
-            exception = None
-            try:
-                response = self.client.get(
-                    DISCOVERY_VIDEO_SKILLS_ENDPOINT,
-                    params=request_params,
-                    timeout=self.HTTP_TIMEOUT,
-                )
-                successful = response.status_code < 400
-                elapsed_seconds = response.elapsed.total_seconds()
-                LOGGER.info(
-                    f'Retrieved video skills results from course-discovery for page {page} in '
-                    f'retrieve_video_skills_seconds={elapsed_seconds} seconds.'
-                )
-            except requests.exceptions.RequestException as err:
-                exception = err
-                LOGGER.exception(f'Error while retrieving video skills results from course-discovery for page {page}')
-                successful = False
-            if attempts <= self.MAX_RETRIES and not successful:
-                sleep_seconds = self._calculate_backoff(attempts)
-                LOGGER.warning(
-                    f'failed request detected from {DISCOVERY_VIDEO_SKILLS_ENDPOINT}, '
-                    'backing-off before retrying, '
-                    f'sleeping {sleep_seconds} seconds...'
-                )
-                time.sleep(sleep_seconds)
-            else:
-                if exception:
-                    raise exception
-                break
-        try:
-            return response.json()
-        except requests.exceptions.JSONDecodeError as err:
-            LOGGER.exception(
-                f'Invalid JSON while retrieving video skills results from course-discovery for page {page}, '
-                f'resonse status code: {response.status_code}, '
-                f'response body: {response.text}'
-            )
-            raise err
+        return self._request_with_retries(
+            'get',
+            DISCOVERY_VIDEO_SKILLS_ENDPOINT,
+            page,
+            'video skills results',
+            'retrieve_video_skills_seconds',
+            params=request_params,
+        )
 
     def get_video_skills(self, video_usage_key):
         """
@@ -293,49 +256,15 @@ class DiscoveryApiClient(BaseOAuthClient):
         Makes a request to discovery's taxonomy/api/v1/jobs paginated endpoint
         """
         page = request_params.get('page', 1)
-        LOGGER.info(f'Retrieving video skills from course-discovery for page {page}...')
-        attempts = 0
-        while True:
-            attempts = attempts + 1
-            successful = True
-            exception = None
-            try:
-                response = self.client.get(
-                    DISCOVERY_JOBS_SKILLS_ENDPOINT,
-                    params=request_params,
-                    timeout=self.HTTP_TIMEOUT,
-                )
-                successful = response.status_code < 400
-                elapsed_seconds = response.elapsed.total_seconds()
-                LOGGER.info(
-                    f'Retrieved jobs skills results from course-discovery for page {page} in '
-                    f'retrieve_jobs_skills_seconds={elapsed_seconds} seconds.'
-                )
-            except requests.exceptions.RequestException as err:
-                exception = err
-                LOGGER.exception(f'Error while retrieving jobs skills results from course-discovery for page {page}')
-                successful = False
-            if attempts <= self.MAX_RETRIES and not successful:
-                sleep_seconds = self._calculate_backoff(attempts)
-                LOGGER.warning(
-                    f'failed request detected from {DISCOVERY_JOBS_SKILLS_ENDPOINT}, '
-                    'backing-off before retrying, '
-                    f'sleeping {sleep_seconds} seconds...'
-                )
-                time.sleep(sleep_seconds)
-            else:
-                if exception:
-                    raise exception
-                break
-        try:
-            return response.json()
-        except requests.exceptions.JSONDecodeError as err:
-            LOGGER.exception(
-                f'Invalid JSON while retrieving jobs skills results from course-discovery for page {page}, '
-                f'resonse status code: {response.status_code}, '
-                f'response body: {response.text}'
-            )
-            raise err
+        LOGGER.info(f'Retrieving jobs skills from course-discovery for page {page}...')
+        return self._request_with_retries(
+            'get',
+            DISCOVERY_JOBS_SKILLS_ENDPOINT,
+            page,
+            'jobs skills results',
+            'retrieve_jobs_skills_seconds',
+            params=request_params,
+        )
 
     def get_jobs_skills(self, page=1):
         """
@@ -351,15 +280,15 @@ class DiscoveryApiClient(BaseOAuthClient):
             LOGGER.exception(f'Could not retrieve jobs and skills from course-discovery (page {page}) {exc}')
             raise exc
 
-    def get_metadata_by_query(self, catalog_query, extra_query_params=None):
+    def get_metadata_by_content_filter(self, content_filter, extra_query_params=None):
         """
-        Return results from the discovery service's search/all endpoint.
+        Return results from the discovery service's search/all endpoint for a raw content filter.
 
         Arguments:
-            catalog_query (CatalogQuery): Catalog Query object to retrieve metadata for
+            content_filter (dict): The filter to post to the search/all endpoint.
 
         Returns:
-            list: a list of the results, or None if there was an error calling the discovery service.
+            list: a list of the results.
         """
         request_params = {
             # Omit non-active course runs from the course-discovery results
@@ -367,11 +296,28 @@ class DiscoveryApiClient(BaseOAuthClient):
             # Ensure to fetch learner pathways as part of search/all endpoint response.
             'include_learner_pathways': True,
         } | (extra_query_params or {})
+        return self.retrieve_metadata_for_content_filter(content_filter, request_params)
+
+    def get_metadata_by_query(self, catalog_query, extra_query_params=None, search_results=None):
+        """
+        Return results from the discovery service's search/all endpoint.
+
+        Arguments:
+            catalog_query (CatalogQuery): Catalog Query object to retrieve metadata for
+            search_results (list): Optional search/all results already fetched for a content filter
+                that discovery treats the same as this query's filter. When given, search/all is not
+                called again and only the query's force-included courses are fetched.
+
+        Returns:
+            list: a list of the results, or None if there was an error calling the discovery service.
+        """
         results = []
 
         try:
-            content_filter = catalog_query.content_filter
-            results.extend(self.retrieve_metadata_for_content_filter(content_filter, request_params))
+            if search_results is None:
+                results.extend(self.get_metadata_by_content_filter(catalog_query.content_filter, extra_query_params))
+            else:
+                results.extend(copy.deepcopy(search_results))
         except Exception as exc:
             LOGGER.exception(
                 'Could not retrieve content items for catalog query %s: %s',
@@ -382,7 +328,7 @@ class DiscoveryApiClient(BaseOAuthClient):
 
         try:
             # NOTE johnnagro this ONLY supports courses at the moment (NOT programs, leanerpathways, etc)
-            if forced_aggregation_keys := catalog_query.content_filter.get('enterprise_force_include_aggregation_keys'):
+            if forced_aggregation_keys := catalog_query.content_filter.get(FORCE_INCLUDE_AGGREGATION_KEYS_FILTER_KEY):
                 LOGGER.info(
                     'get_metadata_by_query enterprise_force_include_aggregation_keys seen'
                     f'attempting to force-include: {forced_aggregation_keys}'
@@ -402,7 +348,8 @@ class DiscoveryApiClient(BaseOAuthClient):
         Makes a request to discovery's /api/v1/courses/ endpoint with the specified offset and request_params
         """
         LOGGER.info('Retrieving courses from course-discovery for offset %s...', offset)
-        response = self.client.get(
+        response = self._send(
+            'get',
             DISCOVERY_COURSES_ENDPOINT,
             params=request_params,
             timeout=self.HTTP_TIMEOUT,
@@ -425,7 +372,16 @@ class DiscoveryApiClient(BaseOAuthClient):
             'limit': DISCOVERY_OFFSET_SIZE,
         }
         request_params.update(query_params or {})
+        return get_or_fetch_discovery_response(
+            DISCOVERY_COURSES_ENDPOINT,
+            request_params,
+            functools.partial(self._traverse_courses, request_params),
+        )
 
+    def _traverse_courses(self, request_params):
+        """
+        Traverses all pages of discovery's /api/v1/courses/ endpoint for the given request_params.
+        """
         courses = []
         offset = 0
         try:
@@ -459,7 +415,8 @@ class DiscoveryApiClient(BaseOAuthClient):
         Makes a request to discovery's /api/v1/programs/ endpoint with the specified offset and request_params
         """
         LOGGER.info('Retrieving programs from course-discovery for offset %s...', offset)
-        response = self.client.get(
+        response = self._send(
+            'get',
             DISCOVERY_PROGRAMS_ENDPOINT,
             params=request_params,
             timeout=self.HTTP_TIMEOUT,
@@ -483,7 +440,16 @@ class DiscoveryApiClient(BaseOAuthClient):
             'extended': 'True',
         }
         request_params.update(query_params or {})
+        return get_or_fetch_discovery_response(
+            DISCOVERY_PROGRAMS_ENDPOINT,
+            request_params,
+            functools.partial(self._traverse_programs, request_params),
+        )
 
+    def _traverse_programs(self, request_params):
+        """
+        Traverses all pages of discovery's /api/v1/programs/ endpoint for the given request_params.
+        """
         programs = []
         offset = 0
         try:
@@ -562,16 +528,18 @@ class CatalogQueryMetadata:
     Metadata for a given CatalogQuery from the Discovery API.
 
     """
-    def __init__(self, catalog_query):
+    def __init__(self, catalog_query, search_results=None):
         """
         Initialize a Catalog Query details instance and load data from
         the Discovery API client.
 
         Arguments:
             catalog_query (CatalogQuery): Catalog Query to retrieve metadata for
+            search_results (list): Optional search/all results already fetched for this
+                query's discovery content filter (see ``DiscoveryApiClient.get_metadata_by_query``).
         """
         self.catalog_query = catalog_query
-        self.catalog_query_data = self._get_catalog_query_metadata(catalog_query)
+        self.catalog_query_data = self._get_catalog_query_metadata(catalog_query, search_results)
 
     @property
     def metadata(self):
@@ -580,18 +548,25 @@ class CatalogQueryMetadata:
         """
         return self.catalog_query_data
 
-    def _get_catalog_query_metadata(self, catalog_query):
+    def _get_catalog_query_metadata(self, catalog_query, search_results=None):
         """
-        Retrieve JSON data containing Catalog Query metadata for the given catalog_query_id
-        by making a call to Discovery API Client.
+        Retrieve JSON data containing Catalog Query metadata for the given catalog_query_id.
+        Look in the discovery response cache first, make call to Discovery API Client if not found.
 
         Arguments:
             catalog_query (CatalogQuery): Catalog Query object
+            search_results (list): Optional already-fetched search/all results for the query.
 
         Returns:
             customer_data (dict): Enterprise Customer details OR
                 Empty dictionary if no data found from API.
         """
         client = DiscoveryApiClient()
-        catalog_query_data = client.get_metadata_by_query(catalog_query)
+        if search_results is not None:
+            return client.get_metadata_by_query(catalog_query, search_results=search_results)
+        catalog_query_data = get_or_fetch_discovery_response(
+            DISCOVERY_SEARCH_ALL_ENDPOINT,
+            {'content_filter': catalog_query.content_filter},
+            functools.partial(client.get_metadata_by_query, catalog_query),
+        )
         return catalog_query_data
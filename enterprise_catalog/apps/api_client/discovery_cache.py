@@ -0,0 +1,165 @@
+"""
+Volatile cache of course-discovery API responses, shared by every caller of the Discovery API client.
+
+Responses are keyed by (endpoint, normalized request params) and kept for a per-endpoint timeout. Once that
+timeout passes, the response stays available for ``settings.DISCOVERY_RESPONSE_CACHE_STALE_TIMEOUT`` more
+seconds: during that window exactly one caller refreshes it while every other caller keeps getting the stale copy.
+"""
+import hashlib
+import json
+import logging
+import time
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .constants import (
+    DISCOVERY_COURSES_ENDPOINT,
+    DISCOVERY_PROGRAMS_ENDPOINT,
+    DISCOVERY_RESPONSE_CACHE_KEY_TPL,
+    DISCOVERY_RESPONSE_CACHE_STATS_KEY_TPL,
+    DISCOVERY_RESPONSE_REVALIDATE_LOCK_KEY_TPL,
+    DISCOVERY_RESPONSE_REVALIDATE_LOCK_TIMEOUT,
+    DISCOVERY_SEARCH_ALL_ENDPOINT,
+)
+
+
+logger = logging.getLogger(__name__)
+
+CACHE_HIT = 'hit'
+CACHE_STALE_HIT = 'stale_hit'
+CACHE_MISS = 'miss'
+CACHE_OUTCOMES = (CACHE_HIT, CACHE_STALE_HIT, CACHE_MISS)
+
+
+def discovery_response_cache_enabled():
+    return getattr(settings, 'SHOULD_CACHE_DISCOVERY_RESPONSES', False)
+
+
+def get_endpoint_cache_timeout(endpoint):
+    """
+    Returns the number of seconds a response from the given discovery ``endpoint`` is considered fresh.
+    """
+    timeouts_by_endpoint = {
+        DISCOVERY_SEARCH_ALL_ENDPOINT: settings.DISCOVERY_CATALOG_QUERY_CACHE_TIMEOUT,
+        DISCOVERY_COURSES_ENDPOINT: settings.DISCOVERY_COURSE_DATA_CACHE_TIMEOUT,
+        DISCOVERY_PROGRAMS_ENDPOINT: settings.DISCOVERY_PROGRAM_DATA_CACHE_TIMEOUT,
+    }
+    return timeouts_by_endpoint.get(endpoint, settings.DISCOVERY_COURSE_DATA_CACHE_TIMEOUT)
+
+
+def _normalize_params(params):
+    """
+    Returns a representation of ``params`` that does not depend on dict key order, list order,
+    or whether scalar values were given as strings (e.g. ``True`` vs. ``'True'``), since none of
+    those change the discovery response.
+    """
+    if isinstance(params, dict):
+        return {str(key): _normalize_params(value) for key, value in params.items()}
+    if isinstance(params, (list, tuple, set)):
+        normalized_items = [_normalize_params(item) for item in params]
+        return sorted(normalized_items, key=lambda item: json.dumps(item, sort_keys=True))
+    return str(params)
+
+
+def _get_request_hash(endpoint, params):
+    normalized_request = json.dumps(
+        {'endpoint': endpoint, 'params': _normalize_params(params or {})},
+        sort_keys=True,
+    ).encode()
+    return hashlib.md5(normalized_request).hexdigest()
+
+
+def get_discovery_response_cache_key(endpoint, params):
+    """
+    Returns the cache key for a discovery ``endpoint`` requested with ``params``.
+    """
+    return DISCOVERY_RESPONSE_CACHE_KEY_TPL.format(hash=_get_request_hash(endpoint, params))
+
+
+def _stats_key(endpoint, outcome):
+    return DISCOVERY_RESPONSE_CACHE_STATS_KEY_TPL.format(endpoint=urlparse(endpoint).path, outcome=outcome)
+
+
+def _record_outcome(endpoint, outcome):
+    """
+    Increments the shared counter for ``outcome`` on ``endpoint``.
+    """
+    stats_key = _stats_key(endpoint, outcome)
+    # add() is a no-op when the counter already exists, so incr() never sees a missing key.
+    cache.add(stats_key, 0, None)
+    try:
+        cache.incr(stats_key)
+    except ValueError:
+        # The counter was evicted between add() and incr(); losing one count is acceptable.
+        pass
+
+
+def get_discovery_cache_stats(endpoints=None):
+    """
+    Returns a dict of ``{endpoint path: {outcome: count}}`` for the given discovery ``endpoints``
+    (defaults to every cached endpoint).
+    """
+    endpoints = endpoints or (DISCOVERY_SEARCH_ALL_ENDPOINT, DISCOVERY_COURSES_ENDPOINT, DISCOVERY_PROGRAMS_ENDPOINT)
+    stats = {}
+    for endpoint in endpoints:
+        stats[urlparse(endpoint).path] = {
+            outcome: cache.get(_stats_key(endpoint, outcome), 0)
+            for outcome in CACHE_OUTCOMES
+        }
+    return stats
+
+
+def get_or_fetch_discovery_response(endpoint, params, fetch):
+    """
+    Returns the cached response for (``endpoint``, ``params``), calling ``fetch()`` to populate
+    the cache on a miss or to refresh a stale entry.
+
+    Arguments:
+        endpoint (str): The discovery endpoint the response comes from; selects the cache timeout.
+        params (dict): The request params (or body) that determine the response.
+        fetch (callable): Zero-argument callable that requests the response from discovery.
+
+    Returns:
+        The (possibly cached) response. Falsy responses are returned but never cached, since the
+        Discovery API client also returns empty results when a request fails.
+    """
+    if not discovery_response_cache_enabled():
+        return fetch()
+
+    request_hash = _get_request_hash(endpoint, params)
+    cache_key = DISCOVERY_RESPONSE_CACHE_KEY_TPL.format(hash=request_hash)
+    cached_entry = cache.get(cache_key)
+
+    if cached_entry is not None:
+        if cached_entry['fresh_until'] > time.time():
+            _record_outcome(endpoint, CACHE_HIT)
+            return cached_entry['response']
+        _record_outcome(endpoint, CACHE_STALE_HIT)
+        lock_key = DISCOVERY_RESPONSE_REVALIDATE_LOCK_KEY_TPL.format(hash=request_hash)
+        if not cache.add(lock_key, True, DISCOVERY_RESPONSE_REVALIDATE_LOCK_TIMEOUT):
+            # Another caller is already refreshing this response.
+            return cached_entry['response']
+        try:
+            response = fetch()
+        except Exception:  # pylint: disable=broad-except
+            logger.exception('Could not refresh stale discovery response %s, serving the stale copy.', cache_key)
+            return cached_entry['response']
+        finally:
+            cache.delete(lock_key)
+        if not response:
+            # An empty refresh most likely means the request failed, keep serving the stale copy.
+            return cached_entry['response']
+    else:
+        _record_outcome(endpoint, CACHE_MISS)
+        response = fetch()
+
+    if response:
+        timeout = get_endpoint_cache_timeout(endpoint)
+        cache.set(
+            cache_key,
+            {'response': response, 'fresh_until': time.time() + timeout},
+            timeout + settings.DISCOVERY_RESPONSE_CACHE_STALE_TIMEOUT,
+        )
+    return response
@@ -0,0 +1,169 @@
+"""
+Client-side rate limiting and circuit breaking for course-discovery requests.
+
+The state lives in the Django cache so that every Celery worker and web process talking to discovery
+shares one request budget and one view of discovery's health:
+
+* Requests draw from a per-second budget of ``settings.DISCOVERY_CLIENT_MAX_REQUESTS_PER_SECOND``.
+  The budget is counted with the cache's atomic ``add``/``incr`` (the Django cache has no compare-and-set),
+  so a caller that finds the current second used up waits for the next one.
+* A 429 response pauses every caller until its ``Retry-After`` (or ``DISCOVERY_CLIENT_RATE_LIMITED_PAUSE``)
+  has passed, instead of each caller retrying on its own schedule. Pauses are capped at
+  ``DISCOVERY_CLIENT_MAX_RATE_LIMITED_PAUSE`` seconds, so a bad header cannot stall the workers.
+* ``DISCOVERY_CLIENT_CIRCUIT_FAILURE_THRESHOLD`` failed requests (429, 5xx or connection errors) within
+  ``DISCOVERY_CLIENT_CIRCUIT_FAILURE_WINDOW`` seconds open the circuit: for
+  ``DISCOVERY_CLIENT_CIRCUIT_RESET_TIMEOUT`` seconds requests fail fast with ``DiscoveryCircuitOpenError``.
+  Afterwards a single trial request is let through; its success closes the circuit, its failure reopens it.
+"""
+import logging
+import time
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+
+from .constants import (
+    DISCOVERY_CIRCUIT_FAILURES_KEY,
+    DISCOVERY_CIRCUIT_OPENED_AT_KEY,
+    DISCOVERY_CIRCUIT_TRIAL_LOCK_KEY,
+    DISCOVERY_THROTTLE_PAUSED_UNTIL_KEY,
+    DISCOVERY_THROTTLE_WINDOW_KEY_TPL,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# How long (seconds) circuit state is remembered; long enough to outlive any reset timeout.
+CIRCUIT_STATE_TIMEOUT = 60 * 60
+
+
+class DiscoveryCircuitOpenError(requests.exceptions.RequestException):
+    """
+    Raised instead of making a request to course-discovery while the circuit is open.
+    """
+
+
+def discovery_throttle_enabled():
+    return getattr(settings, 'SHOULD_THROTTLE_DISCOVERY_REQUESTS', False)
+
+
+def _is_failure(status_code):
+    return status_code == 429 or status_code >= 500
+
+
+def _get_retry_after_seconds(response):
+    """
+    Returns the number of seconds a 429 ``response`` asks us to wait, at most
+    ``DISCOVERY_CLIENT_MAX_RATE_LIMITED_PAUSE``.
+    """
+    try:
+        retry_after_seconds = max(float(response.headers.get('Retry-After')), 0)
+    except (TypeError, ValueError):
+        retry_after_seconds = settings.DISCOVERY_CLIENT_RATE_LIMITED_PAUSE
+    return min(retry_after_seconds, settings.DISCOVERY_CLIENT_MAX_RATE_LIMITED_PAUSE)
+
+
+def _wait_for_shared_pause():
+    paused_until = cache.get(DISCOVERY_THROTTLE_PAUSED_UNTIL_KEY)
+    if paused_until and paused_until > time.time():
+        pause_seconds = min(paused_until - time.time(), settings.DISCOVERY_CLIENT_MAX_RATE_LIMITED_PAUSE)
+        logger.info('course-discovery asked clients to back off, waiting %s seconds...', pause_seconds)
+        time.sleep(pause_seconds)
+
+
+def _acquire_request_budget():
+    """
+    Blocks until the shared per-second request budget has room for one more request.
+    """
+    max_requests_per_second = settings.DISCOVERY_CLIENT_MAX_REQUESTS_PER_SECOND
+    while True:
+        now = time.time()
+        window_key = DISCOVERY_THROTTLE_WINDOW_KEY_TPL.format(window=int(now))
+        # add() is a no-op when the counter already exists, so incr() never sees a missing key.
+        cache.add(window_key, 0, 2)
+        try:
+            request_count = cache.incr(window_key)
+        except ValueError:
+            # The counter expired between add() and incr(); count against the next window instead.
+            continue
+        if request_count <= max_requests_per_second:
+            return
+        time.sleep(int(now) + 1 - now)
+
+
+def _check_circuit():
+    """
+    Raises ``DiscoveryCircuitOpenError`` if requests to course-discovery should not be made right now.
+    """
+    opened_at = cache.get(DISCOVERY_CIRCUIT_OPENED_AT_KEY)
+    if opened_at is None:
+        return
+    if time.time() < opened_at + settings.DISCOVERY_CLIENT_CIRCUIT_RESET_TIMEOUT:
+        raise DiscoveryCircuitOpenError('The course-discovery circuit is open, not making the request.')
+    # The reset timeout has passed: let exactly one caller try a request while the others keep failing fast.
+    if not cache.add(DISCOVERY_CIRCUIT_TRIAL_LOCK_KEY, True, settings.DISCOVERY_CLIENT_CIRCUIT_RESET_TIMEOUT):
+        raise DiscoveryCircuitOpenError('The course-discovery circuit is half-open, not making the request.')
+
+
+def _open_circuit():
+    logger.warning(
+        'Opening the course-discovery circuit for %s seconds after repeated failures.',
+        settings.DISCOVERY_CLIENT_CIRCUIT_RESET_TIMEOUT,
+    )
+    cache.set(DISCOVERY_CIRCUIT_OPENED_AT_KEY, time.time(), CIRCUIT_STATE_TIMEOUT)
+    cache.delete_many([DISCOVERY_CIRCUIT_FAILURES_KEY, DISCOVERY_CIRCUIT_TRIAL_LOCK_KEY])
+
+
+def _record_success():
+    if cache.get(DISCOVERY_CIRCUIT_OPENED_AT_KEY) is not None:
+        logger.info('Trial request to course-discovery succeeded, closing the circuit.')
+        cache.delete_many([DISCOVERY_CIRCUIT_OPENED_AT_KEY, DISCOVERY_CIRCUIT_TRIAL_LOCK_KEY])
+
+
+def _record_failure():
+    if cache.get(DISCOVERY_CIRCUIT_OPENED_AT_KEY) is not None:
+        # The trial request failed.
+        _open_circuit()
+        return
+    cache.add(DISCOVERY_CIRCUIT_FAILURES_KEY, 0, settings.DISCOVERY_CLIENT_CIRCUIT_FAILURE_WINDOW)
+    try:
+        failure_count = cache.incr(DISCOVERY_CIRCUIT_FAILURES_KEY)
+    except ValueError:
+        return
+    if failure_count >= settings.DISCOVERY_CLIENT_CIRCUIT_FAILURE_THRESHOLD:
+        _open_circuit()
+
+
+def throttled_request(send):
+    """
+    Sends a request to course-discovery through the shared rate limiter and circuit breaker.
+
+    Arguments:
+        send (callable): Zero-argument callable that makes the request and returns a ``requests.Response``.
+
+    Returns:
+        requests.Response: The response returned by ``send``.
+
+    Raises:
+        DiscoveryCircuitOpenError: If the circuit is open, in which case ``send`` is not called.
+    """
+    if not discovery_throttle_enabled():
+        return send()
+
+    _check_circuit()
+    _wait_for_shared_pause()
+    _acquire_request_budget()
+    try:
+        response = send()
+    except requests.exceptions.RequestException:
+        _record_failure()
+        raise
+
+    if response.status_code == 429:
+        pause_seconds = _get_retry_after_seconds(response)
+        cache.set(DISCOVERY_THROTTLE_PAUSED_UNTIL_KEY, time.time() + pause_seconds, int(pause_seconds) + 1)
+    if _is_failure(response.status_code):
+        _record_failure()
+    else:
+        _record_success()
+    return response
@@ -0,0 +1,140 @@
+""" Tests for the discovery response cache. """
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from enterprise_catalog.apps.api_client.constants import (
+    DISCOVERY_COURSES_ENDPOINT,
+    DISCOVERY_PROGRAMS_ENDPOINT,
+    DISCOVERY_SEARCH_ALL_ENDPOINT,
+)
+from enterprise_catalog.apps.api_client.discovery import (
+    CatalogQueryMetadata,
+    DiscoveryApiClient,
+)
+from enterprise_catalog.apps.api_client.discovery_cache import (
+    get_discovery_cache_stats,
+    get_discovery_response_cache_key,
+    get_or_fetch_discovery_response,
+)
+from enterprise_catalog.apps.catalog.tests.factories import CatalogQueryFactory
+
+
+@override_settings(SHOULD_CACHE_DISCOVERY_RESPONSES=True)
+class TestDiscoveryResponseCache(TestCase):
+    """ Tests for get_or_fetch_discovery_response. """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def _stats(self, endpoint):
+        return list(get_discovery_cache_stats([endpoint]).values())[0]
+
+    def test_cache_key_ignores_param_order(self):
+        key_a = get_discovery_response_cache_key(
+            DISCOVERY_SEARCH_ALL_ENDPOINT,
+            {'org': ['edX', 'MITx'], 'content_type': 'course', 'exclude_expired_course_run': True},
+        )
+        key_b = get_discovery_response_cache_key(
+            DISCOVERY_SEARCH_ALL_ENDPOINT,
+            {'exclude_expired_course_run': 'True', 'content_type': 'course', 'org': ['MITx', 'edX']},
+        )
+        assert key_a == key_b
+        assert key_a != get_discovery_response_cache_key(DISCOVERY_COURSES_ENDPOINT, {'org': ['edX', 'MITx']})
+
+    def test_hit_and_miss(self):
+        fetch = mock.Mock(return_value=[{'key': 'edX+DemoX'}])
+
+        first = get_or_fetch_discovery_response(DISCOVERY_COURSES_ENDPOINT, {'keys': 'edX+DemoX'}, fetch)
+        second = get_or_fetch_discovery_response(DISCOVERY_COURSES_ENDPOINT, {'keys': 'edX+DemoX'}, fetch)
+
+        assert first == second == [{'key': 'edX+DemoX'}]
+        fetch.assert_called_once()
+        assert self._stats(DISCOVERY_COURSES_ENDPOINT) == {'hit': 1, 'stale_hit': 0, 'miss': 1}
+
+    def test_empty_response_not_cached(self):
+        fetch = mock.Mock(return_value=[])
+
+        get_or_fetch_discovery_response(DISCOVERY_COURSES_ENDPOINT, {'keys': 'edX+DemoX'}, fetch)
+        get_or_fetch_discovery_response(DISCOVERY_COURSES_ENDPOINT, {'keys': 'edX+DemoX'}, fetch)
+
+        assert fetch.call_count == 2
+
+    @override_settings(SHOULD_CACHE_DISCOVERY_RESPONSES=False)
+    def test_disabled(self):
+        fetch = mock.Mock(return_value=[{'key': 'edX+DemoX'}])
+
+        get_or_fetch_discovery_response(DISCOVERY_COURSES_ENDPOINT, {'keys': 'edX+DemoX'}, fetch)
+        get_or_fetch_discovery_response(DISCOVERY_COURSES_ENDPOINT, {'keys': 'edX+DemoX'}, fetch)
+
+        assert fetch.call_count == 2
+        assert self._stats(DISCOVERY_COURSES_ENDPOINT) == {'hit': 0, 'stale_hit': 0, 'miss': 0}
+
+    @mock.patch('enterprise_catalog.apps.api_client.discovery_cache.time.time')
+    def test_stale_while_revalidate(self, mock_time):
+        mock_time.return_value = 1000
+        get_or_fetch_discovery_response(DISCOVERY_PROGRAMS_ENDPOINT, {'uuids': 'abc'}, lambda: ['old'])
+
+        # Past the program timeout, but still within the stale window.
+        mock_time.return_value = 1000 + 60 * 60 + 1
+        refreshed = get_or_fetch_discovery_response(DISCOVERY_PROGRAMS_ENDPOINT, {'uuids': 'abc'}, lambda: ['new'])
+        assert refreshed == ['new']
+        assert get_or_fetch_discovery_response(
+            DISCOVERY_PROGRAMS_ENDPOINT, {'uuids': 'abc'}, lambda: ['newer'],
+        ) == ['new']
+        assert self._stats(DISCOVERY_PROGRAMS_ENDPOINT) == {'hit': 1, 'stale_hit': 1, 'miss': 1}
+
+    @mock.patch('enterprise_catalog.apps.api_client.discovery_cache.time.time')
+    def test_stale_served_while_another_caller_revalidates(self, mock_time):
+        mock_time.return_value = 1000
+        get_or_fetch_discovery_response(DISCOVERY_PROGRAMS_ENDPOINT, {'uuids': 'abc'}, lambda: ['old'])
+        mock_time.return_value = 1000 + 60 * 60 + 1
+
+        def concurrent_fetch():
+            # While this caller refreshes, a concurrent caller is served the stale response.
+            concurrent = get_or_fetch_discovery_response(
+                DISCOVERY_PROGRAMS_ENDPOINT, {'uuids': 'abc'}, mock.Mock(side_effect=AssertionError),
+            )
+            assert concurrent == ['old']
+            return ['new']
+
+        assert get_or_fetch_discovery_response(
+            DISCOVERY_PROGRAMS_ENDPOINT, {'uuids': 'abc'}, concurrent_fetch,
+        ) == ['new']
+
+    @mock.patch('enterprise_catalog.apps.api_client.discovery_cache.time.time')
+    def test_stale_served_when_revalidation_fails(self, mock_time):
+        mock_time.return_value = 1000
+        get_or_fetch_discovery_response(DISCOVERY_SEARCH_ALL_ENDPOINT, {'org': 'edX'}, lambda: ['old'])
+        mock_time.return_value = 1000 + 60 * 60 + 1
+
+        response = get_or_fetch_discovery_response(
+            DISCOVERY_SEARCH_ALL_ENDPOINT, {'org': 'edX'}, mock.Mock(side_effect=Exception('boom')),
+        )
+        assert response == ['old']
+
+    @mock.patch('enterprise_catalog.apps.api_client.base_oauth.OAuthAPIClient')
+    def test_fetch_courses_by_keys_shares_cache(self, mock_oauth_client):
+        mock_oauth_client.return_value.get.return_value.json.return_value = {
+            'results': [{'key': 'edX+DemoX'}],
+        }
+
+        assert DiscoveryApiClient().fetch_courses_by_keys(['edX+DemoX']) == [{'key': 'edX+DemoX'}]
+        assert DiscoveryApiClient().fetch_courses_by_keys(['edX+DemoX']) == [{'key': 'edX+DemoX'}]
+
+        mock_oauth_client.return_value.get.assert_called_once()
+
+    @mock.patch('enterprise_catalog.apps.api_client.base_oauth.OAuthAPIClient')
+    def test_catalog_query_metadata_cached_by_content_filter(self, mock_oauth_client):
+        mock_oauth_client.return_value.post.return_value.status_code = 200
+        mock_oauth_client.return_value.post.return_value.json.return_value = {
+            'results': [{'key': 'fakeX'}],
+        }
+        catalog_query = CatalogQueryFactory()
+
+        assert CatalogQueryMetadata(catalog_query).metadata == [{'key': 'fakeX'}]
+        assert CatalogQueryMetadata(catalog_query).metadata == [{'key': 'fakeX'}]
+
+        mock_oauth_client.return_value.post.assert_called_once()
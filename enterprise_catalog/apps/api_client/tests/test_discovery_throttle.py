@@ -0,0 +1,173 @@
+""" Tests for the discovery rate limiter and circuit breaker. """
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import requests
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from enterprise_catalog.apps.api_client.discovery import DiscoveryApiClient
+from enterprise_catalog.apps.api_client.discovery_throttle import (
+    DiscoveryCircuitOpenError,
+    throttled_request,
+)
+
+
+class StubDiscoveryServer:
+    """
+    A local HTTP server that answers each request with the next (status, headers, body) in ``responses``,
+    repeating the last one once the script runs out.
+    """
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.request_count = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):  # pylint: disable=invalid-name
+                status, headers, body = stub.responses[min(stub.request_count, len(stub.responses) - 1)]
+                stub.request_count += 1
+                self.send_response(status)
+                for header, value in headers.items():
+                    self.send_header(header, value)
+                self.send_header('Content-Type', 'application/json')
+                self.end_headers()
+                self.wfile.write(json.dumps(body).encode())
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/course_review/'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+OK_RESPONSE = (200, {}, {'next': None, 'results': [{'course_key': 'edX+DemoX'}]})
+UNAVAILABLE_RESPONSE = (503, {}, {})
+
+
+@override_settings(
+    SHOULD_THROTTLE_DISCOVERY_REQUESTS=True,
+    DISCOVERY_CLIENT_MAX_REQUESTS_PER_SECOND=1000,
+    DISCOVERY_CLIENT_CIRCUIT_FAILURE_THRESHOLD=3,
+    DISCOVERY_CLIENT_CIRCUIT_RESET_TIMEOUT=30,
+)
+@mock.patch('enterprise_catalog.apps.api_client.discovery.time.sleep')
+@mock.patch(
+    'enterprise_catalog.apps.api_client.base_oauth.OAuthAPIClient',
+    side_effect=lambda *args: requests.Session(),
+)
+class TestDiscoveryThrottleAgainstStubServer(TestCase):
+    """
+    Simulates 429/5xx storms from course-discovery against a local stub server.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def _get_course_reviews(self, server):
+        with mock.patch('enterprise_catalog.apps.api_client.discovery.DISCOVERY_COURSE_REVIEWS_ENDPOINT', server.url):
+            return DiscoveryApiClient().get_course_reviews()
+
+    def test_5xx_storm_opens_circuit(self, mock_oauth_client, mock_sleep):  # pylint: disable=unused-argument
+        with StubDiscoveryServer([UNAVAILABLE_RESPONSE]) as server:
+            with self.assertRaises(DiscoveryCircuitOpenError):
+                self._get_course_reviews(server)
+            # Retrying stopped as soon as the failure threshold opened the circuit.
+            assert server.request_count == 3
+
+            # Other callers fail fast without reaching discovery.
+            with self.assertRaises(DiscoveryCircuitOpenError):
+                self._get_course_reviews(server)
+            assert server.request_count == 3
+
+    def test_circuit_closes_after_successful_trial(self, mock_oauth_client, mock_sleep):  # pylint: disable=unused-argument
+        with StubDiscoveryServer([UNAVAILABLE_RESPONSE] * 3 + [OK_RESPONSE]) as server:
+            with mock.patch('enterprise_catalog.apps.api_client.discovery_throttle.time.time') as mock_time:
+                mock_time.return_value = 1000.5
+                with self.assertRaises(DiscoveryCircuitOpenError):
+                    self._get_course_reviews(server)
+
+                # Once the reset timeout passes, a trial request goes through and closes the circuit.
+                mock_time.return_value = 1031.5
+                assert self._get_course_reviews(server) == {'edX+DemoX': {'course_key': 'edX+DemoX'}}
+                assert self._get_course_reviews(server) == {'edX+DemoX': {'course_key': 'edX+DemoX'}}
+            assert server.request_count == 5
+
+    def test_failed_trial_reopens_circuit(self, mock_oauth_client, mock_sleep):  # pylint: disable=unused-argument
+        with StubDiscoveryServer([UNAVAILABLE_RESPONSE]) as server:
+            with mock.patch('enterprise_catalog.apps.api_client.discovery_throttle.time.time') as mock_time:
+                mock_time.return_value = 1000.5
+                with self.assertRaises(DiscoveryCircuitOpenError):
+                    self._get_course_reviews(server)
+
+                mock_time.return_value = 1031.5
+                with self.assertRaises(DiscoveryCircuitOpenError):
+                    self._get_course_reviews(server)
+                # Only the single trial request reached discovery before the circuit reopened.
+                assert server.request_count == 4
+
+    def test_429_pauses_all_callers(self, mock_oauth_client, mock_sleep):  # pylint: disable=unused-argument
+        with StubDiscoveryServer([(429, {'Retry-After': '7'}, {}), OK_RESPONSE]) as server:
+            with mock.patch('enterprise_catalog.apps.api_client.discovery_throttle.time.time', return_value=1000.5):
+                assert self._get_course_reviews(server) == {'edX+DemoX': {'course_key': 'edX+DemoX'}}
+
+        # After its own backoff, the retry also waited out discovery's Retry-After.
+        # (The client and the throttle share the patched ``time.sleep``.)
+        assert mock_sleep.mock_calls == [mock.call(2), mock.call(7.0)]
+        assert server.request_count == 2
+
+    @override_settings(DISCOVERY_CLIENT_MAX_RATE_LIMITED_PAUSE=30)
+    def test_429_pause_is_capped(self, mock_oauth_client, mock_sleep):  # pylint: disable=unused-argument
+        with StubDiscoveryServer([(429, {'Retry-After': '86400'}, {}), OK_RESPONSE]) as server:
+            with mock.patch('enterprise_catalog.apps.api_client.discovery_throttle.time.time', return_value=1000.5):
+                assert self._get_course_reviews(server) == {'edX+DemoX': {'course_key': 'edX+DemoX'}}
+
+        assert mock_sleep.mock_calls == [mock.call(2), mock.call(30)]
+
+
+@override_settings(SHOULD_THROTTLE_DISCOVERY_REQUESTS=True, DISCOVERY_CLIENT_MAX_REQUESTS_PER_SECOND=2)
+class TestDiscoveryRateLimiter(TestCase):
+    """ Tests for the shared request budget. """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    @mock.patch('enterprise_catalog.apps.api_client.discovery_throttle.time')
+    def test_requests_over_budget_wait_for_next_second(self, mock_time):
+        clock = {'now': 1000.25}
+        mock_time.time.side_effect = lambda: clock['now']
+
+        def advance(seconds):
+            clock['now'] += seconds
+        mock_time.sleep.side_effect = advance
+
+        send = mock.Mock(return_value=mock.Mock(status_code=200))
+        for _ in range(3):
+            throttled_request(send)
+
+        assert send.call_count == 3
+        mock_time.sleep.assert_called_once_with(0.75)
+
+    @override_settings(SHOULD_THROTTLE_DISCOVERY_REQUESTS=False)
+    @mock.patch('enterprise_catalog.apps.api_client.discovery_throttle.time')
+    def test_disabled(self, mock_time):
+        send = mock.Mock(return_value=mock.Mock(status_code=503))
+        for _ in range(25):
+            throttled_request(send)
+
+        assert send.call_count == 25
+        mock_time.sleep.assert_not_called()
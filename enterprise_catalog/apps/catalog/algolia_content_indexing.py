@@ -1,11 +1,111 @@
-from enterprise_catalog.apps.catalog.filters import does_query_match_content
+from collections import defaultdict
+
+from enterprise_catalog.apps.catalog.filters import (
+    compile_query_filter,
+    parse_query_filter,
+)
 from enterprise_catalog.apps.catalog.models import (
     ContentMetadata,
     EnterpriseCatalog,
 )
 
 
-def get_catalogs_for_content(course_key, catalog_filter=None):
+# Fields whose exact/IN filters are indexed, most selective first.
+INDEXED_FILTER_FIELDS = ('aggregation_key', 'org', 'content_type')
+
+
+def _get_indexed_clause(content_filter):
+    """
+    Returns the ``(field, values)`` of the most selective exact/IN clause of ``content_filter`` on one of
+    the ``INDEXED_FILTER_FIELDS``, or None if the filter has no such clause.
+    """
+    exact_values_by_field = {}
+    for field, comparison_kind, query_value in parse_query_filter(content_filter):
+        if comparison_kind != 'exact' or field not in INDEXED_FILTER_FIELDS:
+            continue
+        values = query_value if isinstance(query_value, list) else [query_value]
+        try:
+            exact_values_by_field[field] = frozenset(values)
+        except TypeError:
+            # unhashable values cannot be looked up in the index
+            continue
+    for field in INDEXED_FILTER_FIELDS:
+        if field in exact_values_by_field:
+            return field, exact_values_by_field[field]
+    return None
+
+
+class CatalogContentIndex:
+    """
+    An inverted index from content metadata field values to the catalogs whose query could include that content.
+
+    Every catalog query with an exact/IN filter on ``aggregation_key``, ``org`` or ``content_type`` is indexed
+    under the values of one such filter, since content can only match the query if it has one of those values.
+    Queries without one (e.g. range-only filters) are candidates for every lookup. Only the candidates' compiled
+    filters are evaluated, so a lookup does not scan every catalog.
+
+    Build the index once and reuse it for many lookups; it does not see later changes to the catalogs.
+    """
+
+    def __init__(self, catalogs):
+        self.catalogs_by_query_id = defaultdict(list)
+        self.query_filters_by_id = {}
+        self.query_ids_by_field_value = {field: defaultdict(set) for field in INDEXED_FILTER_FIELDS}
+        self.unindexed_query_ids = set()
+        self.catalog_positions = {}
+
+        for position, catalog in enumerate(catalogs):
+            catalog_query = catalog.catalog_query
+            if catalog_query is None:
+                continue
+            self.catalog_positions[catalog.uuid] = position
+            self.catalogs_by_query_id[catalog_query.id].append(catalog)
+            if catalog_query.id in self.query_filters_by_id:
+                continue
+            self.query_filters_by_id[catalog_query.id] = compile_query_filter(catalog_query.content_filter)
+            indexed_clause = _get_indexed_clause(catalog_query.content_filter)
+            if indexed_clause is None:
+                self.unindexed_query_ids.add(catalog_query.id)
+                continue
+            field, values = indexed_clause
+            for value in values:
+                self.query_ids_by_field_value[field][value].add(catalog_query.id)
+
+    def get_candidate_query_ids(self, json_metadata):
+        """
+        Returns the ids of the catalog queries that could match content with the given ``json_metadata``.
+        """
+        candidate_query_ids = set(self.unindexed_query_ids)
+        for field, query_ids_by_value in self.query_ids_by_field_value.items():
+            try:
+                candidate_query_ids.update(query_ids_by_value.get(json_metadata.get(field), ()))
+            except TypeError:
+                # an unhashable content value cannot equal any of the indexed values
+                continue
+        return candidate_query_ids
+
+    def get_catalogs_for_content(self, json_metadata):
+        """
+        Returns the catalogs whose query matches content with the given ``json_metadata``,
+        in the order the catalogs were indexed.
+        """
+        included_catalogs = []
+        for query_id in self.get_candidate_query_ids(json_metadata):
+            if self.query_filters_by_id[query_id](json_metadata):
+                included_catalogs.extend(self.catalogs_by_query_id[query_id])
+        return sorted(included_catalogs, key=lambda catalog: self.catalog_positions[catalog.uuid])
+
+
+def build_catalog_content_index(catalog_filter=None):
+    """
+    Builds a ``CatalogContentIndex`` over all catalogs, or only those matching ``catalog_filter``.
+    """
+    if catalog_filter is None:
+        catalog_filter = {}
+    return CatalogContentIndex(EnterpriseCatalog.objects.filter(**catalog_filter).select_related('catalog_query'))
+
+
+def get_catalogs_for_content(course_key, catalog_filter=None, catalog_index=None):
     """
     Retrieve all catalogs that contain the given course_key.
 
@@ -14,13 +114,11 @@ def get_catalogs_for_content(course_key, catalog_filter=None):
             filters
 
         catalog_filter (dict): Optional filter to apply to the catalogs queryset
+
+        catalog_index (CatalogContentIndex): Optional index to look the course up in, for callers
+            looking up many courses; ``catalog_filter`` is ignored when it is given.
     """
     content_object = ContentMetadata.objects.get(content_key=course_key)
-    if catalog_filter is None:
-        catalog_filter = {}
-    included_catalogs = []
-    for catalog in EnterpriseCatalog.objects.filter(**catalog_filter):
-        if does_query_match_content(catalog.catalog_query.content_filter, content_object.json_metadata):
-            included_catalogs.append(catalog)
-
-    return included_catalogs
+    if catalog_index is None:
+        catalog_index = build_catalog_content_index(catalog_filter)
+    return catalog_index.get_catalogs_for_content(content_object.json_metadata)
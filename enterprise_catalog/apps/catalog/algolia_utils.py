@@ -14,6 +14,7 @@ from pytz import UTC
 
 from enterprise_catalog.apps.api_client.algolia import AlgoliaSearchClient
 from enterprise_catalog.apps.api_client.constants import (
+    ALGOLIA_INDEX_VERSION_CACHE_KEY,
     COURSE_REVIEW_BASE_AVG_REVIEW_SCORE,
     COURSE_REVIEW_BAYESIAN_CONFIDENCE_NUMBER,
     DISCOVERY_AVERAGE_COURSE_REVIEW_CACHE_KEY,
@@ -401,6 +402,29 @@ def configure_algolia_index(algolia_client):
     algolia_client.set_index_settings(ALGOLIA_REPLICA_INDEX_SETTINGS, primary_index=False)
 
 
+def get_algolia_index_version():
+    """
+    Returns an opaque identifier of the current contents of the Algolia index, which changes every time the index
+    is rebuilt. Artifacts derived from the index (e.g. catalog exports) can be keyed by it.
+
+    If the cached version has been lost, a new one is started, so a lost version never matches an older one.
+    """
+    return cache.get_or_set(ALGOLIA_INDEX_VERSION_CACHE_KEY, _new_algolia_index_version, timeout=None)
+
+
+def update_algolia_index_version():
+    """
+    Starts a new Algolia index version, to be called after the index has been rebuilt.
+    """
+    index_version = _new_algolia_index_version()
+    cache.set(ALGOLIA_INDEX_VERSION_CACHE_KEY, index_version, timeout=None)
+    return index_version
+
+
+def _new_algolia_index_version():
+    return str(time.time_ns())
+
+
 def get_algolia_object_id(content_type, uuid):
     """
     Given a uuid, returns an object_id to use for Algolia indexing.
@@ -417,28 +441,43 @@ def get_algolia_object_id(content_type, uuid):
     return None
 
 
-def set_global_course_review_avg():
+def _iter_course_reviews_from_content_metadata():
     """
-    Retrieve all course reviews from the ContentMetadata records in the database, calculate the average review value
-    and set the value to py-cache.
+    Yields (course key, course review) for every course ContentMetadata record in the database.
     """
-    rolling_rating_sum = 0.0
-    total_number_reviews = 0.0
     course_only_filter = Q(content_type='course')
     # only courses have course reviews
     for items_batch in batch_by_pk(ContentMetadata, batch_size=25, extra_filter=course_only_filter):
         for item in items_batch:
-            if not item.json_metadata.get('avg_course_rating') or not item.json_metadata.get('reviews_count'):
-                continue
-
-            reviews_count = float(item.json_metadata.get('reviews_count'))
-            avg_rating = float(item.json_metadata.get('avg_course_rating'))
-            logger.info(
-                f"set_global_course_review_avg found {reviews_count} course reviews for course: {item.content_key} "
-                f"with avg score of {avg_rating}"
-            )
-            rolling_rating_sum += (avg_rating * reviews_count)
-            total_number_reviews += reviews_count
+            yield item.content_key, item.json_metadata
+
+
+def set_global_course_review_avg(course_reviews=None):
+    """
+    Calculate the average course review value and set the value to py-cache.
+
+    Arguments:
+        course_reviews (dict): Optional snapshot of course reviews from discovery's /course_review/ endpoint, keyed
+            by course key. If not given, the reviews are read from all course ContentMetadata records in the database.
+    """
+    rolling_rating_sum = 0.0
+    total_number_reviews = 0.0
+    if course_reviews is None:
+        course_reviews_items = _iter_course_reviews_from_content_metadata()
+    else:
+        course_reviews_items = course_reviews.items()
+    for content_key, course_review in course_reviews_items:
+        if not course_review.get('avg_course_rating') or not course_review.get('reviews_count'):
+            continue
+
+        reviews_count = float(course_review.get('reviews_count'))
+        avg_rating = float(course_review.get('avg_course_rating'))
+        logger.info(
+            f"set_global_course_review_avg found {reviews_count} course reviews for course: {content_key} "
+            f"with avg score of {avg_rating}"
+        )
+        rolling_rating_sum += (avg_rating * reviews_count)
+        total_number_reviews += reviews_count
 
     if rolling_rating_sum == 0 or total_number_reviews == 0:
         logger.warning("set_global_course_review_avg came up with no ratings, somehow.")
@@ -0,0 +1,125 @@
+"""
+Columnar evaluation of catalog query filters across many content metadata records at once.
+
+Where ``filters.compile_query_filter`` answers "does this query match this content?" one
+``json_metadata`` dict at a time, ``ContentMetadataColumns`` loads the values of each filtered
+field for every row once, and evaluates a whole ``content_filter`` as a boolean mask over all rows.
+"""
+import numpy as np
+
+from enterprise_catalog.apps.catalog.filters import (
+    NUMERIC_COMPARISONS,
+    parse_query_filter,
+)
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class ContentMetadataColumns:
+    """
+    The filterable ``json_metadata`` fields of many content metadata records, stored column by column.
+
+    Each field's column is built the first time a filter looks at it:
+
+    * values are factorized into integer codes, so exact/IN/NOT IN comparisons are ``np.isin`` over the codes;
+    * numeric comparisons use a float column in which values float() cannot parse are NaN, and never match.
+
+    Masks give the same answers as ``filters.does_query_match_content``, except that content values
+    float() cannot parse do not match numeric comparisons instead of raising ``ValueError``.
+    """
+
+    def __init__(self, json_metadata_rows):
+        self._rows = list(json_metadata_rows)
+        self._codes_by_field = {}
+        self._value_index_by_field = {}
+        self._unhashable_values_by_field = {}
+        self._numbers_by_field = {}
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _factorize(self, field):
+        if field in self._codes_by_field:
+            return
+        codes = np.empty(len(self._rows), dtype=np.int64)
+        value_index = {}
+        # unhashable values (e.g. lists) each get a code of their own and are compared with ==
+        unhashable_values = []
+        for row_index, row in enumerate(self._rows):
+            value = row.get(field)
+            try:
+                code = value_index.setdefault(value, len(value_index) + len(unhashable_values))
+            except TypeError:
+                code = len(value_index) + len(unhashable_values)
+                unhashable_values.append((code, value))
+            codes[row_index] = code
+        self._codes_by_field[field] = codes
+        self._value_index_by_field[field] = value_index
+        self._unhashable_values_by_field[field] = unhashable_values
+
+    def _codes_equal_to(self, field, query_values):
+        """
+        Returns the codes of the ``field`` values equal to any of ``query_values``.
+        """
+        value_index = self._value_index_by_field[field]
+        matching_codes = []
+        for query_value in query_values:
+            try:
+                code = value_index.get(query_value)
+            except TypeError:
+                code = None
+            if code is not None:
+                matching_codes.append(code)
+            matching_codes.extend(
+                code for code, value in self._unhashable_values_by_field[field] if value == query_value
+            )
+        return matching_codes
+
+    def _numbers(self, field):
+        if field not in self._numbers_by_field:
+            self._numbers_by_field[field] = np.fromiter(
+                (_to_float(row.get(field)) for row in self._rows), dtype=np.float64, count=len(self._rows),
+            )
+        return self._numbers_by_field[field]
+
+    def _in_mask(self, field, query_values):
+        self._factorize(field)
+        return np.isin(self._codes_by_field[field], self._codes_equal_to(field, query_values))
+
+    def _numeric_mask(self, field, query_value, comparison_kind):
+        try:
+            query_number = float(query_value)
+        except TypeError:
+            return np.zeros(len(self._rows), dtype=bool)
+        return NUMERIC_COMPARISONS[comparison_kind](self._numbers(field), query_number)
+
+    def _clause_mask(self, field, comparison_kind, query_value):
+        query_values = query_value if isinstance(query_value, list) else [query_value]
+        if comparison_kind in NUMERIC_COMPARISONS:
+            mask = np.ones(len(self._rows), dtype=bool)
+            for value in query_values:
+                mask &= self._numeric_mask(field, value, comparison_kind)
+            return mask
+        mask = self._in_mask(field, query_values)
+        # "exact" means "IN", "not"/"exclude" mean "NOT IN"
+        return mask if comparison_kind == 'exact' else ~mask
+
+    def evaluate(self, query_dict):
+        """
+        Evaluate a catalog query's ``content_filter`` against every row.
+
+        Returns:
+            numpy.ndarray: Boolean mask of the rows the filter matches.
+
+        Raises:
+            QueryFilterException: if the filter uses syntax the local filtering does not support.
+        """
+        mask = np.ones(len(self._rows), dtype=bool)
+        for field, comparison_kind, query_value in parse_query_filter(query_dict):
+            mask &= self._clause_mask(field, comparison_kind, query_value)
+        return mask
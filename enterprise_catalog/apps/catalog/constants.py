@@ -120,6 +120,15 @@ COURSE_RUN_RESTRICTION_TYPE_KEY = 'restriction_type'
 RESTRICTION_FOR_B2B = 'custom-b2b-enterprise'
 QUERY_FOR_RESTRICTED_RUNS = {'include_restricted': RESTRICTION_FOR_B2B}
 
+FORCE_INCLUDE_AGGREGATION_KEYS_FILTER_KEY = 'enterprise_force_include_aggregation_keys'
+
+# Keys of a CatalogQuery content_filter that are interpreted by this service itself
+# and do not change the results returned by course-discovery's /search/all/ endpoint.
+CONTENT_FILTER_KEYS_IGNORED_BY_DISCOVERY = (
+    FORCE_INCLUDE_AGGREGATION_KEYS_FILTER_KEY,
+    RESTRICTED_RUNS_ALLOWED_KEY,
+)
+
 AGGREGATION_KEY_PREFIX = 'course:'
 
 COURSE_RUN_KEY_PREFIX = 'course-v1:'
@@ -2,6 +2,7 @@
 Utility functions for catalog query filtering without elasticsearch
 """
 import logging
+import operator
 
 
 logger = logging.getLogger(__name__)
@@ -62,7 +63,7 @@ def extract_field_and_comparison_kind(raw_query_key):
         field = raw_query_key
     if comparison_kind not in SUPPORTED_FILTER_COMPARISONS:
         raise QueryFilterException(f'unsupported action "{comparison_kind}" from query key "{raw_query_key}"')
-    logger.debug(f'extract_field_and_action "{raw_query_key}" -> {field}, {comparison_kind}')
+    logger.debug('extract_field_and_action "%s" -> %s, %s', raw_query_key, field, comparison_kind)
     return field, comparison_kind
 
 
@@ -114,14 +115,14 @@ def does_query_match_content(query_dict, content_metadata_dict):
             )
 
         content_value = content_metadata_dict.get(field)
-        logger.debug(f'{query_key}, {field} -> {query_value}, {content_value}')
+        logger.debug('%s, %s -> %s, %s', query_key, field, query_value, content_value)
 
         field_result = False
         if isinstance(query_value, list):
             field_results = []
             for query_value_item in query_value:
                 this_field_result = field_comparison(query_value_item, content_value, comparison_kind)
-                logger.debug(f'{query_value_item}, {content_value}, {comparison_kind} -> {this_field_result}')
+                logger.debug('%s, %s, %s -> %s', query_value_item, content_value, comparison_kind, this_field_result)
                 field_results.append(this_field_result)
             # "exact" here means "IN" as in "is edx+demo IN ['edx+demo', 'mit+demo']"
             if comparison_kind == 'exact':
@@ -132,7 +133,140 @@ def does_query_match_content(query_dict, content_metadata_dict):
         else:
             field_result = field_comparison(query_value, content_value, comparison_kind)
 
-        logger.debug(f'{query_key}, {field} {comparison_kind} -> {query_value}, {content_value}, {field_result}')
+        logger.debug(
+            '%s, %s %s -> %s, %s, %s', query_key, field, comparison_kind, query_value, content_value, field_result,
+        )
         results[field] = field_result
-    logger.debug(results)
+    logger.debug('%s', results)
     return all(results.values())
+
+
+NUMERIC_COMPARISONS = {
+    'gt': operator.gt,
+    'gte': operator.ge,
+    'lt': operator.lt,
+    'lte': operator.le,
+}
+
+
+def _compile_numeric_comparison(query_value, comparison_kind):
+    """
+    Returns a one-argument test for a numeric comparison against ``query_value``,
+    with ``query_value`` converted to a float once up front.
+    """
+    try:
+        query_number = float(query_value)
+    except TypeError:
+        # ``field_comparison`` treats a value float() cannot parse as a non-match
+        return lambda content_value: False
+    except ValueError:
+        # keep raising the same error as ``field_comparison``, but only when the comparison is made
+        return lambda content_value: field_comparison(query_value, content_value, comparison_kind)
+
+    compare = NUMERIC_COMPARISONS[comparison_kind]
+
+    def numeric_test(content_value):
+        try:
+            return compare(float(content_value), query_number)
+        except TypeError:
+            return False
+    return numeric_test
+
+
+def _compile_list_comparison(query_values, comparison_kind):
+    """
+    Returns a one-argument test for a list of query values:
+    "exact" means "IN" and every other comparison kind means "NOT IN".
+    """
+    if comparison_kind in NUMERIC_COMPARISONS:
+        item_tests = [_compile_numeric_comparison(value, comparison_kind) for value in query_values]
+        return lambda content_value: all(test(content_value) for test in item_tests)
+
+    try:
+        query_value_set = frozenset(query_values)
+    except TypeError:
+        # unhashable query values (e.g. nested lists) are compared one at a time
+        query_value_set = None
+
+    def is_in(content_value):
+        if query_value_set is not None:
+            try:
+                return content_value in query_value_set
+            except TypeError:
+                pass
+        return any(content_value == query_value for query_value in query_values)
+
+    if comparison_kind == 'exact':
+        return is_in
+    return lambda content_value: not is_in(content_value)
+
+
+def _compile_comparison(query_value, comparison_kind):
+    """
+    Returns a one-argument test equivalent to comparing a content value
+    against ``query_value`` the way ``does_query_match_content`` does.
+    """
+    if isinstance(query_value, list):
+        return _compile_list_comparison(query_value, comparison_kind)
+    if comparison_kind == 'exact':
+        return lambda content_value: content_value == query_value
+    if comparison_kind in ('not', 'exclude'):
+        return lambda content_value: content_value != query_value
+    return _compile_numeric_comparison(query_value, comparison_kind)
+
+
+def parse_query_filter(query_dict):
+    """
+    Parse a catalog query's ``content_filter`` into ``(field, comparison_kind, query_value)`` clauses.
+
+    Like ``does_query_match_content``, a later key for the same field replaces an earlier one.
+
+    Raises:
+        QueryFilterException: if the filter uses syntax the local filtering does not support.
+    """
+    clauses = {}
+    for raw_query_key, query_value in query_dict.items():
+        query_key = fix_common_query_key_mistakes(raw_query_key)
+        field, comparison_kind = extract_field_and_comparison_kind(query_key)
+        clauses[field] = (field, comparison_kind, query_value)
+    return list(clauses.values())
+
+
+class CompiledQueryFilter:
+    """
+    A catalog query ``content_filter`` parsed once into per-field tests, so it can be
+    evaluated against many ``json_metadata`` dicts without re-parsing the filter keys.
+
+    Calling the object with a content metadata dict gives the same answer as
+    ``does_query_match_content``; evaluation stops at the first field that does not match.
+    """
+
+    def __init__(self, query_dict):
+        self.field_tests = tuple(
+            (field, _compile_comparison(query_value, comparison_kind))
+            for field, comparison_kind, query_value in parse_query_filter(query_dict)
+        )
+
+    @property
+    def fields(self):
+        """
+        The content metadata fields the filter looks at.
+        """
+        return [field for field, _ in self.field_tests]
+
+    def __call__(self, content_metadata_dict):
+        get_content_value = content_metadata_dict.get
+        for field, test in self.field_tests:
+            if not test(get_content_value(field)):
+                return False
+        return True
+
+
+def compile_query_filter(query_dict):
+    """
+    Compile a catalog query's ``content_filter`` into a reusable predicate.
+
+    Raises:
+        QueryFilterException: if the filter uses syntax the local filtering does not support.
+    """
+    return CompiledQueryFilter(query_dict)
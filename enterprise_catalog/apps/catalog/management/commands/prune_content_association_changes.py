@@ -0,0 +1,44 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from enterprise_catalog.apps.catalog.models import ContentAssociationChange
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete catalog query content association changes older than the retention period'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            dest='dry_run',
+            action='store_true',
+            default=False,
+            help='Count the changes to be deleted, but do not actually delete them.',
+        )
+        parser.add_argument(
+            '--days',
+            dest='days',
+            default=None,
+            type=int,
+            help=(
+                'Number of days to keep changes for. '
+                'Defaults to settings.CONTENT_ASSOCIATION_CHANGES_RETENTION_DAYS.'
+            ),
+        )
+
+    def handle(self, *_args, **options):
+        """
+        Deletes ContentAssociationChange records older than the retention period.
+        """
+        dry_run = options.get('dry_run', False)
+        pruned_count = ContentAssociationChange.prune(older_than_days=options.get('days'), dry_run=dry_run)
+        if dry_run:
+            logger.info('[Dry Run] Would have pruned %d content association changes.', pruned_count)
+        else:
+            logger.info('Pruned %d content association changes.', pruned_count)
@@ -0,0 +1,41 @@
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from enterprise_catalog.apps.catalog.models import ContentAssociationChange
+from enterprise_catalog.apps.catalog.tests.factories import CatalogQueryFactory
+from enterprise_catalog.apps.catalog.utils import localized_utcnow
+
+
+class PruneContentAssociationChangesCommandTests(TestCase):
+    command_name = 'prune_content_association_changes'
+
+    def setUp(self):
+        super().setUp()
+        catalog_query = CatalogQueryFactory()
+        ContentAssociationChange.record_changes(catalog_query, ['old-course', 'new-course'], [])
+        ContentAssociationChange.objects.filter(content_key='old-course').update(
+            created=localized_utcnow() - timedelta(days=40),
+        )
+
+    def test_prune_content_association_changes(self):
+        """
+        Verify that the command deletes only the changes older than the retention period.
+        """
+        call_command(self.command_name)
+        assert list(ContentAssociationChange.objects.values_list('content_key', flat=True)) == ['new-course']
+
+    def test_prune_content_association_changes_dry_run(self):
+        """
+        Verify that the command does not delete anything on a dry run.
+        """
+        call_command(self.command_name, dry_run=True)
+        assert ContentAssociationChange.objects.count() == 2
+
+    def test_prune_content_association_changes_days(self):
+        """
+        Verify that the retention period can be overridden.
+        """
+        call_command(self.command_name, days=50)
+        assert ContentAssociationChange.objects.count() == 2
@@ -136,3 +136,37 @@ class UpdateContentMetadataCommandTests(TestCase):
             mock_catalog_task.s(catalog_query_id=self.catalog_query_b, force=True, dry_run=False),
         ])
         mock_full_metadata_task.apply.assert_called_once_with(kwargs={"force": True, "dry_run": False})
+
+    @mock.patch(
+        'enterprise_catalog.apps.catalog.management.commands.update_content_metadata.fetch_missing_course_metadata_task')
+    @mock.patch(
+        'enterprise_catalog.apps.catalog.management.commands.update_content_metadata.fetch_missing_pathway_metadata_task')
+    @mock.patch('enterprise_catalog.apps.catalog.management.commands.update_content_metadata.group')
+    @mock.patch(
+        'enterprise_catalog.apps.catalog.management.commands.update_content_metadata'
+        '.update_catalog_query_group_metadata_task')
+    @mock.patch('enterprise_catalog.apps.catalog.management.commands.update_content_metadata.update_catalog_metadata_task')
+    @mock.patch('enterprise_catalog.apps.catalog.management.commands.update_content_metadata.update_full_content_metadata_task')
+    def test_update_content_metadata_coalesces_equivalent_queries(
+        self, mock_full_metadata_task, mock_catalog_task, mock_group_task, mock_group,
+        mock_fetch_missing_pathway, mock_fetch_missing_course,
+    ):
+        """
+        Verify that catalog queries only differing in keys discovery ignores are updated by one group task.
+        """
+        catalog_query_c = CatalogQueryFactory(
+            content_filter={
+                **self.catalog_query_a.content_filter,
+                'enterprise_force_include_aggregation_keys': ['course:edX+DemoX'],
+            },
+        )
+        EnterpriseCatalogFactory(catalog_query=catalog_query_c)
+
+        call_command(self.command_name)
+
+        mock_group_task.s.assert_called_once()
+        group_task_args, group_task_kwargs = mock_group_task.s.call_args
+        assert sorted(group_task_args[0]) == [self.catalog_query_a.id, catalog_query_c.id]
+        assert group_task_kwargs == {'force': False, 'dry_run': False}
+        mock_catalog_task.s.assert_called_once_with(self.catalog_query_b.id, force=False, dry_run=False)
+        mock_group.assert_called_once()
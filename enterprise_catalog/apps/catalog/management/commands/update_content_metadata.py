@@ -7,10 +7,14 @@ from enterprise_catalog.apps.api.tasks import (
     fetch_missing_course_metadata_task,
     fetch_missing_pathway_metadata_task,
     update_catalog_metadata_task,
+    update_catalog_query_group_metadata_task,
     update_full_content_metadata_task,
 )
 from enterprise_catalog.apps.catalog.constants import COURSE, TASK_TIMEOUT
 from enterprise_catalog.apps.catalog.models import CatalogQuery
+from enterprise_catalog.apps.catalog.utils import (
+    group_catalog_queries_by_discovery_filter,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -30,6 +34,22 @@ class Command(BaseCommand):
             logger.info(async_message, catalog_query)
         return update_catalog_metadata_task.s(catalog_query.id, **kwargs)
 
+    def _update_catalog_query_group_metadata_task(self, catalog_queries, no_async, **kwargs):
+        """
+        Returns a task signature that updates every catalog query in ``catalog_queries``
+        from a single discovery /search/all/ fetch. A group of one uses the regular per-query task.
+        """
+        if len(catalog_queries) == 1:
+            return self._update_catalog_metadata_task(catalog_queries[0], no_async, **kwargs)
+        catalog_query_ids = [catalog_query.id for catalog_query in catalog_queries]
+        if not no_async:
+            logger.info(
+                'Spinning off update_catalog_query_group_metadata_task from update_content_metadata command'
+                ' to update content_metadata for catalog queries %s from one discovery fetch.',
+                catalog_query_ids,
+            )
+        return update_catalog_query_group_metadata_task.s(catalog_query_ids, **kwargs)
+
     def _fetch_missing_course_metadata_task_async(self, **kwargs):
         logger.info(
             'Spinning off fetch_missing_course_metadata_task from update_content_metadata command'
@@ -136,6 +156,16 @@ class Command(BaseCommand):
             logger.error('No matching CatalogQuery objects found. Exiting.')
             return
 
+        # Catalog queries whose filters only differ in keys that discovery ignores get the same
+        # /search/all/ results, so plan one discovery fetch per distinct discovery-relevant filter.
+        catalog_query_groups = list(group_catalog_queries_by_discovery_filter(catalog_queries).values())
+        logger.info(
+            'Planned %d discovery /search/all/ fetches for %d CatalogQueries, coalescing %d fetches.',
+            len(catalog_query_groups),
+            len(catalog_queries),
+            len(catalog_queries) - len(catalog_query_groups),
+        )
+
         # First, we create a group of celery tasks that run in parallel to create/update ContentMetadata records
         # and associate those with the appropriate CatalogQuery(s).
         # It's possible that one of the tasks in the group will fail with a TaskRecentlyRunError.
@@ -150,8 +180,8 @@ class Command(BaseCommand):
         # https://docs.celeryproject.org/en/v5.0.5/userguide/canvas.html
         update_group = group(
             [
-                self._update_catalog_metadata_task(catalog_query, no_async, **flags)
-                for catalog_query in catalog_queries
+                self._update_catalog_query_group_metadata_task(catalog_query_group, no_async, **flags)
+                for catalog_query_group in catalog_query_groups
             ]
         )
         try:
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0044_mariadb_uuid_conversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentAssociationChange',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('content_key', models.CharField(help_text='The key of the content whose association with the catalog query changed.', max_length=255)),
+                ('change_type', models.CharField(choices=[('added', 'Added'), ('removed', 'Removed')], max_length=16)),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('catalog_query', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='content_association_changes', to='catalog.catalogquery')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['catalog_query', 'id'], name='catalog_con_catalog_2494a7_idx')],
+            },
+        ),
+    ]
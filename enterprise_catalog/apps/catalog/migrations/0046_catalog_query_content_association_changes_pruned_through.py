@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0045_content_association_change'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='catalogquery',
+            name='content_association_changes_pruned_through',
+            field=models.BigIntegerField(editable=False, help_text='The id of the newest ContentAssociationChange of this catalog query deleted by pruning.', null=True),
+        ),
+    ]
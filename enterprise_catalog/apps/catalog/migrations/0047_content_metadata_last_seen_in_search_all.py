@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0046_catalog_query_content_association_changes_pruned_through'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contentmetadata',
+            name='last_seen_in_search_all',
+            field=models.DateTimeField(blank=True, editable=False, help_text='When the content was last returned by the Discovery service /search/all endpoint.', null=True),
+        ),
+        migrations.AddField(
+            model_name='historicalcontentmetadata',
+            name='last_seen_in_search_all',
+            field=models.DateTimeField(blank=True, editable=False, help_text='When the content was last returned by the Discovery service /search/all endpoint.', null=True),
+        ),
+    ]
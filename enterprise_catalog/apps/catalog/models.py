@@ -1,6 +1,7 @@
 import collections
 import copy
 import json
+from datetime import timedelta
 from logging import getLogger
 from uuid import uuid4
 
@@ -13,7 +14,8 @@ from django.db import (
     models,
     transaction,
 )
-from django.db.models import Q
+from django.db.models import Exists, Max, OuterRef, Q
+from django.utils.dateparse import parse_datetime
 from django.utils.functional import cached_property
 from django.utils.translation import gettext as _
 from edx_rbac.models import UserRole, UserRoleAssignment
@@ -45,6 +47,8 @@ from enterprise_catalog.apps.catalog.constants import (
     COURSE_RUN_RESTRICTION_TYPE_KEY,
     EXEC_ED_2U_COURSE_TYPE,
     EXEC_ED_2U_ENTITLEMENT_MODE,
+    FORCE_INCLUDE_AGGREGATION_KEYS_FILTER_KEY,
+    FORCE_INCLUSION_METADATA_TAG_KEY,
     PROGRAM,
     QUERY_FOR_RESTRICTED_RUNS,
     RESTRICTED_RUNS_ALLOWED_KEY,
@@ -54,6 +58,10 @@ from enterprise_catalog.apps.catalog.content_metadata_utils import (
     get_advertised_course_run,
     get_course_first_paid_enrollable_seat_price,
 )
+from enterprise_catalog.apps.catalog.filters import (
+    QueryFilterException,
+    compile_query_filter,
+)
 from enterprise_catalog.apps.catalog.utils import (
     batch,
     enterprise_proxy_login_url,
@@ -106,6 +114,14 @@ class CatalogQuery(TimeStampedModel):
         max_length=100
     )
 
+    content_association_changes_pruned_through = models.BigIntegerField(
+        null=True,
+        editable=False,
+        help_text=_(
+            "The id of the newest ContentAssociationChange of this catalog query deleted by pruning."
+        )
+    )
+
     class Meta:
         verbose_name = _("Catalog Query")
         verbose_name_plural = _("Catalog Queries")
@@ -372,6 +388,128 @@ class EnterpriseCatalog(TimeStampedModel):
         items_not_found = distinct_content_keys - found_content_keys
         return [{'content_key': item} for item in items_not_found], items_not_included, items_found
 
+    def _can_diff_since(self, since):
+        """
+        Returns True if the content of the catalog that changed after ``since`` can be told apart from
+        the rest: the catalog and its customer were not modified since then, and content associated with the
+        catalog query since then is still journaled as ``ContentAssociationChange`` records.
+        """
+        if not getattr(settings, 'SHOULD_RECORD_CONTENT_ASSOCIATION_CHANGES', False):
+            return False
+        retention_cutoff = localized_utcnow() - timedelta(days=settings.CONTENT_ASSOCIATION_CHANGES_RETENTION_DAYS)
+        catalog_modified = get_most_recent_modified_time(self.modified, self.enterprise_customer.last_modified_date)
+        return since >= retention_cutoff and catalog_modified <= since
+
+    def get_catalog_content_diff_page(self, content_keys, cursor=None, limit=None, since=None):
+        """
+        Incremental version of ``get_catalog_content_diff`` for sync clients.
+
+        ``items_not_included`` are returned in ``content_key`` order, starting after ``cursor`` and at most
+        ``limit`` of them; pass the returned ``next_cursor`` to get the next page. Only the provided content
+        keys are looked up to find ``items_found`` and ``items_not_found``.
+
+        When ``since`` is given and the catalog can be diffed incrementally (see ``_can_diff_since``),
+        ``items_found`` and ``items_not_included`` only contain content modified, or associated with the
+        catalog, after ``since``; otherwise ``since`` is ignored, as reported by ``since_applied``.
+
+        Arguments:
+            content_keys: (list) A list of string content keys used to calculate the diff on the catalog.
+            cursor: (str) The content key after which to continue listing ``items_not_included``.
+            limit: (int) The maximum number of ``items_not_included`` to return, defaults to all of them.
+            since: (datetime) The time of the client's last sync.
+
+        Returns:
+            dict: The ``items_not_found``, ``items_not_included`` and ``items_found`` buckets, the ``next_cursor``
+                (None once the listing is complete) and whether ``since_applied``.
+        """
+        distinct_content_keys = set(content_keys)
+        if not self.catalog_query:
+            return {
+                'items_not_found': [{'content_key': content_key} for content_key in sorted(distinct_content_keys)],
+                'items_not_included': [],
+                'items_found': [],
+                'next_cursor': None,
+                'since_applied': False,
+            }
+
+        since_applied = since is not None and self._can_diff_since(since)
+        customer_modified = self.enterprise_customer.last_modified_date
+
+        modified_by_found_content_key = {}
+        for content_keys_batch in batch(
+            sorted(distinct_content_keys), settings.SELECT_EXISTING_CONTENT_METADATA_BATCH_SIZE,
+        ):
+            modified_by_found_content_key.update(
+                self.content_metadata.filter(content_key__in=content_keys_batch).values_list('content_key', 'modified')
+            )
+        items_not_found = [
+            {'content_key': content_key}
+            for content_key in sorted(distinct_content_keys - modified_by_found_content_key.keys())
+        ]
+        items_found = [
+            {
+                'content_key': content_key,
+                'date_updated': get_most_recent_modified_time(content_modified, self.modified, customer_modified),
+            }
+            for content_key, content_modified in sorted(modified_by_found_content_key.items())
+            if not since_applied or content_modified > since
+        ]
+
+        not_included_content = self.content_metadata.order_by('content_key')
+        if since_applied:
+            content_keys_added_since = ContentAssociationChange.objects.filter(
+                catalog_query=self.catalog_query,
+                change_type=ContentAssociationChange.ADDED,
+                created__gt=since,
+            ).values('content_key')
+            not_included_content = not_included_content.filter(
+                Q(modified__gt=since) | Q(content_key__in=content_keys_added_since)
+            )
+
+        if cursor is not None:
+            not_included_content = not_included_content.filter(content_key__gt=cursor)
+        if not limit:
+            # without a page size, the rest of the listing is read in one query
+            return {
+                'items_not_found': items_not_found,
+                'items_not_included': [
+                    {'content_key': content_key}
+                    for content_key in not_included_content.values_list('content_key', flat=True)
+                    if content_key not in distinct_content_keys
+                ],
+                'items_found': items_found,
+                'next_cursor': None,
+                'since_applied': since_applied,
+            }
+
+        items_not_included = []
+        next_cursor = None
+        chunk_size = limit
+        last_content_key = None
+        while next_cursor is None:
+            chunk = not_included_content
+            if last_content_key is not None:
+                chunk = chunk.filter(content_key__gt=last_content_key)
+            chunk_content_keys = list(chunk.values_list('content_key', flat=True)[:chunk_size])
+            for content_key in chunk_content_keys:
+                if content_key in distinct_content_keys:
+                    continue
+                items_not_included.append({'content_key': content_key})
+                if len(items_not_included) == limit:
+                    next_cursor = content_key
+                    break
+            if len(chunk_content_keys) < chunk_size:
+                break
+            last_content_key = chunk_content_keys[-1]
+
+        return {
+            'items_not_found': items_not_found,
+            'items_not_included': items_not_included,
+            'items_found': items_found,
+            'next_cursor': next_cursor,
+            'since_applied': since_applied,
+        }
+
     def get_matching_content(self, content_keys, include_restricted=False):
         """
         Returns the set of content contained within this catalog that matches
@@ -625,6 +763,109 @@ class EnterpriseCatalog(TimeStampedModel):
         return xapi_activity_id
 
 
+def _get_catalog_query_ids(catalogs):
+    return {catalog.catalog_query_id for catalog in catalogs if catalog.catalog_query_id}
+
+
+def filter_content_keys_in_catalogs(catalogs, content_keys, include_restricted=False):
+    """
+    Set-based version of ``EnterpriseCatalog.filter_content_keys`` for several catalogs at once: returns the
+    ``content_keys`` contained in any of the ``catalogs``, from a single query over the catalog queries'
+    content associations that only reads content and parent content keys.
+
+    Arguments:
+        catalogs: (iterable of EnterpriseCatalog) The catalogs to look for the content in.
+        content_keys: (iterable of str) Content keys to be filtered based on the catalogs.
+        include_restricted: (bool) Whether restricted runs associated with the catalog queries count as included.
+
+    Returns:
+        items_included: (set) The content keys contained in at least one of the catalogs.
+    """
+    content_keys = set(content_keys)
+    catalog_query_ids = _get_catalog_query_ids(catalogs)
+    if not catalog_query_ids or not content_keys:
+        return set()
+
+    associations = ContentMetadata.catalog_queries.through.objects.filter(
+        Q(contentmetadata__content_key__in=content_keys) | Q(contentmetadata__parent_content_key__in=content_keys),
+        catalogquery_id__in=catalog_query_ids,
+    )
+    if not include_restricted:
+        # Same as ``EnterpriseCatalog.content_metadata``: a run is assumed restricted if it is mapped
+        # to a restricted course.
+        associations = associations.filter(contentmetadata__restricted_run_allowed_for_restricted_course__isnull=True)
+
+    items_included = set()
+    for content_key, parent_content_key in associations.values_list(
+        'contentmetadata__content_key', 'contentmetadata__parent_content_key',
+    ).distinct():
+        if content_key in content_keys:
+            items_included.add(content_key)
+        elif parent_content_key in content_keys:
+            items_included.add(parent_content_key)
+    return items_included
+
+
+def get_catalogs_containing_content_keys(catalogs, content_keys, include_restricted=False):
+    """
+    Set-based version of ``EnterpriseCatalog.contains_content_keys`` for several catalogs at once: narrows the
+    ``catalogs`` queryset to those containing any of the ``content_keys``, in a single SQL statement.
+
+    Content is matched the same way as by ``EnterpriseCatalog.get_matching_content``: by content key, by parent
+    content key, or as the parent course of a requested course run.
+
+    Arguments:
+        catalogs: (QuerySet of EnterpriseCatalog) The catalogs to look for the content in.
+        content_keys: (iterable of str) Course, course run and program keys to look for.
+        include_restricted: (bool) Whether restricted runs allowed by a catalog's query count as contained in it.
+
+    Returns:
+        QuerySet of EnterpriseCatalog: The catalogs containing at least one of the content keys.
+    """
+    content_keys = set(content_keys)
+    if not content_keys:
+        return catalogs.none()
+
+    searched_runs = ContentMetadata.objects.filter(content_key__in=content_keys, parent_content_key__isnull=False)
+    matching_content = (
+        Q(contentmetadata__content_key__in=content_keys)
+        | Q(contentmetadata__parent_content_key__in=content_keys)
+        | Q(contentmetadata__content_key__in=searched_runs.filter(
+            restricted_run_allowed_for_restricted_course__isnull=True,
+        ).values('parent_content_key'))
+    )
+    associations = ContentMetadata.catalog_queries.through.objects.filter(catalogquery_id=OuterRef('catalog_query_id'))
+    if include_restricted:
+        # Restricted runs are also searched when they are allowed by the catalog's own query.
+        matching_content |= Q(contentmetadata__content_key__in=searched_runs.filter(
+            restricted_run_allowed_for_restricted_course__course__catalog_query_id=OuterRef('catalogquery_id'),
+        ).values('parent_content_key'))
+    else:
+        associations = associations.filter(contentmetadata__restricted_run_allowed_for_restricted_course__isnull=True)
+    return catalogs.filter(Exists(associations.filter(matching_content)))
+
+
+def get_catalogs_containing_content_uuid(catalogs, content_uuid):
+    """
+    Set-based version of looking up ``content_uuid`` in ``EnterpriseCatalog.content_metadata`` for several
+    catalogs at once: narrows the ``catalogs`` queryset to those whose (unrestricted) content includes
+    a record with the given ``content_uuid``, in a single SQL statement.
+
+    Arguments:
+        catalogs: (QuerySet of EnterpriseCatalog) The catalogs to look for the content in.
+        content_uuid: (UUID) The uuid of the content to look for.
+
+    Returns:
+        QuerySet of EnterpriseCatalog: The catalogs containing the content.
+    """
+    associations = ContentMetadata.catalog_queries.through.objects.filter(
+        catalogquery_id=OuterRef('catalog_query_id'),
+        contentmetadata__content_uuid=content_uuid,
+        contentmetadata__restricted_run_allowed_for_restricted_course__isnull=True,
+    )
+    return catalogs.filter(Exists(associations))
+
+
 class ContentMetadataQuerySet(models.QuerySet):
     """
     Customer queryset for ContentMetadata providing convenience methods to augment the results.
@@ -784,6 +1025,15 @@ class ContentMetadata(BaseContentMetadata):
     # one course can be part of many CatalogQueries and one CatalogQuery can contain many courses.
     catalog_queries = models.ManyToManyField(CatalogQuery)
 
+    last_seen_in_search_all = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text=_(
+            "When the content was last returned by the Discovery service /search/all endpoint."
+        )
+    )
+
     history = HistoricalRecords()
 
     objects = ContentMetadataManager().from_queryset(ContentMetadataQuerySet)()
@@ -1085,6 +1335,152 @@ class RestrictedRunAllowedForRestrictedCourse(TimeStampedModel):
     )
 
 
+class ContentAssociationChange(models.Model):
+    """
+    Append-only journal of content entering (``added``) or leaving (``removed``) a catalog query's
+    content associations, written by ``associate_content_metadata_with_query``.
+
+    Incremental consumers remember the ``id`` of the last change they processed as a cursor, and read
+    only the changes after it with ``get_changes_since``. Rows older than the retention period are
+    deleted by ``prune``.
+
+    .. no_pii:
+    """
+    ADDED = 'added'
+    REMOVED = 'removed'
+    CHANGE_TYPE_CHOICES = (
+        (ADDED, 'Added'),
+        (REMOVED, 'Removed'),
+    )
+
+    id = models.BigAutoField(primary_key=True)
+    catalog_query = models.ForeignKey(
+        CatalogQuery,
+        related_name='content_association_changes',
+        on_delete=models.CASCADE,
+    )
+    content_key = models.CharField(
+        max_length=255,
+        help_text=_(
+            "The key of the content whose association with the catalog query changed."
+        )
+    )
+    change_type = models.CharField(max_length=16, choices=CHANGE_TYPE_CHOICES)
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        app_label = 'catalog'
+        indexes = [
+            models.Index(fields=['catalog_query', 'id']),
+        ]
+
+    def __str__(self):
+        return (
+            f'<ContentAssociationChange ({self.id}) {self.change_type} {self.content_key} '
+            f'for catalog query {self.catalog_query_id}>'
+        )
+
+    @classmethod
+    def record_changes(cls, catalog_query, added_content_keys, removed_content_keys):
+        """
+        Appends one change per added and removed content key for ``catalog_query``.
+        """
+        changes = [
+            cls(catalog_query=catalog_query, content_key=content_key, change_type=cls.REMOVED)
+            for content_key in removed_content_keys
+        ] + [
+            cls(catalog_query=catalog_query, content_key=content_key, change_type=cls.ADDED)
+            for content_key in added_content_keys
+        ]
+        cls.objects.bulk_create(changes, batch_size=settings.CREATE_NEW_CONTENT_METADATA_BATCH_SIZE)
+
+    @classmethod
+    def is_cursor_expired(cls, catalog_query, cursor):
+        """
+        Returns True if changes to ``catalog_query``'s content associations after ``cursor`` were
+        already pruned, in which case the consumer has to resynchronize from scratch.
+        """
+        pruned_through = CatalogQuery.objects.filter(id=catalog_query.id).values_list(
+            'content_association_changes_pruned_through', flat=True,
+        ).first()
+        return pruned_through is not None and cursor < pruned_through
+
+    @classmethod
+    def get_changes_since(cls, catalog_query, cursor=0, limit=None):
+        """
+        Returns the changes to ``catalog_query``'s content associations after ``cursor``, compacted to
+        the net change per content key: a key that was added and later removed again (or vice versa)
+        within the returned changes is omitted.
+
+        Arguments:
+            catalog_query (CatalogQuery): The catalog query to read changes for.
+            cursor (int): The ``cursor`` returned by the previous call, or 0 to read from the beginning.
+            limit (int): The maximum number of changes to read, defaults to
+                ``settings.CONTENT_ASSOCIATION_CHANGES_PAGE_SIZE``.
+
+        Returns:
+            dict: ``added`` and ``removed`` content keys, the ``cursor`` to pass to the next call,
+                whether there are ``more`` changes after it, and whether the given cursor has
+                ``expired`` because the changes after it were already pruned.
+        """
+        limit = limit or settings.CONTENT_ASSOCIATION_CHANGES_PAGE_SIZE
+        changes = list(
+            cls.objects.filter(catalog_query=catalog_query, id__gt=cursor)
+            .order_by('id')
+            .values_list('id', 'content_key', 'change_type')[:limit + 1]
+        )
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+
+        first_change_type_by_key = {}
+        last_change_type_by_key = {}
+        for __, content_key, change_type in changes:
+            first_change_type_by_key.setdefault(content_key, change_type)
+            last_change_type_by_key[content_key] = change_type
+        net_changes = {
+            content_key: change_type
+            for content_key, change_type in last_change_type_by_key.items()
+            if first_change_type_by_key[content_key] == change_type
+        }
+        return {
+            'added': [key for key, change_type in net_changes.items() if change_type == cls.ADDED],
+            'removed': [key for key, change_type in net_changes.items() if change_type == cls.REMOVED],
+            'cursor': changes[-1][0] if changes else cursor,
+            'more': has_more,
+            'expired': cls.is_cursor_expired(catalog_query, cursor),
+        }
+
+    @classmethod
+    def prune(cls, older_than_days=None, dry_run=False):
+        """
+        Deletes changes created more than ``older_than_days`` (defaults to
+        ``settings.CONTENT_ASSOCIATION_CHANGES_RETENTION_DAYS``) days ago, and records the newest
+        deleted change of each catalog query, so that only cursors of those catalog queries expire.
+
+        Returns:
+            int: The number of changes deleted (or that would be deleted if dry_run=True).
+        """
+        if older_than_days is None:
+            older_than_days = settings.CONTENT_ASSOCIATION_CHANGES_RETENTION_DAYS
+        cutoff = localized_utcnow() - timedelta(days=older_than_days)
+        expired_changes = cls.objects.filter(created__lt=cutoff)
+        if dry_run:
+            return expired_changes.count()
+        deleted_count = 0
+        batch_size = settings.CONTENT_ASSOCIATION_CHANGES_PAGE_SIZE
+        while expired_change_ids := list(expired_changes.order_by('id').values_list('id', flat=True)[:batch_size]):
+            batch_changes = cls.objects.filter(id__in=expired_change_ids)
+            with transaction.atomic():
+                # Batches are deleted in id order, so a batch's newest change is the newest pruned so far.
+                pruned_through_by_query = batch_changes.values('catalog_query').annotate(pruned_through=Max('id'))
+                for row in pruned_through_by_query:
+                    CatalogQuery.objects.filter(id=row['catalog_query']).update(
+                        content_association_changes_pruned_through=row['pruned_through'],
+                    )
+                deleted_count += batch_changes.delete()[0]
+        return deleted_count
+
+
 def content_metadata_with_type_course():
     """
     Find all ContentMetadata records with a content type of "course".
@@ -1160,7 +1556,7 @@ def _get_defaults_from_metadata(entry, exists=False):
     return defaults
 
 
-def _partition_content_metadata_defaults(batched_metadata, existing_metadata_by_key):
+def _partition_content_metadata_defaults(batched_metadata, existing_metadata_by_key, search_all_content_keys=None):
     """
     Given a batch of metadata entries and a list of existing ContentMetadata objects, this function
     determines the default fields to use for creates/updates depending on whether a database object exists
@@ -1170,6 +1566,8 @@ def _partition_content_metadata_defaults(batched_metadata, existing_metadata_by_
         batched_metadata (list): List of metadata entries from the /search/all API response.
         existing_metadata_by_key (dict): Dictionary of existing ContentMetadata objects in the
             database by content key.
+        search_all_content_keys (set): The content keys /search/all actually returned, whose records are
+            stamped with ``last_seen_in_search_all``. Other entries, e.g. force-included courses, are not.
 
     Returns:
         (existing_metadata_defaults, nonexisting_metadata_defaults): Tuple containing lists of both
@@ -1186,6 +1584,12 @@ def _partition_content_metadata_defaults(batched_metadata, existing_metadata_by_
         for entry in batched_metadata
         if not get_content_key(entry) in existing_metadata_by_key
     ]
+    if search_all_content_keys:
+        # see ``get_local_evaluation_candidates``
+        last_seen_in_search_all = localized_utcnow()
+        for defaults in existing_metadata_defaults + nonexisting_metadata_defaults:
+            if defaults['content_key'] in search_all_content_keys:
+                defaults['last_seen_in_search_all'] = last_seen_in_search_all
     return existing_metadata_defaults, nonexisting_metadata_defaults
 
 
@@ -1222,7 +1626,9 @@ def _update_existing_content_metadata(existing_metadata_defaults, existing_metad
         for metadata in metadata_list:
             LOGGER.info(f"[Dry Run] Skipping Content Metadata update: {metadata}")
     else:
-        metadata_fields_to_update = ['content_key', 'parent_content_key', 'content_type', '_json_metadata']
+        metadata_fields_to_update = [
+            'content_key', 'parent_content_key', 'content_type', '_json_metadata', 'last_seen_in_search_all',
+        ]
         batch_size = settings.UPDATE_EXISTING_CONTENT_METADATA_BATCH_SIZE
         for batched_metadata in batch(metadata_list, batch_size=batch_size):
             try:
@@ -1239,10 +1645,65 @@ def _update_existing_content_metadata(existing_metadata_defaults, existing_metad
     return metadata_list
 
 
+def _create_content_metadata_or_get_existing(defaults):
+    """
+    Creates a single ContentMetadata object, or returns the existing one if a concurrent
+    creator inserted a record with the same content_key first.
+    """
+    try:
+        with transaction.atomic():
+            return ContentMetadata.objects.create(**defaults)
+    except IntegrityError:
+        LOGGER.warning('ContentMetadata with content_key %s was created concurrently.', defaults['content_key'])
+        return ContentMetadata.objects.filter(content_key=defaults['content_key']).first()
+
+
+def _bulk_create_new_content_metadata(nonexisting_metadata_defaults):
+    """
+    Creates new ContentMetadata database objects based on the defaults provided with one bulk INSERT per
+    batch of ``settings.CREATE_NEW_CONTENT_METADATA_BATCH_SIZE`` records.
+
+    ``bulk_create()`` neither sends the signals simple_history relies on nor (on MySQL) sets primary keys, so the
+    inserted records are read back and their history records are created in bulk. If a batch conflicts with records
+    inserted concurrently by another creator, that batch falls back to creating its records one at a time.
+
+    Arguments:
+        nonexisting_metadata_defaults (list): List of default values for various fields to create
+            non-existing ContentMetadata database objects.
+
+    Returns:
+        list: List of ContentMetadata objects that were created (or already existed for conflicting content keys).
+    """
+    metadata_list = []
+    batch_size = settings.CREATE_NEW_CONTENT_METADATA_BATCH_SIZE
+    for defaults_batch in batch(nonexisting_metadata_defaults, batch_size=batch_size):
+        content_keys = [defaults['content_key'] for defaults in defaults_batch]
+        try:
+            with transaction.atomic():
+                ContentMetadata.objects.bulk_create(
+                    [ContentMetadata(**defaults) for defaults in defaults_batch],
+                    batch_size=batch_size,
+                )
+                created_metadata_by_key = ContentMetadata.objects.in_bulk(content_keys, field_name='content_key')
+                created_metadata = [created_metadata_by_key.get(content_key) for content_key in content_keys]
+                ContentMetadata.history.bulk_history_create(  # pylint: disable=no-member
+                    [record for record in created_metadata if record], batch_size=batch_size,
+                )
+        except IntegrityError:
+            LOGGER.warning(
+                'Bulk creation of ContentMetadata conflicted with existing records, '
+                'creating content keys %s one at a time.',
+                content_keys,
+            )
+            created_metadata = [_create_content_metadata_or_get_existing(defaults) for defaults in defaults_batch]
+        metadata_list.extend(record for record in created_metadata if record)
+    return metadata_list
+
+
 def _create_new_content_metadata(nonexisting_metadata_defaults, dry_run=False):
     """
     Creates new ContentMetadata database objects based on the defaults provided. This is done through an atomic
-    database transaction.
+    database transaction, or in bulk if ``settings.SHOULD_BULK_CREATE_CONTENT_METADATA`` is enabled.
 
     Arguments:
         nonexisting_metadata_defaults (list): List of default values for various fields to create
@@ -1252,6 +1713,9 @@ def _create_new_content_metadata(nonexisting_metadata_defaults, dry_run=False):
     Returns:
         list: List of ContentMetadata objects that were created (or logged if dry_run=True).
     """
+    if not dry_run and getattr(settings, 'SHOULD_BULK_CREATE_CONTENT_METADATA', False):
+        return _bulk_create_new_content_metadata(nonexisting_metadata_defaults)
+
     metadata_list = []
     try:
         with transaction.atomic():
@@ -1304,7 +1768,7 @@ def _should_allow_metadata(metadata_entry, catalog_query=None):
     return False
 
 
-def create_content_metadata(metadata, catalog_query=None, dry_run=False):
+def create_content_metadata(metadata, catalog_query=None, dry_run=False, search_all_content_keys=None):
     """
     Creates or updates a ContentMetadata object.
 
@@ -1312,6 +1776,7 @@ def create_content_metadata(metadata, catalog_query=None, dry_run=False):
         metadata (list): List of content metadata dictionaries.
         catalog_query (CatalogQuery): Catalog Query object.
         dry_run (boolean): Logs rather than commits content metadata additions.
+        search_all_content_keys (set): The content keys of ``metadata`` that discovery's /search/all returned.
 
     Returns:
         list: The list of ContentMetaData.
@@ -1329,7 +1794,7 @@ def create_content_metadata(metadata, catalog_query=None, dry_run=False):
                 filtered_batched_metadata.append(entry)
 
         _update_or_create_content_metadata(
-            content_keys, filtered_batched_metadata, dry_run, metadata_list, retry_list,
+            content_keys, filtered_batched_metadata, dry_run, metadata_list, retry_list, search_all_content_keys,
         )
 
     retry_count = 0
@@ -1352,7 +1817,7 @@ def create_content_metadata(metadata, catalog_query=None, dry_run=False):
         content_keys = [get_content_key(metadata_record)]
         filtered_batched_metadata = [metadata_record]
         _update_or_create_content_metadata(
-            content_keys, filtered_batched_metadata, dry_run, metadata_list, retry_list,
+            content_keys, filtered_batched_metadata, dry_run, metadata_list, retry_list, search_all_content_keys,
         )
 
     LOGGER.info(
@@ -1364,7 +1829,9 @@ def create_content_metadata(metadata, catalog_query=None, dry_run=False):
     return metadata_list
 
 
-def _update_or_create_content_metadata(content_keys, filtered_batched_metadata, dry_run, metadata_list, retry_list):
+def _update_or_create_content_metadata(
+    content_keys, filtered_batched_metadata, dry_run, metadata_list, retry_list, search_all_content_keys=None,
+):
     """
     Helper to do the updates of existing metadata and creation of new metadata.
     Called for side-effect: modifies both ``metadata_list`` and ``retry_list``.
@@ -1372,7 +1839,7 @@ def _update_or_create_content_metadata(content_keys, filtered_batched_metadata,
     nonexisting_metadata_defaults = None
     try:
         updated_metadata, nonexisting_metadata_defaults = _execute_updates_existing_records_avoid_deadlock(
-            content_keys, filtered_batched_metadata, dry_run,
+            content_keys, filtered_batched_metadata, dry_run, search_all_content_keys,
         )
         metadata_list.extend(updated_metadata)
     except DatabaseError as exc:
@@ -1385,7 +1852,9 @@ def _update_or_create_content_metadata(content_keys, filtered_batched_metadata,
 
 
 @transaction.atomic()
-def _execute_updates_existing_records_avoid_deadlock(content_keys, filtered_batched_metadata, dry_run):
+def _execute_updates_existing_records_avoid_deadlock(
+    content_keys, filtered_batched_metadata, dry_run, search_all_content_keys=None,
+):
     """
     Finds and updates existing metadata records matching the given content keys, returning
     a list of the updated records, along with a set of metadata defaults for content_keys that
@@ -1398,7 +1867,7 @@ def _execute_updates_existing_records_avoid_deadlock(content_keys, filtered_batc
     ).order_by('pk').select_for_update()
     existing_metadata_by_key = {metadata.content_key: metadata for metadata in existing_metadata}
     existing_metadata_defaults, nonexisting_metadata_defaults = _partition_content_metadata_defaults(
-        filtered_batched_metadata, existing_metadata_by_key
+        filtered_batched_metadata, existing_metadata_by_key, search_all_content_keys,
     )
 
     # Update existing ContentMetadata records
@@ -1477,38 +1946,79 @@ def _check_content_association_threshold(catalog_query, metadata_list):
     return False
 
 
-def associate_content_metadata_with_query(metadata, catalog_query, dry_run=False):
+ContentAssociationResult = collections.namedtuple(
+    'ContentAssociationResult',
+    ['associated_content_keys', 'added_content_keys', 'removed_content_keys'],
+)
+
+
+def associate_content_metadata_with_query(metadata, catalog_query, dry_run=False, search_all_content_keys=None):
     """
     Creates or updates a ContentMetadata object for each entry in `metadata`,
     and then associates that object with the `catalog_query` provided.
 
+    Only the difference between the query's existing associations and the new ones is written: associations
+    that are no longer present are removed and new ones are added, leaving unchanged associations untouched.
+
     Arguments:
         metadata (list): List of content metadata dictionaries.
         catalog_query (CatalogQuery): CatalogQuery object
         dry_run (boolean): Logs rather than commits updated content metadata.
+        search_all_content_keys (set): The content keys of ``metadata`` that discovery's /search/all returned.
 
     Returns:
-        list: The list of content_keys for the metadata associated with the query.
+        ContentAssociationResult: The content_keys for the metadata associated with the query, along with
+            the content_keys whose association with the query was added and removed by this update.
+    """
+    metadata_list = create_content_metadata(metadata, catalog_query, dry_run, search_all_content_keys)
+    return _associate_content_metadata_list_with_query(metadata_list, catalog_query, dry_run)
+
+
+def _associate_content_metadata_list_with_query(metadata_list, catalog_query, dry_run=False):
+    """
+    Sets the content associated with ``catalog_query`` to the ContentMetadata objects in ``metadata_list``,
+    see ``associate_content_metadata_with_query``.
     """
-    metadata_list = create_content_metadata(metadata, catalog_query, dry_run)
     # Stop gap if the new metadata list is extremely different from the current one
     if _check_content_association_threshold(catalog_query, metadata_list):
-        return list(catalog_query.contentmetadata_set.values_list('content_key', flat=True))
-    # Setting `clear=True` will remove all prior relationships between
-    # the CatalogQuery's associated ContentMetadata objects
-    # before setting all new relationships from `metadata_list`.
-    # https://docs.djangoproject.com/en/2.2/ref/models/relations/#django.db.models.fields.related.RelatedManager.set
+        return ContentAssociationResult(
+            list(catalog_query.contentmetadata_set.values_list('content_key', flat=True)), [], [],
+        )
+
+    existing_content_keys_by_id = dict(catalog_query.contentmetadata_set.values_list('id', 'content_key'))
+    new_metadata_by_id = {metadata.id: metadata for metadata in metadata_list}
+    added_ids = [metadata_id for metadata_id in new_metadata_by_id if metadata_id not in existing_content_keys_by_id]
+    removed_ids = [
+        metadata_id for metadata_id in existing_content_keys_by_id if metadata_id not in new_metadata_by_id
+    ]
+    added_content_keys = [new_metadata_by_id[metadata_id].content_key for metadata_id in added_ids]
+    removed_content_keys = [existing_content_keys_by_id[metadata_id] for metadata_id in removed_ids]
+
     if dry_run:
-        old_metadata_count = catalog_query.contentmetadata_set.count()
+        old_metadata_count = len(existing_content_keys_by_id)
         new_metadata_count = len(metadata_list)
         if old_metadata_count != new_metadata_count:
             LOGGER.info('[Dry Run] Updated metadata count ({} -> {}) for {}'.format(
                 old_metadata_count, new_metadata_count, catalog_query))
-    else:
-        catalog_query.contentmetadata_set.set(metadata_list, clear=True)
+        LOGGER.info(
+            '[Dry Run] Would add %d and remove %d content associations for %s',
+            len(added_ids), len(removed_ids), catalog_query,
+        )
+    elif added_ids or removed_ids:
+        with transaction.atomic():
+            if removed_ids:
+                catalog_query.contentmetadata_set.remove(*removed_ids)
+            if added_ids:
+                catalog_query.contentmetadata_set.add(*added_ids)
+            if getattr(settings, 'SHOULD_RECORD_CONTENT_ASSOCIATION_CHANGES', False):
+                ContentAssociationChange.record_changes(catalog_query, added_content_keys, removed_content_keys)
+        LOGGER.info(
+            'Added %d and removed %d content associations for %s',
+            len(added_ids), len(removed_ids), catalog_query,
+        )
 
     associated_content_keys = [metadata.content_key for metadata in metadata_list]
-    return associated_content_keys
+    return ContentAssociationResult(associated_content_keys, added_content_keys, removed_content_keys)
 
 
 def create_course_associated_programs(programs, course_content_metadata):
@@ -1598,7 +2108,7 @@ class EnterpriseCatalogRoleAssignment(UserRoleAssignment):
         return self.__str__()
 
 
-def update_contentmetadata_from_discovery(catalog_query, dry_run=False):
+def update_contentmetadata_from_discovery(catalog_query, dry_run=False, search_results=None):
     """
     Takes a CatalogQuery, uses cache or the Discovery API client to
     retrieve associated metadata, and then creates/updates ContentMetadata objects.
@@ -1609,13 +2119,15 @@ def update_contentmetadata_from_discovery(catalog_query, dry_run=False):
     Args:
         catalog_query (CatalogQuery): The catalog query to pass to discovery's /search/all endpoint.
         dry_run (boolean): Logs rather than commits updated content metadata.
+        search_results (list): Optional /search/all results already fetched for this query's
+            discovery content filter, shared between catalog queries that discovery treats the same.
     Returns:
         list of str: Returns the content keys that were associated from the query results.
     """
 
     try:
         # metadata will be an empty dict if unavailable from cache or API.
-        metadata = CatalogQueryMetadata(catalog_query).metadata
+        metadata = CatalogQueryMetadata(catalog_query, search_results=search_results).metadata
     except Exception as exc:
         LOGGER.exception(f'update_contentmetadata_from_discovery failed {catalog_query}')
         raise exc
@@ -1634,11 +2146,142 @@ def update_contentmetadata_from_discovery(catalog_query, dry_run=False):
         catalog_query,
     )
 
-    associated_content_keys = associate_content_metadata_with_query(metadata, catalog_query, dry_run)
+    # force-included courses are appended to the /search/all results, see ``get_metadata_by_query``
+    search_all_content_keys = {
+        get_content_key(entry) for entry in metadata if not entry.get(FORCE_INCLUSION_METADATA_TAG_KEY)
+    }
+    associated_content_keys, added_content_keys, removed_content_keys = associate_content_metadata_with_query(
+        metadata, catalog_query, dry_run, search_all_content_keys,
+    )
     LOGGER.info(
-        'Associated %d content items (%d unique) with catalog query %s',
+        'Associated %d content items (%d unique, %d added, %d removed) with catalog query %s',
         len(associated_content_keys),
         len(set(associated_content_keys)),
+        len(added_content_keys),
+        len(removed_content_keys),
+        catalog_query,
+    )
+
+    restricted_content_keys = synchronize_restricted_content(catalog_query, dry_run=dry_run)
+    return associated_content_keys + restricted_content_keys
+
+
+def get_local_query_filter(catalog_query):
+    """
+    Compiles the content filter of ``catalog_query`` for evaluation against local ContentMetadata records.
+
+    A filter can be evaluated locally when all of its keys are supported by ``filters.compile_query_filter``
+    and only look at fields listed in ``settings.LOCAL_CATALOG_QUERY_EVALUATION_FIELDS``. Filters that
+    force-include content by aggregation key need discovery to fetch that content, so they are never local.
+
+    Returns:
+        CompiledQueryFilter: The compiled filter, or None if the query must be evaluated by discovery.
+    """
+    content_filter = {
+        key: value for key, value in catalog_query.content_filter.items()
+        # restricted runs are synchronized separately, see ``synchronize_restricted_content``
+        if key != RESTRICTED_RUNS_ALLOWED_KEY
+    }
+    if not content_filter or FORCE_INCLUDE_AGGREGATION_KEYS_FILTER_KEY in content_filter:
+        return None
+    try:
+        query_filter = compile_query_filter(content_filter)
+    except QueryFilterException:
+        return None
+    supported_fields = settings.LOCAL_CATALOG_QUERY_EVALUATION_FIELDS
+    if any(field not in supported_fields for field in query_filter.fields):
+        return None
+    return query_filter
+
+
+def is_returned_by_search_all(json_metadata, now):
+    """
+    Returns whether discovery's /search/all endpoint, as queried by ``get_metadata_by_content_filter``, still
+    returns the content with the given metadata: hidden content, unpublished and (``exclude_expired_course_run``)
+    ended course runs are left out, and so are courses without any published course run. Force-included
+    courses are only ever fetched for the catalog query that force-includes them.
+    """
+    if json_metadata.get('hidden') or json_metadata.get(FORCE_INCLUSION_METADATA_TAG_KEY):
+        return False
+    content_type = json_metadata.get('content_type')
+    if content_type == COURSE_RUN:
+        status = json_metadata.get('status')
+        if status and status.lower() != 'published':
+            return False
+        end = parse_datetime(json_metadata.get('end') or '')
+        return end is None or end >= now
+    if content_type == COURSE:
+        course_run_statuses = json_metadata.get('course_run_statuses')
+        if course_run_statuses is not None:
+            return 'published' in course_run_statuses
+    return True
+
+
+def get_local_evaluation_candidates(catalog_query, now):
+    """
+    Returns the ContentMetadata records a locally evaluated ``catalog_query`` may be associated with:
+    records of the filtered content types that /search/all returned within the last
+    ``settings.LOCAL_CATALOG_QUERY_EVALUATION_MAX_CONTENT_AGE_DAYS`` days. Content discovery has dropped
+    since, or that was only ever stored by other means, is left out.
+    """
+    candidates = ContentMetadata.objects.filter(
+        last_seen_in_search_all__gte=now - timedelta(days=settings.LOCAL_CATALOG_QUERY_EVALUATION_MAX_CONTENT_AGE_DAYS),
+    )
+    content_type = catalog_query.content_filter.get('content_type')
+    if content_type:
+        # the content_type column mirrors json_metadata['content_type'], so it can narrow the candidates
+        candidates = candidates.filter(
+            content_type__in=content_type if isinstance(content_type, list) else [content_type],
+        )
+    return candidates.only('id', 'content_key', 'content_type', '_json_metadata')
+
+
+def update_contentmetadata_from_local_evaluation(catalog_query, dry_run=False):
+    """
+    Takes a CatalogQuery and, when its content filter can be evaluated locally (see ``get_local_query_filter``),
+    associates the query with the ContentMetadata records whose ``json_metadata`` matches the filter
+    instead of retrieving the query's content from discovery's /search/all endpoint.
+
+    Only content that already has a ContentMetadata record, recently returned by /search/all for another
+    catalog query, can be matched (see ``get_local_evaluation_candidates`` and ``is_returned_by_search_all``),
+    and the records' metadata is used as is.
+
+    Args:
+        catalog_query (CatalogQuery): The catalog query to evaluate.
+        dry_run (boolean): Logs rather than commits updated content associations.
+    Returns:
+        list of str: The content keys that were associated with the query, or None if the query's
+            content filter cannot be evaluated locally.
+    """
+    query_filter = get_local_query_filter(catalog_query)
+    if query_filter is None:
+        LOGGER.info('Catalog query %s cannot be evaluated locally', catalog_query)
+        return None
+
+    now = localized_utcnow()
+    metadata_list = [
+        metadata for metadata in get_local_evaluation_candidates(catalog_query, now).iterator()
+        if is_returned_by_search_all(metadata.json_metadata, now)
+        and query_filter(metadata.json_metadata)
+        and _should_allow_metadata(metadata.json_metadata, catalog_query)
+    ]
+    LOGGER.info(
+        'Matched %d local content items for catalog query %s',
+        len(metadata_list),
+        catalog_query,
+    )
+    if not metadata_list:
+        # like an empty response from discovery, leave the existing associations alone
+        return []
+
+    associated_content_keys, added_content_keys, removed_content_keys = _associate_content_metadata_list_with_query(
+        metadata_list, catalog_query, dry_run,
+    )
+    LOGGER.info(
+        'Associated %d content items (%d added, %d removed) with catalog query %s from local evaluation',
+        len(associated_content_keys),
+        len(added_content_keys),
+        len(removed_content_keys),
         catalog_query,
     )
 
@@ -1,9 +1,13 @@
 import logging
 
+import numpy as np
 from celery import shared_task
 from celery_utils.logged_task import LoggedTask
 
 from enterprise_catalog.apps.catalog import filters
+from enterprise_catalog.apps.catalog.columnar_filters import (
+    ContentMetadataColumns,
+)
 from enterprise_catalog.apps.catalog.constants import COURSE
 from enterprise_catalog.apps.catalog.models import (
     ContentMetadata,
@@ -16,30 +20,63 @@ logger = logging.getLogger(__name__)
 
 @shared_task(base=LoggedTask)
 def compare_catalog_queries_to_filters_task():
+    """
+    Compares the courses discovery associated with each catalog's query against the courses
+    its content filter matches locally.
+
+    The filterable fields of every course are loaded into columns once, each distinct content filter
+    is evaluated over all courses at once, and each catalog query's course memberships are read in one query.
+    Every disagreement is logged, along with a summary per catalog.
+    """
     logger.info('compare_catalog_queries_to_filters starting...')
     # NOTE: No need to exclude restricted runs because they are already filtered out via content_type.
-    for content_metadata in ContentMetadata.objects.filter(content_type=COURSE):
-        for enterprise_catalog in EnterpriseCatalog.objects.all():
-            try:
-                discovery_included = content_metadata in enterprise_catalog.content_metadata
-                match = filters.does_query_match_content(
-                    enterprise_catalog.catalog_query.content_filter,
-                    content_metadata.json_metadata
-                )
-                does_discovery_agree_with_filter = discovery_included == match
-                logger.info(
-                    'compare_catalog_queries_to_filters '
-                    f'enterprise_catalog={enterprise_catalog.uuid}, '
-                    f'content_key={content_metadata.content_key}, '
-                    f'discovery_included={discovery_included}, '
-                    f'filter_match={match}, '
-                    f'does_discovery_agree_with_filter={does_discovery_agree_with_filter}'
-                )
-            except filters.QueryFilterException:
-                logger.exception(
-                    'compare_catalog_queries_to_filters '
-                    'filter exception '
-                    f'enterprise_catalog={enterprise_catalog.uuid}, '
-                    f'content_metadata={content_metadata.content_key}'
-                )
+    courses = list(ContentMetadata.objects.filter(content_type=COURSE).values_list(
+        'id', 'content_key', '_json_metadata',
+    ))
+    course_ids = np.array([course_id for course_id, _, _ in courses], dtype=np.int64)
+    columns = ContentMetadataColumns(json_metadata for _, _, json_metadata in courses)
+    through_model = ContentMetadata.catalog_queries.through
+
+    matches_by_query_id = {}
+    included_by_query_id = {}
+    for enterprise_catalog in EnterpriseCatalog.objects.select_related('catalog_query'):
+        catalog_query = enterprise_catalog.catalog_query
+        if catalog_query is None:
+            continue
+        try:
+            if catalog_query.id not in matches_by_query_id:
+                matches_by_query_id[catalog_query.id] = columns.evaluate(catalog_query.content_filter)
+                included_ids = list(through_model.objects.filter(
+                    catalogquery_id=catalog_query.id,
+                    contentmetadata__content_type=COURSE,
+                ).values_list('contentmetadata_id', flat=True))
+                included_by_query_id[catalog_query.id] = np.isin(course_ids, included_ids)
+        except filters.QueryFilterException:
+            logger.exception(
+                'compare_catalog_queries_to_filters '
+                'filter exception '
+                f'enterprise_catalog={enterprise_catalog.uuid}'
+            )
+            continue
+
+        matches = matches_by_query_id[catalog_query.id]
+        included = included_by_query_id[catalog_query.id]
+        disagreements = np.flatnonzero(included != matches)
+        for row_index in disagreements:
+            logger.info(
+                'compare_catalog_queries_to_filters '
+                f'enterprise_catalog={enterprise_catalog.uuid}, '
+                f'content_key={courses[row_index][1]}, '
+                f'discovery_included={bool(included[row_index])}, '
+                f'filter_match={bool(matches[row_index])}, '
+                'does_discovery_agree_with_filter=False'
+            )
+        logger.info(
+            'compare_catalog_queries_to_filters '
+            f'enterprise_catalog={enterprise_catalog.uuid}, '
+            f'courses={len(courses)}, '
+            f'discovery_included={int(included.sum())}, '
+            f'filter_matches={int(matches.sum())}, '
+            f'disagreements={len(disagreements)}'
+        )
     logger.info('compare_catalog_queries_to_filters complete.')
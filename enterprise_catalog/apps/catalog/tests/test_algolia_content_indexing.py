@@ -5,6 +5,7 @@ import ddt
 from django.test import TestCase
 
 from enterprise_catalog.apps.catalog.algolia_content_indexing import (
+    build_catalog_content_index,
     get_catalogs_for_content,
 )
 from enterprise_catalog.apps.catalog.tests.factories import (
@@ -42,3 +43,35 @@ class AlgoliaContentIndexingTests(TestCase):
         found_catalogs = get_catalogs_for_content(content_key)
         assert len(found_catalogs) == 1
         assert found_catalogs[0] == included_catalog
+
+    def test_catalog_content_index_candidates(self):
+        """ Test that lookups only evaluate the catalog queries indexed under the content's values. """
+        mit_query = CatalogQueryFactory(content_filter={'org': ['MITx', 'MITxT'], 'content_type': 'course'})
+        program_query = CatalogQueryFactory(content_filter={'content_type': 'program'})
+        price_query = CatalogQueryFactory(content_filter={'first_enrollable_paid_seat_price__lte': 100})
+        mit_catalog = EnterpriseCatalogFactory(catalog_query=mit_query)
+        shared_mit_catalog = EnterpriseCatalogFactory(catalog_query=mit_query)
+        EnterpriseCatalogFactory(catalog_query=program_query)
+        price_catalog = EnterpriseCatalogFactory(catalog_query=price_query)
+
+        catalog_index = build_catalog_content_index()
+        json_metadata = {'org': 'MITx', 'content_type': 'course', 'first_enrollable_paid_seat_price': 50}
+
+        assert catalog_index.get_candidate_query_ids(json_metadata) == {mit_query.id, price_query.id}
+        assert catalog_index.get_candidate_query_ids({'content_type': 'program'}) == {
+            program_query.id, price_query.id,
+        }
+        assert catalog_index.get_catalogs_for_content(json_metadata) == [
+            mit_catalog, shared_mit_catalog, price_catalog,
+        ]
+        assert catalog_index.get_catalogs_for_content({'org': ['MITx'], 'content_type': 'course'}) == []
+
+    def test_get_catalogs_for_content_with_index(self):
+        """ Test that a prebuilt index is used for the lookup. """
+        content_metadata = ContentMetadataFactory(content_type='course')
+        query = CatalogQueryFactory(content_filter={'content_type': 'course'})
+        catalog = EnterpriseCatalogFactory(catalog_query=query)
+        catalog_index = build_catalog_content_index()
+
+        with self.assertNumQueries(1):
+            assert get_catalogs_for_content(content_metadata.content_key, catalog_index=catalog_index) == [catalog]
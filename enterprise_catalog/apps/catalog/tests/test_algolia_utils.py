@@ -3,8 +3,12 @@ from unittest import mock
 from uuid import uuid4
 
 import ddt
+from django.core.cache import cache
 from django.test import TestCase
 
+from enterprise_catalog.apps.api_client.constants import (
+    ALGOLIA_INDEX_VERSION_CACHE_KEY,
+)
 from enterprise_catalog.apps.catalog import algolia_utils as utils
 from enterprise_catalog.apps.catalog.algolia_utils import _get_course_run
 from enterprise_catalog.apps.catalog.constants import (
@@ -1841,3 +1845,36 @@ class AlgoliaUtilsTests(TestCase):
         # Verify the error message
         self.assertIn('Failed to create Algolia search client', str(context.exception))
         self.assertIn('should be an Algolia search client', str(context.exception))
+
+    def test_set_global_course_review_avg_from_snapshot(self):
+        """
+        Test that set_global_course_review_avg can compute the average from a course reviews snapshot
+        without reading ContentMetadata records.
+        """
+        course_reviews = {
+            'course1': {'reviews_count': 10, 'avg_course_rating': '4.5'},
+            'course2': {'reviews_count': 30, 'avg_course_rating': '3.5'},
+            'course3': {'reviews_count': 0, 'avg_course_rating': '1.0'},
+        }
+        with mock.patch('enterprise_catalog.apps.catalog.algolia_utils.batch_by_pk') as mock_batch_by_pk, \
+                mock.patch('enterprise_catalog.apps.catalog.algolia_utils.cache') as mock_cache:
+            utils.set_global_course_review_avg(course_reviews)
+
+        mock_batch_by_pk.assert_not_called()
+        mock_cache.set.assert_called_once_with(utils.DISCOVERY_AVERAGE_COURSE_REVIEW_CACHE_KEY, 3.75)
+
+    def test_algolia_index_version(self):
+        """
+        Test that the Algolia index version is stable until the index is rebuilt, and is never reused.
+        """
+        cache.delete(ALGOLIA_INDEX_VERSION_CACHE_KEY)
+        index_version = utils.get_algolia_index_version()
+        self.assertEqual(utils.get_algolia_index_version(), index_version)
+
+        new_index_version = utils.update_algolia_index_version()
+        self.assertNotEqual(new_index_version, index_version)
+        self.assertEqual(utils.get_algolia_index_version(), new_index_version)
+
+        # a lost version is replaced by a new one rather than going back to an older one
+        cache.delete(ALGOLIA_INDEX_VERSION_CACHE_KEY)
+        self.assertNotIn(utils.get_algolia_index_version(), (index_version, new_index_version))
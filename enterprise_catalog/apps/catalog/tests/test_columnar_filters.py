@@ -0,0 +1,37 @@
+""" Tests for columnar catalog query filtering. """
+import pytest
+from django.test import TestCase
+
+from enterprise_catalog.apps.catalog import filters
+from enterprise_catalog.apps.catalog.columnar_filters import (
+    ContentMetadataColumns,
+)
+from enterprise_catalog.apps.catalog.tests.test_filters import (
+    EQUIVALENCE_TEST_CONTENT,
+    EQUIVALENCE_TEST_QUERIES,
+)
+
+
+class ContentMetadataColumnsTests(TestCase):
+    """
+    Tests that columnar filter evaluation agrees with ``does_query_match_content``.
+    """
+
+    def test_masks_match_interpreter(self):
+        columns = ContentMetadataColumns(EQUIVALENCE_TEST_CONTENT)
+        assert len(columns) == len(EQUIVALENCE_TEST_CONTENT)
+        for query in EQUIVALENCE_TEST_QUERIES + [{'content_type': []}, {'org__exclude': []}]:
+            expected = [filters.does_query_match_content(query, content) for content in EQUIVALENCE_TEST_CONTENT]
+            assert columns.evaluate(query).tolist() == expected, query
+
+    def test_unparseable_content_value_does_not_match(self):
+        columns = ContentMetadataColumns([
+            {'first_enrollable_paid_seat_price': 'free'},
+            {'first_enrollable_paid_seat_price': '20'},
+        ])
+        assert columns.evaluate({'first_enrollable_paid_seat_price__lt': 100}).tolist() == [False, True]
+
+    def test_invalid_query_raises(self):
+        columns = ContentMetadataColumns([{'content_type': 'course'}])
+        with pytest.raises(filters.QueryFilterException):
+            columns.evaluate({'content_type__regex': 'course'})
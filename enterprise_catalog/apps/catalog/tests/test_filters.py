@@ -504,3 +504,56 @@ class QueryFilterTests(TestCase):
         query_data = json.loads(query_json)
         content_metadata = json.loads(content_metadata_json)
         assert not filters.does_query_match_content(query_data, content_metadata)
+
+
+# Queries and content used to check other filter evaluators against ``does_query_match_content``.
+EQUIVALENCE_TEST_QUERIES = [
+    {'content_type': 'course'},
+    {'content_type': ['course', 'program'], 'partner': 'edx'},
+    {'org__exclude': ['MITx', 'HarvardX'], 'content_type': 'course'},
+    {'org__exempt': 'MITx'},
+    {'aggregration__key': ['course:edX+DemoX', 'course:MITx+6.002x']},
+    {'content_type__not': 'program'},
+    {'first_enrollable_paid_seat_price__gt': '100'},
+    {'first_enrollable_paid_seat_price__lte': 100, 'content_type': 'course'},
+    {'first_enrollable_paid_seat_price__gte': ['50', '75']},
+    {'first_enrollable_paid_seat_price__lt': None},
+    {'content_type': 'course', 'content_type__not': 'course'},
+    {'level_type': [['Introductory'], 'Advanced']},
+]
+
+EQUIVALENCE_TEST_CONTENT = [
+    {'content_type': 'course', 'partner': 'edx', 'org': 'edX', 'aggregation_key': 'course:edX+DemoX'},
+    {'content_type': 'course', 'partner': 'edx', 'org': 'MITx', 'first_enrollable_paid_seat_price': 99},
+    {'content_type': 'course', 'org': 'HarvardX', 'first_enrollable_paid_seat_price': '149.50'},
+    {'content_type': 'program', 'partner': 'edx', 'aggregation_key': 'course:MITx+6.002x'},
+    {'content_type': 'course', 'first_enrollable_paid_seat_price': None, 'level_type': ['Introductory']},
+    {'content_type': 'course', 'first_enrollable_paid_seat_price': 60, 'level_type': 'Advanced'},
+    {},
+]
+
+
+@ddt.ddt
+class CompiledQueryFilterTests(TestCase):
+    """
+    Tests that compiled query filters agree with ``does_query_match_content``.
+    """
+
+    def test_compiled_filter_matches_interpreter(self):
+        for query in EQUIVALENCE_TEST_QUERIES:
+            query_filter = filters.compile_query_filter(query)
+            for content in EQUIVALENCE_TEST_CONTENT:
+                assert query_filter(content) == filters.does_query_match_content(query, content), (query, content)
+
+    @ddt.data(
+        {'status__deeper__field': 'published'},
+        {'status__regex': 'published'},
+    )
+    def test_invalid_query_raises_when_compiled(self, query):
+        with pytest.raises(filters.QueryFilterException):
+            filters.compile_query_filter(query)
+
+    def test_unparseable_numeric_query_value_raises_on_evaluation(self):
+        query_filter = filters.compile_query_filter({'first_enrollable_paid_seat_price__gt': 'free'})
+        with pytest.raises(ValueError):
+            query_filter({'first_enrollable_paid_seat_price': 10})
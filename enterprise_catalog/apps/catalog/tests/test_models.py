@@ -18,21 +18,35 @@ from enterprise_catalog.apps.catalog.constants import (
     COURSE_RUN_RESTRICTION_TYPE_KEY,
     EXEC_ED_2U_COURSE_TYPE,
     EXEC_ED_2U_ENTITLEMENT_MODE,
+    FORCE_INCLUDE_AGGREGATION_KEYS_FILTER_KEY,
     PROGRAM,
     QUERY_FOR_RESTRICTED_RUNS,
     RESTRICTED_RUNS_ALLOWED_KEY,
     RESTRICTION_FOR_B2B,
 )
+from enterprise_catalog.apps.catalog.content_metadata_utils import (
+    tansform_force_included_courses,
+)
 from enterprise_catalog.apps.catalog.models import (
+    ContentAssociationChange,
     ContentMetadata,
+    EnterpriseCatalog,
     RestrictedCourseMetadata,
+    _bulk_create_new_content_metadata,
+    _get_defaults_from_metadata,
     _should_allow_metadata,
+    associate_content_metadata_with_query,
 )
 from enterprise_catalog.apps.catalog.models import \
     create_content_metadata as create_content_metadata_func
 from enterprise_catalog.apps.catalog.models import (
+    filter_content_keys_in_catalogs,
+    get_catalogs_containing_content_keys,
+    get_catalogs_containing_content_uuid,
+    get_local_query_filter,
     synchronize_restricted_content,
     update_contentmetadata_from_discovery,
+    update_contentmetadata_from_local_evaluation,
 )
 from enterprise_catalog.apps.catalog.tests import factories
 from enterprise_catalog.apps.catalog.utils import localized_utcnow
@@ -1780,3 +1794,382 @@ class TestCreateContentMetadata(TestCase):
         # Should be: 2 initial batches + 2 retries = 4 total calls
         self.assertEqual(mock_execute_updates.call_count, 4)
         self.assertEqual(len(result), 1)  # Only the successful item from second batch
+
+    @override_settings(SHOULD_BULK_CREATE_CONTENT_METADATA=True, CREATE_NEW_CONTENT_METADATA_BATCH_SIZE=2)
+    def test_associate_content_metadata_with_query_bulk_create(self):
+        """
+        Test that bulk-created ContentMetadata records get history records and are associated with the query.
+        """
+        metadata = [
+            {**entry, 'uuid': str(uuid4()), 'aggregation_key': f"course:{entry['key']}"}
+            for entry in self.sample_metadata
+        ]
+
+        associated_keys, __, __ = associate_content_metadata_with_query(metadata, self.catalog_query)
+
+        self.assertEqual(sorted(associated_keys), ['course-1', 'course-2', 'course-3'])
+        self.assertEqual(
+            sorted(self.catalog_query.contentmetadata_set.values_list('content_key', flat=True)),
+            ['course-1', 'course-2', 'course-3'],
+        )
+        for content_metadata in ContentMetadata.objects.filter(content_key__in=associated_keys):
+            self.assertEqual(content_metadata.json_metadata['content_type'], 'course')
+            self.assertEqual(list(content_metadata.history.values_list('history_type', flat=True)), ['+'])
+
+    @override_settings(CREATE_NEW_CONTENT_METADATA_BATCH_SIZE=10)
+    def test_bulk_create_new_content_metadata_conflict(self):
+        """
+        Test that a batch conflicting with a concurrently-created record falls back to per-record creation
+        and returns the existing record for the conflicting content key.
+        """
+        metadata = [
+            {**entry, 'uuid': str(uuid4()), 'aggregation_key': f"course:{entry['key']}"}
+            for entry in self.sample_metadata
+        ]
+        existing_metadata = factories.ContentMetadataFactory(content_type=COURSE, content_key='course-2')
+
+        created_metadata = _bulk_create_new_content_metadata(
+            [_get_defaults_from_metadata(entry) for entry in metadata]
+        )
+
+        self.assertEqual([record.content_key for record in created_metadata], ['course-1', 'course-2', 'course-3'])
+        self.assertEqual(created_metadata[1].id, existing_metadata.id)
+        self.assertEqual(ContentMetadata.objects.filter(content_key__startswith='course-').count(), 3)
+        self.assertEqual(
+            ContentMetadata.history.filter(content_key='course-1').count(),  # pylint: disable=no-member
+            1,
+        )
+
+    def test_associate_content_metadata_with_query_applies_diff(self):
+        """
+        Test that only changed associations are written, and that the added and removed keys are returned.
+        """
+        metadata = [
+            {**entry, 'uuid': str(uuid4()), 'aggregation_key': f"course:{entry['key']}"}
+            for entry in self.sample_metadata
+        ]
+        kept_metadata = factories.ContentMetadataFactory(content_type=COURSE, content_key='course-1')
+        removed_metadata = factories.ContentMetadataFactory(content_type=COURSE, content_key='course-old')
+        self.catalog_query.contentmetadata_set.set([kept_metadata, removed_metadata])
+        through_model = ContentMetadata.catalog_queries.through
+        kept_through_row_id = through_model.objects.get(
+            catalogquery=self.catalog_query, contentmetadata=kept_metadata,
+        ).id
+
+        result = associate_content_metadata_with_query(metadata[:2], self.catalog_query)
+
+        self.assertEqual(result.associated_content_keys, ['course-1', 'course-2'])
+        self.assertEqual(result.added_content_keys, ['course-2'])
+        self.assertEqual(result.removed_content_keys, ['course-old'])
+        self.assertEqual(
+            sorted(self.catalog_query.contentmetadata_set.values_list('content_key', flat=True)),
+            ['course-1', 'course-2'],
+        )
+        # The unchanged association was not deleted and re-inserted.
+        self.assertTrue(through_model.objects.filter(id=kept_through_row_id).exists())
+
+        result = associate_content_metadata_with_query(metadata[:2], self.catalog_query)
+        self.assertEqual((result.added_content_keys, result.removed_content_keys), ([], []))
+
+    @override_settings(SHOULD_RECORD_CONTENT_ASSOCIATION_CHANGES=True)
+    def test_associate_content_metadata_with_query_records_changes(self):
+        """
+        Test that association changes are journaled and can be read back incrementally from a cursor.
+        """
+        metadata = [
+            {**entry, 'uuid': str(uuid4()), 'aggregation_key': f"course:{entry['key']}"}
+            for entry in self.sample_metadata
+        ]
+        associate_content_metadata_with_query(metadata[:2], self.catalog_query)
+        first_read = ContentAssociationChange.get_changes_since(self.catalog_query)
+        self.assertEqual(sorted(first_read['added']), ['course-1', 'course-2'])
+        self.assertEqual(first_read['removed'], [])
+        self.assertFalse(first_read['more'])
+        self.assertFalse(first_read['expired'])
+
+        associate_content_metadata_with_query(metadata[1:], self.catalog_query)
+        second_read = ContentAssociationChange.get_changes_since(self.catalog_query, first_read['cursor'])
+        self.assertEqual(second_read['added'], ['course-3'])
+        self.assertEqual(second_read['removed'], ['course-1'])
+
+        # course-1 was added and later removed, so it nets out when reading from the beginning.
+        full_read = ContentAssociationChange.get_changes_since(self.catalog_query)
+        self.assertEqual(sorted(full_read['added']), ['course-2', 'course-3'])
+        self.assertEqual(full_read['removed'], [])
+        self.assertEqual(full_read['cursor'], second_read['cursor'])
+
+        paged_read = ContentAssociationChange.get_changes_since(self.catalog_query, limit=1)
+        self.assertTrue(paged_read['more'])
+
+        # Once the oldest changes are pruned, a cursor from before them has expired.
+        ContentAssociationChange.objects.filter(id__lte=first_read['cursor']).update(
+            created=localized_utcnow() - timedelta(days=400),
+        )
+        ContentAssociationChange.prune(older_than_days=365)
+        self.assertTrue(ContentAssociationChange.get_changes_since(self.catalog_query)['expired'])
+        self.assertFalse(
+            ContentAssociationChange.get_changes_since(self.catalog_query, first_read['cursor'])['expired']
+        )
+
+    def test_content_association_change_cursor_expires_per_catalog_query(self):
+        """
+        Test that pruning the changes of one catalog query does not expire the cursors of another.
+        """
+        quiet_catalog_query = factories.CatalogQueryFactory()
+        ContentAssociationChange.record_changes(quiet_catalog_query, ['quiet-course'], [])
+        quiet_cursor = ContentAssociationChange.get_changes_since(quiet_catalog_query)['cursor']
+        ContentAssociationChange.record_changes(self.catalog_query, ['course-1'], [])
+        busy_cursor = ContentAssociationChange.get_changes_since(self.catalog_query)['cursor']
+        ContentAssociationChange.record_changes(self.catalog_query, ['course-2'], [])
+        # Only the busy catalog query has changes old enough to be pruned, all of them newer than quiet_cursor.
+        ContentAssociationChange.objects.filter(catalog_query=self.catalog_query).update(
+            created=localized_utcnow() - timedelta(days=400),
+        )
+
+        self.assertEqual(ContentAssociationChange.prune(older_than_days=365), 2)
+
+        self.assertFalse(ContentAssociationChange.get_changes_since(quiet_catalog_query, quiet_cursor)['expired'])
+        self.assertFalse(ContentAssociationChange.get_changes_since(quiet_catalog_query)['expired'])
+        self.assertTrue(ContentAssociationChange.get_changes_since(self.catalog_query, busy_cursor)['expired'])
+        self.assertTrue(ContentAssociationChange.get_changes_since(self.catalog_query)['expired'])
+
+
+@ddt.ddt
+class TestLocalCatalogQueryEvaluation(TestCase):
+    """
+    Tests for computing catalog query content from local ContentMetadata records.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.mit_course = self._create_course('MITx')
+        self.harvard_course = self._create_course('HarvardX')
+        self.program = factories.ContentMetadataFactory(
+            content_type=PROGRAM, last_seen_in_search_all=localized_utcnow(),
+        )
+
+    def _create_course(self, org):
+        course = factories.ContentMetadataFactory(
+            content_type=COURSE,
+            content_key=f'{org}+{uuid4().hex[:8]}',
+            last_seen_in_search_all=localized_utcnow(),
+        )
+        course._json_metadata.update({'org': org, 'partner': 'edx'})  # pylint: disable=protected-access
+        course.save()
+        return course
+
+    @ddt.data(
+        ({'content_type': 'course', 'org': 'MITx'}, True),
+        ({'content_type': ['course', 'program'], 'org__exclude': ['MITx'], RESTRICTED_RUNS_ALLOWED_KEY: {}}, True),
+        ({}, False),
+        ({'content_type': 'course', 'level_type': 'Introductory'}, False),
+        ({'content_type': 'course', 'org__regex': 'MIT'}, False),
+        ({'content_type': 'course', 'enterprise_force_include_aggregation_keys': ['course:edX+DemoX']}, False),
+    )
+    @ddt.unpack
+    def test_get_local_query_filter(self, content_filter, is_local):
+        catalog_query = factories.CatalogQueryFactory(content_filter=content_filter)
+        self.assertEqual(get_local_query_filter(catalog_query) is not None, is_local)
+
+    def test_update_contentmetadata_from_local_evaluation(self):
+        catalog_query = factories.CatalogQueryFactory(content_filter={'content_type': 'course', 'org': 'MITx'})
+        catalog_query.contentmetadata_set.add(self.harvard_course)
+
+        with mock.patch('enterprise_catalog.apps.catalog.models.CatalogQueryMetadata') as mock_discovery_metadata:
+            associated_content_keys = update_contentmetadata_from_local_evaluation(catalog_query)
+
+        mock_discovery_metadata.assert_not_called()
+        self.assertEqual(associated_content_keys, [self.mit_course.content_key])
+        self.assertEqual(list(catalog_query.contentmetadata_set.all()), [self.mit_course])
+
+    def test_update_contentmetadata_from_local_evaluation_dry_run(self):
+        catalog_query = factories.CatalogQueryFactory(content_filter={'content_type': 'course', 'org': 'MITx'})
+
+        associated_content_keys = update_contentmetadata_from_local_evaluation(catalog_query, dry_run=True)
+
+        self.assertEqual(associated_content_keys, [self.mit_course.content_key])
+        self.assertFalse(catalog_query.contentmetadata_set.exists())
+
+    def test_local_evaluation_agrees_with_discovery(self):
+        """
+        Test that local evaluation leaves out the content /search/all would not return: expired, hidden and
+        unpublished course runs, hidden courses and courses without published runs, and content discovery
+        no longer returns.
+        """
+        def course(key, **metadata):
+            return {
+                'key': key, 'aggregation_key': f'course:{key}', 'uuid': str(uuid4()), 'content_type': COURSE,
+                'org': 'edX', 'course_run_statuses': ['published'], **metadata,
+            }
+
+        def course_run(key, **metadata):
+            return {
+                'key': f'course-v1:{key}+run', 'aggregation_key': f'courserun:{key}', 'uuid': str(uuid4()),
+                'content_type': COURSE_RUN, 'course': key, 'org': 'edX', 'status': 'published',
+                'end': (localized_utcnow() + timedelta(days=30)).isoformat(), **metadata,
+            }
+
+        discovery_results = [course('edX+Active'), course_run('edX+Active')]
+        # content stored by earlier /search/all responses, which discovery leaves out by now
+        left_out_results = [
+            course('edX+Unpublished', course_run_statuses=['unpublished']),
+            course_run('edX+Expired', end=(localized_utcnow() - timedelta(days=1)).isoformat()),
+            course_run('edX+Hidden', hidden=True),
+            course_run('edX+Unpublished', status='unpublished'),
+            course('edX+Hidden', hidden=True),
+            course('edX+Dropped'),
+        ]
+        create_content_metadata_func(
+            discovery_results + left_out_results,
+            search_all_content_keys={entry['key'] for entry in discovery_results + left_out_results},
+        )
+        ContentMetadata.objects.filter(content_key='edX+Dropped').update(
+            last_seen_in_search_all=localized_utcnow() - timedelta(days=30),
+        )
+        catalog_query = factories.CatalogQueryFactory(
+            content_filter={'content_type': [COURSE, COURSE_RUN], 'org': 'edX'},
+        )
+
+        with mock.patch('enterprise_catalog.apps.catalog.models.CatalogQueryMetadata') as mock_discovery_metadata:
+            mock_discovery_metadata.return_value.metadata = discovery_results
+            discovery_content_keys = update_contentmetadata_from_discovery(catalog_query)
+        catalog_query.contentmetadata_set.clear()
+        local_content_keys = update_contentmetadata_from_local_evaluation(catalog_query)
+
+        self.assertEqual(sorted(discovery_content_keys), ['course-v1:edX+Active+run', 'edX+Active'])
+        self.assertEqual(sorted(local_content_keys), sorted(discovery_content_keys))
+
+    def test_local_evaluation_excludes_force_included_content(self):
+        """
+        Test that a course force-included by one catalog query, and the programs stored alongside
+        discovery's results, are not associated with another, locally evaluated, catalog query.
+        """
+        listed_course = {
+            'key': 'edX+Listed', 'aggregation_key': 'course:edX+Listed', 'uuid': str(uuid4()),
+            'content_type': COURSE, 'org': 'edX', 'course_run_statuses': ['published'],
+        }
+        forced_course = tansform_force_included_courses([{
+            'key': 'edX+Unlisted', 'aggregation_key': 'course:edX+Unlisted', 'uuid': str(uuid4()),
+            'content_type': COURSE, 'org': 'edX', 'course_runs': [{'key': 'course-v1:edX+Unlisted+run'}],
+        }])[0]
+        forcing_query = factories.CatalogQueryFactory(
+            content_filter={'org': 'edX', FORCE_INCLUDE_AGGREGATION_KEYS_FILTER_KEY: ['course:edX+Unlisted']},
+        )
+        with mock.patch('enterprise_catalog.apps.catalog.models.CatalogQueryMetadata') as mock_discovery_metadata:
+            mock_discovery_metadata.return_value.metadata = [listed_course, forced_course]
+            forcing_content_keys = update_contentmetadata_from_discovery(forcing_query)
+        create_content_metadata_func([{
+            'uuid': str(uuid4()), 'aggregation_key': 'program:edX+Program', 'content_type': PROGRAM, 'org': 'edX',
+        }])
+
+        local_query = factories.CatalogQueryFactory(content_filter={'org': 'edX'})
+        local_content_keys = update_contentmetadata_from_local_evaluation(local_query)
+
+        self.assertEqual(sorted(forcing_content_keys), ['edX+Listed', 'edX+Unlisted'])
+        self.assertIsNone(ContentMetadata.objects.get(content_key='edX+Unlisted').last_seen_in_search_all)
+        self.assertEqual(local_content_keys, ['edX+Listed'])
+
+    def test_update_contentmetadata_from_local_evaluation_unsupported(self):
+        catalog_query = factories.CatalogQueryFactory(content_filter={'level_type': 'Introductory'})
+        catalog_query.contentmetadata_set.add(self.harvard_course)
+
+        self.assertIsNone(update_contentmetadata_from_local_evaluation(catalog_query))
+        self.assertEqual(list(catalog_query.contentmetadata_set.all()), [self.harvard_course])
+
+
+@ddt.ddt
+class TestCatalogSetQueries(TestCase):
+    """
+    Tests for the set-based lookups of content across several catalogs.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.course = factories.ContentMetadataFactory(content_type=COURSE, content_key='edX+course')
+        self.run = factories.ContentMetadataFactory(
+            content_type=COURSE_RUN, content_key='course-v1:edX+course+run1', parent_content_key='edX+course',
+        )
+        self.restricted_run = factories.ContentMetadataFactory(
+            content_type=COURSE_RUN, content_key='course-v1:edX+course+run2', parent_content_key='edX+course',
+        )
+        factories.RestrictedRunAllowedForRestrictedCourseFactory(run=self.restricted_run)
+        self.program = factories.ContentMetadataFactory(content_type=PROGRAM, content_key='program-key')
+
+        self.course_catalog = factories.EnterpriseCatalogFactory()
+        self.course_catalog.catalog_query.contentmetadata_set.add(self.course)
+        self.runs_catalog = factories.EnterpriseCatalogFactory()
+        self.runs_catalog.catalog_query.contentmetadata_set.add(self.run, self.restricted_run)
+        self.program_catalog = factories.EnterpriseCatalogFactory()
+        self.program_catalog.catalog_query.contentmetadata_set.add(self.program)
+        self.catalogs = [self.course_catalog, self.runs_catalog, self.program_catalog]
+
+    @ddt.data(
+        ['edX+course'],
+        ['course-v1:edX+course+run1', 'course-v1:edX+course+run2', 'program-key', 'bad-key'],
+        ['course-v1:edX+course+run2'],
+        [],
+    )
+    def test_filter_content_keys_in_catalogs(self, content_keys):
+        for include_restricted in (False, True):
+            expected = set()
+            for catalog in self.catalogs:
+                expected |= catalog.filter_content_keys(content_keys, include_restricted=include_restricted)
+            with self.assertNumQueries(1 if content_keys else 0):
+                items_included = filter_content_keys_in_catalogs(
+                    self.catalogs, content_keys, include_restricted=include_restricted,
+                )
+            self.assertEqual(items_included, expected)
+
+    def _assert_catalogs_containing_content_keys(self, content_keys):
+        catalogs = EnterpriseCatalog.objects.filter(uuid__in=[catalog.uuid for catalog in self.catalogs])
+        for include_restricted in (False, True):
+            expected = {
+                catalog.uuid for catalog in self.catalogs
+                if catalog.contains_content_keys(content_keys, include_restricted=include_restricted)
+            }
+            containing_catalogs = get_catalogs_containing_content_keys(
+                catalogs, content_keys, include_restricted=include_restricted,
+            )
+            with self.assertNumQueries(1 if content_keys else 0):
+                containing_catalog_uuids = set(containing_catalogs.values_list('uuid', flat=True))
+            self.assertEqual(containing_catalog_uuids, expected)
+
+    @ddt.data(
+        ['edX+course'],
+        ['course-v1:edX+course+run1'],
+        ['course-v1:edX+course+run2'],
+        ['program-key', 'bad-key'],
+        ['bad-key'],
+        [],
+    )
+    def test_get_catalogs_containing_content_keys(self, content_keys):
+        self._assert_catalogs_containing_content_keys(content_keys)
+
+    def test_get_catalogs_containing_content_keys_restricted_run_allowed(self):
+        catalog_query = self.course_catalog.catalog_query
+        catalog_query.content_filter = {
+            RESTRICTED_RUNS_ALLOWED_KEY: {'course:edX+course': ['course-v1:edX+course+run2']},
+        }
+        catalog_query.save()
+        factories.RestrictedRunAllowedForRestrictedCourseFactory(
+            course=factories.RestrictedCourseMetadataFactory(content_key='edX+course', catalog_query=catalog_query),
+            run=self.restricted_run,
+        )
+        self._assert_catalogs_containing_content_keys(['course-v1:edX+course+run2'])
+        self.assertTrue(
+            self.course_catalog.contains_content_keys(['course-v1:edX+course+run2'], include_restricted=True)
+        )
+
+    @ddt.data('course', 'run', 'restricted_run', 'program')
+    def test_get_catalogs_containing_content_uuid(self, content_attribute):
+        content_uuid = getattr(self, content_attribute).content_uuid
+        catalogs = EnterpriseCatalog.objects.filter(uuid__in=[catalog.uuid for catalog in self.catalogs])
+        expected = {
+            catalog.uuid for catalog in self.catalogs
+            if catalog.content_metadata.filter(content_uuid=content_uuid).exists()
+        }
+        with self.assertNumQueries(1):
+            containing_catalog_uuids = set(
+                get_catalogs_containing_content_uuid(catalogs, content_uuid).values_list('uuid', flat=True)
+            )
+        self.assertEqual(containing_catalog_uuids, expected)
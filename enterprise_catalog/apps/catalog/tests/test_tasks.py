@@ -34,16 +34,43 @@ class TaskTests(TestCase):
         CatalogQuery.objects.all().delete()
         EnterpriseCatalog.objects.all().delete()
 
-    @mock.patch('enterprise_catalog.apps.catalog.filters.does_query_match_content')
-    def test_update_content_metadata_for_all_queries(
-        self, mock_does_query_match_content,
-    ):
+    @mock.patch('enterprise_catalog.apps.catalog.tasks.logger')
+    def test_update_content_metadata_for_all_queries(self, mock_logger):
         """
-        Verify that the job calls the comparison with the test data
+        Verify that the job compares discovery's associations with the filter matches, logging disagreements
         """
-        mock_does_query_match_content.return_value = True
+        course_not_included = ContentMetadataFactory.create(content_type='course')
+        ContentMetadataFactory.create(content_type='program')
+
+        compare_catalog_queries_to_filters_task()
+
+        logged_messages = [call.args[0] for call in mock_logger.info.call_args_list]
+        disagreements = [message for message in logged_messages if 'does_discovery_agree_with_filter' in message]
+        assert disagreements == [
+            'compare_catalog_queries_to_filters '
+            f'enterprise_catalog={self.enterprise_catalog_c.uuid}, '
+            f'content_key={course_not_included.content_key}, '
+            'discovery_included=False, '
+            'filter_match=True, '
+            'does_discovery_agree_with_filter=False'
+        ]
+        assert (
+            'compare_catalog_queries_to_filters '
+            f'enterprise_catalog={self.enterprise_catalog_c.uuid}, '
+            'courses=2, discovery_included=1, filter_matches=2, disagreements=1'
+        ) in logged_messages
+
+    @mock.patch('enterprise_catalog.apps.catalog.tasks.logger')
+    def test_update_content_metadata_for_invalid_query(self, mock_logger):
+        """
+        Verify that a catalog query the filters cannot evaluate is logged and skipped
+        """
+        self.catalog_query_c.content_filter = {'content_type__regex': 'course'}
+        self.catalog_query_c.save()
+
         compare_catalog_queries_to_filters_task()
-        mock_does_query_match_content.assert_called_with(
-            self.catalog_query_c.content_filter,
-            self.course_c.json_metadata
+
+        mock_logger.exception.assert_called_once()
+        assert not any(
+            'does_discovery_agree_with_filter' in call.args[0] for call in mock_logger.info.call_args_list
         )
@@ -3,6 +3,7 @@ Utility functions for catalog app.
 """
 import hashlib
 import json
+from collections import defaultdict
 from datetime import datetime, timezone
 from logging import getLogger
 from urllib.parse import urljoin
@@ -16,7 +17,10 @@ from edx_rest_framework_extensions.auth.jwt.authentication import (
 from edx_rest_framework_extensions.auth.jwt.cookies import \
     get_decoded_jwt as get_decoded_jwt_from_cookie
 
-from enterprise_catalog.apps.catalog.constants import COURSE_RUN
+from enterprise_catalog.apps.catalog.constants import (
+    CONTENT_FILTER_KEYS_IGNORED_BY_DISCOVERY,
+    COURSE_RUN,
+)
 
 
 LOGGER = getLogger(__name__)
@@ -28,6 +32,38 @@ def get_content_filter_hash(content_filter):
     return content_filter_hash
 
 
+def get_discovery_content_filter(content_filter):
+    """
+    Returns the part of a content filter that determines the results of discovery's /search/all/ endpoint,
+    i.e. the filter without any of the ``CONTENT_FILTER_KEYS_IGNORED_BY_DISCOVERY``.
+    """
+    return {
+        key: value for key, value in content_filter.items()
+        if key not in CONTENT_FILTER_KEYS_IGNORED_BY_DISCOVERY
+    }
+
+
+def group_catalog_queries_by_discovery_filter(catalog_queries):
+    """
+    Plans the discovery /search/all/ fetches needed to update the given catalog queries.
+
+    Catalog queries whose content filters only differ in keys that discovery ignores
+    (e.g. ``enterprise_force_include_aggregation_keys``) return the same /search/all/ results,
+    so they are grouped together to be fetched once.
+
+    Arguments:
+        catalog_queries (iterable of CatalogQuery): The catalog queries to update.
+    Returns:
+        dict: Mapping of discovery content filter hash to the list of catalog queries sharing that filter,
+            in the order the queries were given.
+    """
+    catalog_queries_by_filter_hash = defaultdict(list)
+    for catalog_query in catalog_queries:
+        discovery_content_filter = get_discovery_content_filter(catalog_query.content_filter)
+        catalog_queries_by_filter_hash[get_content_filter_hash(discovery_content_filter)].append(catalog_query)
+    return dict(catalog_queries_by_filter_hash)
+
+
 def get_content_uuid(metadata):
     """
     Returns the content uuid for a piece of metadata. Returns None for course runs.
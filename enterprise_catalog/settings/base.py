@@ -408,6 +408,29 @@ ONE_HOUR = 60 * 60
 ENTERPRISE_CUSTOMER_CACHE_TIMEOUT = ONE_HOUR
 DISCOVERY_CATALOG_QUERY_CACHE_TIMEOUT = ONE_HOUR
 DISCOVERY_COURSE_DATA_CACHE_TIMEOUT = ONE_HOUR
+DISCOVERY_PROGRAM_DATA_CACHE_TIMEOUT = ONE_HOUR
+# How long (seconds) past its timeout an expired discovery response may still be
+# served while a single caller refreshes it.
+DISCOVERY_RESPONSE_CACHE_STALE_TIMEOUT = 60 * 15
+
+# Whether to cache course-discovery /search/all, /courses and /programs responses
+# (see enterprise_catalog.apps.api_client.discovery_cache).
+SHOULD_CACHE_DISCOVERY_RESPONSES = False
+
+# Whether requests to course-discovery go through the shared rate limiter and circuit breaker
+# (see enterprise_catalog.apps.api_client.discovery_throttle).
+SHOULD_THROTTLE_DISCOVERY_REQUESTS = False
+# Requests per second allowed to course-discovery, across all workers.
+DISCOVERY_CLIENT_MAX_REQUESTS_PER_SECOND = 10
+# Seconds to pause all requests after a 429 response without a Retry-After header.
+DISCOVERY_CLIENT_RATE_LIMITED_PAUSE = 5
+# Upper bound (seconds) on the pause after a 429 response, whatever its Retry-After header asks for.
+DISCOVERY_CLIENT_MAX_RATE_LIMITED_PAUSE = 60
+# Number of failed requests within the failure window that opens the circuit.
+DISCOVERY_CLIENT_CIRCUIT_FAILURE_THRESHOLD = 20
+DISCOVERY_CLIENT_CIRCUIT_FAILURE_WINDOW = 60
+# Seconds the circuit stays open before a trial request is let through.
+DISCOVERY_CLIENT_CIRCUIT_RESET_TIMEOUT = 60
 
 # URLs
 LMS_BASE_URL = os.environ.get('LMS_BASE_URL', '')
@@ -470,6 +493,71 @@ UPDATE_EXISTING_CONTENT_METADATA_BATCH_SIZE = 4
 # remain somewhat small to avoid deadlocks.
 SELECT_EXISTING_CONTENT_METADATA_BATCH_SIZE = 20
 
+# Whether net-new content metadata records are inserted with batched bulk_create() calls
+# rather than one create() per record, and how many records go in each batch.
+SHOULD_BULK_CREATE_CONTENT_METADATA = False
+CREATE_NEW_CONTENT_METADATA_BATCH_SIZE = 100
+
+# Whether added/removed catalog query content associations are journaled as ContentAssociationChange
+# records, how many changes are read per page, and how many days the changes are kept.
+SHOULD_RECORD_CONTENT_ASSOCIATION_CHANGES = False
+CONTENT_ASSOCIATION_CHANGES_PAGE_SIZE = 1000
+CONTENT_ASSOCIATION_CHANGES_RETENTION_DAYS = 30
+
+# Whether update_catalog_metadata_task computes a catalog query's content from the local ContentMetadata
+# table, rather than from discovery's /search/all/ endpoint, when its content filter only uses these fields.
+SHOULD_EVALUATE_CATALOG_QUERIES_LOCALLY = False
+LOCAL_CATALOG_QUERY_EVALUATION_FIELDS = [
+    'aggregation_key',
+    'content_type',
+    'key',
+    'org',
+    'partner',
+    'uuid',
+]
+# Content that /search/all has not returned (for any catalog query) for this many days is considered dropped
+# by discovery, and is not associated with locally evaluated catalog queries.
+LOCAL_CATALOG_QUERY_EVALUATION_MAX_CONTENT_AGE_DAYS = 2
+
+# Whether the catalog workbook export browses the Algolia index (rather than paging through search results)
+# and assembles the workbook in a constant-memory temporary file that is streamed back, and how many hits
+# each browse request fetches (at most 1000).
+SHOULD_STREAM_CATALOG_WORKBOOK_EXPORTS = False
+CATALOG_EXPORT_BROWSE_HITS_PER_PAGE = 1000
+
+# Whether the catalog CSV/workbook export endpoints serve exports generated in the background and stored in the
+# default storage until the Algolia index is rebuilt, how long (seconds) a requested export job is assumed to still
+# be running, and how long (seconds) clients are asked to wait before repeating a request for a pending export.
+SHOULD_CACHE_CATALOG_EXPORTS = False
+CATALOG_EXPORT_PENDING_TIMEOUT = 60 * 15
+CATALOG_EXPORT_RETRY_AFTER_SECONDS = 10
+
+# Whether the catalog CSV data endpoint streams its JSON response as CSV rows are produced, rather than building
+# the whole response in memory first.
+SHOULD_STREAM_CATALOG_CSV_DATA = False
+
+# Whether catalog CSV exports search the next Algolia page and enrich the current one from discovery in background
+# threads while rows are written, and how many enriched pages may wait to be written.
+SHOULD_PIPELINE_CATALOG_CSV_EXPORTS = False
+CATALOG_CSV_EXPORT_PIPELINE_DEPTH = 2
+
+# Whether catalog CSV exports enrich course hits from the course metadata stored locally by the
+# update_full_content_metadata_task, only asking discovery for courses that are not stored.
+SHOULD_ENRICH_CATALOG_EXPORTS_LOCALLY = False
+
+# Whether the default catalog results (the learner portal's empty search state) are cached until the Algolia index
+# is rebuilt, and for which learning types they are prewarmed for every catalog title after each reindex.
+SHOULD_CACHE_DEFAULT_CATALOG_RESULTS = False
+DEFAULT_CATALOG_RESULTS_CACHE_TIMEOUT = 60 * 60 * 24
+DEFAULT_CATALOG_RESULTS_PREWARM_LEARNING_TYPES = ['course']
+
+# Whether AI curation reads catalog data from per-catalog snapshots, built after each reindex, instead of paging
+# through the Algolia index on every curation request.
+SHOULD_USE_AI_CURATION_CATALOG_SNAPSHOTS = False
+# Whether those snapshots also hold the TF-IDF vectors of all the catalog courses, fitted over the whole catalog,
+# which AI curation then scores queries against instead of fitting a vectorizer per course and query.
+SHOULD_USE_AI_CURATION_CATALOG_TFIDF_INDEX = False
+
 # Allows us to opt into experimental deadlock mitigation strategy
 TRY_AVOID_DEADLOCK = False
 
@@ -496,6 +584,13 @@ OPENAI_API_KEY = 'I am key'
 XPERT_AICURATION_SYSTEM_MESSAGE = 'test system prompt'
 CHAT_COMPLETION_API_CONNECT_TIMEOUT = 1
 CHAT_COMPLETION_API_READ_TIMEOUT = 15
+# Whether AI curation requests its chat completions in background threads while the catalog data loads, and
+# how long (seconds) it waits for each of them before failing with a 504.
+SHOULD_RUN_AI_CURATION_CHAT_COMPLETIONS_CONCURRENTLY = False
+AI_CURATION_CHAT_COMPLETIONS_TIMEOUT = 60
+# Whether chat completions responses are cached by prompt and normalized query, and for how long (seconds).
+SHOULD_CACHE_AI_CURATION_RESPONSES = False
+AI_CURATION_RESPONSE_CACHE_TIMEOUT = ONE_HOUR * 24
 
 XPERT_AICURATION_SYSTEM_MESSAGE = 'test system prompt'
 
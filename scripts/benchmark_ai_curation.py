@@ -0,0 +1,94 @@
+import random
+import statistics
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import override_settings
+
+from enterprise_catalog.apps.ai_curation.utils import generate_curation
+
+
+"""
+Measures end-to-end AI curation latency (generate_curation) on a synthetic 10k-course catalog:
+paging through the catalog and a TF-IDF vectorizer per course (the default), catalog snapshots with
+a TF-IDF vectorizer per course, and catalog snapshots with the precomputed catalog TF-IDF index.
+
+Algolia and the chat completion API are replaced by instant fakes, so the timings only cover the work
+done in this process. Snapshots are kept in an in-memory storage.
+
+    cat scripts/benchmark_ai_curation.py | ./manage.py shell
+"""
+
+NUM_COURSES = 10000
+REPEATS = 5
+WORDS = [f'word{index}' for index in range(5000)]
+KEYWORDS = ['python', 'data', 'science', 'statistics']
+SUBJECTS = ['Computer Science', 'Data Analysis & Statistics', 'Engineering']
+
+random.seed(0)
+
+
+def fake_course(index):
+    return {
+        'key': f'edX+course{index}',
+        'aggregation_key': f'course:edX+course{index}',
+        'content_type': 'course',
+        'course_type': 'verified',
+        'title': ' '.join(random.sample(KEYWORDS, 3) + random.sample(WORDS, 3)),
+        'short_description': ' '.join(random.sample(WORDS, 60)),
+        'full_description': ' '.join(random.sample(WORDS, 60)),
+        'outcome': ' '.join(random.sample(WORDS, 30)),
+        'program_titles': [],
+        'skills': random.sample(KEYWORDS + WORDS[:50], 4),
+        'subjects': random.sample(SUBJECTS, 2),
+        'availability': ['Available Now'],
+    }
+
+
+catalog_metadata = ([fake_course(index) for index in range(NUM_COURSES)], [], [], SUBJECTS)
+
+
+def fetch_catalog_metadata(catalog_query_title):  # pylint: disable=unused-argument
+    return (
+        [dict(course) for course in catalog_metadata[0]],
+        [], [], list(SUBJECTS),
+    )
+
+
+def run(name, **flags):
+    timings = []
+    with override_settings(
+        STORAGES={
+            'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'},
+            'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+        },
+        **flags,
+    ):
+        # the first curation builds the snapshots, which happens after each reindex in production
+        for repeat in range(REPEATS + 1):
+            start = time.perf_counter()
+            result = generate_curation('python data science', 'benchmark catalog', f'benchmark-{repeat}')
+            if repeat > 0:
+                timings.append((time.perf_counter() - start) * 1000)
+    print(f'{name}: {statistics.median(timings):.0f}ms (curated {len(result["ocm_courses"])} courses)')
+
+
+with mock.patch.multiple(
+    'enterprise_catalog.apps.ai_curation.utils.generate_curation_utils',
+    get_filtered_subjects=mock.Mock(return_value=SUBJECTS),
+    get_query_keywords=mock.Mock(return_value=KEYWORDS),
+    get_keywords_to_prose=mock.Mock(return_value='Python for data science, data analysis and statistics'),
+    track_ai_curation=mock.Mock(),
+), mock.patch(
+    'enterprise_catalog.apps.ai_curation.utils.catalog_snapshot_utils.fetch_catalog_metadata_from_algolia',
+    side_effect=fetch_catalog_metadata,
+):
+    cache.clear()
+    run('TF-IDF vectorizer per course', SHOULD_USE_AI_CURATION_CATALOG_SNAPSHOTS=False)
+    run('snapshots, TF-IDF vectorizer per course', SHOULD_USE_AI_CURATION_CATALOG_SNAPSHOTS=True)
+    run(
+        'snapshots, catalog TF-IDF index',
+        SHOULD_USE_AI_CURATION_CATALOG_SNAPSHOTS=True,
+        SHOULD_USE_AI_CURATION_CATALOG_TFIDF_INDEX=True,
+    )
@@ -0,0 +1,92 @@
+import statistics
+import time
+from uuid import uuid4
+
+from enterprise_catalog.apps.catalog.models import (
+    CatalogQuery,
+    ContentMetadata,
+    EnterpriseCatalog,
+    get_catalogs_containing_content_keys,
+)
+
+
+"""
+Compares the containment check behind the customer contains_content_items endpoint: one query per catalog
+(EnterpriseCatalog.contains_content_keys in a loop) versus one statement for all of a customer's catalogs
+(get_catalogs_containing_content_keys).
+
+1. point enterprise_catalog/settings/private.py at a local (non-production!) database
+2. cat scripts/benchmark_contains_content_items.py | ./manage.py shell
+
+Every record created here has a key or title starting with "benchmark-" and is deleted afterwards.
+"""
+
+NUM_CATALOGS = 100
+COURSES_PER_CATALOG = 50
+REPEATS = 20
+
+
+def time_ms(check):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = check()
+        timings.append((time.perf_counter() - start) * 1000)
+    return result, statistics.median(timings)
+
+
+def run(name, customer_catalogs, content_keys):
+    def loop_all():
+        return [catalog.uuid for catalog in customer_catalogs if catalog.contains_content_keys(content_keys)]
+
+    def loop_until_found():
+        return any(catalog.contains_content_keys(content_keys) for catalog in customer_catalogs)
+
+    def set_based_all():
+        return list(get_catalogs_containing_content_keys(customer_catalogs, content_keys).values_list('uuid', flat=True))
+
+    def set_based_exists():
+        return get_catalogs_containing_content_keys(customer_catalogs, content_keys).exists()
+
+    for check_name, check in (
+        ('per-catalog loop, catalog list', loop_all),
+        ('single statement, catalog list', set_based_all),
+        ('per-catalog loop, boolean', loop_until_found),
+        ('single statement, boolean', set_based_exists),
+    ):
+        result, median_ms = time_ms(check)
+        found = len(result) if isinstance(result, list) else result
+        print(f'{name} / {check_name}: {median_ms:.1f}ms (found {found})')
+
+
+enterprise_uuid = uuid4()
+try:
+    for catalog_index in range(NUM_CATALOGS):
+        catalog_query = CatalogQuery.objects.create(
+            content_filter={'benchmark': str(uuid4())},
+            title=f'benchmark-{catalog_index}',
+        )
+        EnterpriseCatalog.objects.create(
+            title=f'benchmark-{catalog_index}',
+            enterprise_uuid=enterprise_uuid,
+            enterprise_name='benchmark',
+            catalog_query=catalog_query,
+        )
+        catalog_query.contentmetadata_set.add(*[
+            ContentMetadata.objects.create(
+                content_key=f'benchmark-{catalog_index}+course{course_index}',
+                content_uuid=uuid4(),
+                content_type='course',
+                _json_metadata={'key': f'benchmark-{catalog_index}+course{course_index}'},
+            )
+            for course_index in range(COURSES_PER_CATALOG)
+        ])
+
+    customer_catalogs = EnterpriseCatalog.objects.filter(enterprise_uuid=enterprise_uuid)
+    run('in the last catalog', customer_catalogs, [f'benchmark-{NUM_CATALOGS - 1}+course0'])
+    run('in no catalog', customer_catalogs, ['benchmark-missing+course0'])
+finally:
+    EnterpriseCatalog.objects.filter(enterprise_uuid=enterprise_uuid).delete()
+    CatalogQuery.objects.filter(title__startswith='benchmark-').delete()
+    ContentMetadata.history.filter(content_key__startswith='benchmark-').delete()
+    ContentMetadata.objects.filter(content_key__startswith='benchmark-').delete()
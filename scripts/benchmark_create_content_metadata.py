@@ -0,0 +1,60 @@
+import time
+from uuid import uuid4
+
+from django.test import override_settings
+
+from enterprise_catalog.apps.catalog.models import (
+    ContentMetadata,
+    _create_new_content_metadata,
+    _get_defaults_from_metadata,
+)
+
+
+"""
+Compares rows per second inserted by _create_new_content_metadata with per-record create()
+versus batched bulk_create().
+
+1. point enterprise_catalog/settings/private.py at a local (non-production!) database
+2. cat scripts/benchmark_create_content_metadata.py | ./manage.py shell
+
+Every record created here has a content_key starting with "benchmark-" and is deleted afterwards.
+"""
+
+NUM_RECORDS = 5000
+BATCH_SIZES = [50, 100, 500]
+
+
+def make_defaults(run_name):
+    return [
+        _get_defaults_from_metadata({
+            'key': f'benchmark-{run_name}+course{index}',
+            'uuid': str(uuid4()),
+            'aggregation_key': f'course:benchmark-{run_name}+course{index}',
+            'content_type': 'course',
+            'title': f'Benchmark course {index}',
+            'short_description': 'x' * 500,
+        })
+        for index in range(NUM_RECORDS)
+    ]
+
+
+def run(run_name, **settings_overrides):
+    defaults = make_defaults(run_name)
+    with override_settings(**settings_overrides):
+        start = time.perf_counter()
+        created = _create_new_content_metadata(defaults)
+        elapsed_seconds = time.perf_counter() - start
+    print(f'{run_name}: {len(created)} rows in {elapsed_seconds:.2f}s = {len(created) / elapsed_seconds:.0f} rows/s')
+
+
+try:
+    run('create', SHOULD_BULK_CREATE_CONTENT_METADATA=False)
+    for batch_size in BATCH_SIZES:
+        run(
+            f'bulk_create-{batch_size}',
+            SHOULD_BULK_CREATE_CONTENT_METADATA=True,
+            CREATE_NEW_CONTENT_METADATA_BATCH_SIZE=batch_size,
+        )
+finally:
+    ContentMetadata.history.filter(content_key__startswith='benchmark-').delete()
+    ContentMetadata.objects.filter(content_key__startswith='benchmark-').delete()
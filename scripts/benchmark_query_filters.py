@@ -0,0 +1,70 @@
+import random
+import time
+
+from enterprise_catalog.apps.catalog import filters
+
+
+"""
+Compares evaluating catalog query filters with the does_query_match_content interpreter
+against filters compiled once with compile_query_filter.
+
+cat scripts/benchmark_query_filters.py | ./manage.py shell
+
+No database access is needed; the queries and content dicts are generated in memory.
+"""
+
+NUM_QUERIES = 100
+NUM_CONTENT = 2000
+ORGS = [f'Org{index}X' for index in range(50)]
+CONTENT_TYPES = ['course', 'program', 'learnerpathway']
+
+
+def make_query(index):
+    query = {
+        'content_type': random.sample(CONTENT_TYPES, 2),
+        'partner': 'edx',
+        'org__exclude': random.sample(ORGS, 10),
+        'aggregation_key': [f'course:{org}+course{index}' for org in random.sample(ORGS, 20)],
+    }
+    if index % 2:
+        query['first_enrollable_paid_seat_price__lte'] = str(random.randint(50, 500))
+    return query
+
+
+def make_content(index):
+    org = random.choice(ORGS)
+    return {
+        'content_type': random.choice(CONTENT_TYPES),
+        'partner': 'edx',
+        'org': org,
+        'aggregation_key': f'course:{org}+course{index % NUM_QUERIES}',
+        'first_enrollable_paid_seat_price': random.choice([None, random.randint(0, 1000)]),
+    }
+
+
+def run(name, evaluate):
+    start = time.perf_counter()
+    matches = evaluate()
+    elapsed_seconds = time.perf_counter() - start
+    evaluations = NUM_QUERIES * NUM_CONTENT
+    print(f'{name}: {evaluations} evaluations in {elapsed_seconds:.2f}s = {evaluations / elapsed_seconds:.0f}/s')
+    return matches
+
+
+random.seed(0)
+queries = [make_query(index) for index in range(NUM_QUERIES)]
+contents = [make_content(index) for index in range(NUM_CONTENT)]
+
+interpreted = run('interpreter', lambda: [
+    [filters.does_query_match_content(query, content) for content in contents]
+    for query in queries
+])
+
+
+def evaluate_compiled():
+    compiled_filters = [filters.compile_query_filter(query) for query in queries]
+    return [[query_filter(content) for content in contents] for query_filter in compiled_filters]
+
+
+compiled = run('compiled', evaluate_compiled)
+assert interpreted == compiled, 'the compiled filters disagree with the interpreter'